@@ -0,0 +1,64 @@
+import atexit
+import json
+import os
+import runpy
+import sys
+from collections import Counter
+
+# Runs orca.py under an audit hook that counts file-system operations and
+# writes them as JSON to $ORCA_BENCH_PROBE at exit:
+#   python bench/probe.py <path/to/orca.py> <command> [args...]
+# Only operations made from Python are seen (SQLite and git open files too).
+# On Linux the peak RSS is reported from here as well.
+EVENTS = {
+    "open": "opens",
+    "os.listdir": "listdirs",
+    "os.scandir": "scandirs",
+    "os.rename": "renames",
+    "os.remove": "removes",
+    "os.mkdir": "mkdirs",
+    "os.utime": "utimes",
+    "shutil.copyfile": "copies",
+    "subprocess.Popen": "processes",
+    "sqlite3.connect": "sqlite_connects",
+}
+
+counts = Counter()
+
+def hook(event, args):
+    name = EVENTS.get(event)
+    if name:
+        counts[name] += 1
+
+def peak_rss_mb():
+    """This process's own peak RSS (VmHWM); rusage would include the parent's peak from before exec."""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+def report():
+    path = os.environ.get("ORCA_BENCH_PROBE")
+    if path:
+        result = {name: counts[name] for name in EVENTS.values()}
+        peak = peak_rss_mb()
+        if peak is not None:
+            result["max_rss_mb"] = peak
+        data = json.dumps(result)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(data)
+
+def main():
+    script = sys.argv[1]
+    sys.argv = sys.argv[1:]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    atexit.register(report)
+    sys.addaudithook(hook)
+    runpy.run_path(script, run_name="__main__")
+
+if __name__ == "__main__":
+    main()
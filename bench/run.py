@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import synth
+
+# Benchmark suite: builds a synthetic OrcaSlicer home and a copy of the code
+# under a temporary folder, runs each command non-interactively against it
+# and records wall time, CPU time, peak memory, block I/O and file-system
+# operations per run.  Results are written as JSON and can be compared with
+# an earlier run (--compare) to spot regressions between versions.
+#
+#   python bench/run.py --profiles 3000 --output before.json
+#   python bench/run.py --source /path/to/other/checkout --compare before.json
+RESULTS_VERSION = 1
+BENCH_DIR = Path(__file__).resolve().parent
+IGNORED = shutil.ignore_patterns(".git", ".cache", "backups", "orca_repositories", "__pycache__", "bench", "*.pyc")
+
+# name, argv, stdin, setup before each run: (where, files to edit) or None
+SCENARIOS = [
+    ("list", ["list"], None, None),
+    ("diff", ["diff"], None, None),
+    ("diff --details", ["diff", "--details"], None, None),
+    ("validate", ["validate"], None, None),
+    ("validate --local", ["validate", "--local", "--no-refs"], None, None),
+    # One side was just touched, so both need --force to get past the "newer" guard and copy
+    ("fetch", ["fetch", "--yes", "--force"], None, ("orca", 0.01)),
+    ("push", ["push", "--yes", "--force"], None, ("local", 0.01)),
+    ("backup", ["backup", "--no-prune"], None, ("orca", 0.01)),
+    ("backup --format archive", ["backup", "--format", "archive", "--no-prune"], None, ("orca", 0.01)),
+    ("prune --dry-run", ["prune", "--dry-run"], None, None),
+    ("restore --file", ["restore", "--file", "{sample}", "--as-of", "{now}", "--yes"], None, None),
+    ("history --blame", ["history", "{sample_name}", "--blame"], None, None),
+    ("flatten", ["flatten", "--type", "all", "--yes"], None, None),
+]
+
+def rusage_metrics(usage, wall):
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    rss = usage.ru_maxrss / (1024 * 1024) if sys.platform == "darwin" else usage.ru_maxrss / 1024
+    return {
+        "wall_s": round(wall, 4),
+        "user_s": round(usage.ru_utime, 4),
+        "sys_s": round(usage.ru_stime, 4),
+        "max_rss_mb": round(rss, 1),
+        "read_blocks": usage.ru_inblock,
+        "write_blocks": usage.ru_oublock,
+        "page_faults": usage.ru_minflt + usage.ru_majflt,
+        "voluntary_switches": usage.ru_nvcsw,
+        "involuntary_switches": usage.ru_nivcsw,
+    }
+
+class Bench:
+    def __init__(self, workdir: Path, code: Path, home: Path):
+        self.workdir = workdir
+        self.code = code
+        self.home = home
+        self.logs = workdir / "logs"
+        self.logs.mkdir(parents=True, exist_ok=True)
+        self.env = {k: v for k, v in os.environ.items() if k != "ORCA_MANAGER_DAEMON"}
+        self.env["HOME"] = str(home)
+        self.env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+    def command(self, argv):
+        return [sys.executable, str(BENCH_DIR / "probe.py"), str(self.code / "orca.py"), *argv]
+
+    def run_once(self, argv, stdin, label):
+        """Run one command and wait for it with wait4() to collect its resource usage."""
+        probe = self.workdir / "probe.json"
+        probe.unlink(missing_ok=True)
+        env = dict(self.env, ORCA_BENCH_PROBE=str(probe))
+        with (self.logs / f"{label}.log").open("wb") as log:
+            started = time.perf_counter()
+            proc = subprocess.Popen(self.command(argv), cwd=self.code, env=env,
+                                    stdin=subprocess.PIPE, stdout=log, stderr=subprocess.STDOUT)
+            if stdin:
+                proc.stdin.write(stdin.encode("utf-8"))
+            proc.stdin.close()
+            _, status, usage = os.wait4(proc.pid, 0)
+            wall = time.perf_counter() - started
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        result = rusage_metrics(usage, wall)
+        result["exit"] = proc.returncode
+        try:
+            result.update(json.loads(probe.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            pass
+        return result
+
+    def count_syscalls(self, argv, stdin):
+        """Syscall totals from one extra run under `strace -c`, or None without strace."""
+        strace = shutil.which("strace")
+        if not strace:
+            return None
+        out = self.workdir / "strace.txt"
+        proc = subprocess.run([strace, "-f", "-c", "-o", str(out), *self.command(argv)], cwd=self.code,
+                              env=self.env, input=stdin or "", text=True, capture_output=True)
+        calls = {}
+        for line in out.read_text(encoding="utf-8").splitlines():
+            parts = line.split()
+            if not parts or not parts[0].replace(".", "", 1).isdigit():
+                continue
+            if parts[-1] == "total":
+                calls["total"] = int(parts[2])
+            elif len(parts) >= 5:
+                calls[parts[-1]] = int(parts[3])
+        return {"syscalls": calls.get("total"), "openat": calls.get("openat", 0) + calls.get("open", 0),
+                "exit": proc.returncode}
+
+    def orca(self, *argv):
+        """Run an unmeasured command (setup)."""
+        subprocess.run(self.command(argv), cwd=self.code, env=self.env, input="", text=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def failed_runs(runs):
+    return [r for r in runs if r["exit"] != 0]
+
+def summarize(runs):
+    return {metric: round(statistics.median(r[metric] for r in runs), 4) for metric in runs[0]
+            if metric != "exit" and isinstance(runs[0][metric], (int, float))}
+
+def source_commit(source: Path):
+    proc = subprocess.run(["git", "-C", str(source), "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    return proc.stdout.strip() or None
+
+def print_results(results):
+    print("\n{:<28} {:>9} {:>9} {:>9} {:>9} {:>6}".format("Command", "wall s", "cpu s", "rss MB", "opens", "exit"))
+    print("-" * 76)
+    for scenario in results["scenarios"]:
+        exits = ",".join(sorted({str(r["exit"]) for r in scenario["runs"]}))
+        if scenario["failed"]:
+            print("{:<28} {:>39} {:>6}".format(scenario["name"], "failed, not timed", exits))
+            continue
+        m = scenario["median"]
+        print("{:<28} {:>9.3f} {:>9.3f} {:>9.1f} {:>9} {:>6}".format(
+            scenario["name"], m["wall_s"], m["user_s"] + m["sys_s"], m["max_rss_mb"], int(m.get("opens", 0)), exits))
+
+def compare(results, previous, threshold):
+    """Print median changes against an earlier results file; returns the number of regressions."""
+    before = {s["name"]: s["median"] for s in previous["scenarios"]}
+    print(f"\nCompared with {previous['source'].get('commit') or previous['source']['path']} ({previous['created']}):")
+    print("{:<28} {:>20} {:>20} {:>20}".format("Command", "wall s", "rss MB", "opens"))
+    print("-" * 92)
+    regressions = 0
+    for scenario in results["scenarios"]:
+        old = before.get(scenario["name"])
+        if not old or scenario["failed"]:
+            continue
+        cells = []
+        for metric in ("wall_s", "max_rss_mb", "opens"):
+            a, b = old.get(metric, 0), scenario["median"].get(metric, 0)
+            change = (b - a) / a * 100 if a else 0.0
+            flag = ""
+            if change > threshold:
+                flag = " ⚠️"
+                regressions += 1
+            cells.append(f"{a:g} → {b:g} ({change:+.0f}%){flag}")
+        print("{:<28} {:>20} {:>20} {:>20}".format(scenario["name"], *cells))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark orca-manager commands against a synthetic library")
+    parser.add_argument("--source", default=str(BENCH_DIR.parent), help="Code tree to benchmark (default: this checkout)")
+    parser.add_argument("--profiles", type=int, default=3000, help="Managed user profiles to generate")
+    parser.add_argument("--vendors", type=int, default=20, help="System vendors to generate")
+    parser.add_argument("--models", type=int, default=8, help="Printer models per vendor")
+    parser.add_argument("--commits", type=int, default=20, help="Commits of local profile history")
+    parser.add_argument("--backups", type=int, default=10, help="Backups to create before measuring")
+    parser.add_argument("--repeat", type=int, default=3, help="Measured runs per command")
+    parser.add_argument("--only", nargs="*", help="Only run these commands (scenario names)")
+    parser.add_argument("--syscalls", action="store_true", help="Also count syscalls with strace (one extra run each)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the generated library")
+    parser.add_argument("--output", default="bench_results.json", help="Results file")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent change reported as a regression")
+    parser.add_argument("--workdir", help="Build the library here and keep it (default: a temporary folder)")
+    args = parser.parse_args()
+
+    source = Path(args.source).resolve()
+    workdir = Path(args.workdir).resolve() if args.workdir else Path(tempfile.mkdtemp(prefix="orca-bench-"))
+    try:
+        code, home = workdir / "code", workdir / "home"
+        shutil.copytree(source, code, ignore=IGNORED)
+        shutil.rmtree(code / "orca_profiles", ignore_errors=True)
+        print(f"📦 Generating {args.profiles} user profiles and {args.vendors} vendors in {workdir}...")
+        started = time.perf_counter()
+        library = synth.generate(home, code, synth.load_templates(source / "orca_profiles" / "default"),
+                                 profiles=args.profiles, vendors=args.vendors, models=args.models,
+                                 commits=args.commits, seed=args.seed)
+        bench = Bench(workdir, code, home)
+        orca_user = home / ".config" / "OrcaSlicer" / "user" / "default"
+        for i in range(args.backups):
+            synth.touch_profiles(orca_user, max(1, library["user_profiles"] // 100), seed=1000 + i)
+            bench.orca("backup", "--no-prune")
+        library["backups"] = args.backups
+        print(f"   done in {time.perf_counter() - started:.1f}s: {json.dumps(library)}")
+
+        sample = min(p.relative_to(orca_user).as_posix() for p in (orca_user / "filament").glob("*.json"))
+        values = {"sample": sample, "sample_name": Path(sample).name,
+                  "now": (datetime.now() + timedelta(minutes=1)).strftime("%Y-%m-%d %H:%M")}
+        results = {
+            "version": RESULTS_VERSION,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+            "source": {"path": str(source), "commit": source_commit(source)},
+            "library": library,
+            "scenarios": [],
+        }
+        for number, (name, argv, stdin, setup) in enumerate(SCENARIOS):
+            if args.only and name not in args.only:
+                continue
+            argv = [a.format(**values) for a in argv]
+            runs = []
+            for i in range(args.repeat):
+                if setup:
+                    where, share = setup
+                    folder = orca_user if where == "orca" else code / "orca_profiles" / "default"
+                    # Per-scenario seeds: the same edit on both sides would leave nothing to push
+                    seed = 2000 + 100 * number + i
+                    synth.touch_profiles(folder, max(1, int(library["user_profiles"] * share)), seed=seed)
+                runs.append(bench.run_once(argv, stdin, f"{name.replace(' ', '_')}-{i}"))
+            # A run that exited non-zero stopped early: its time would not measure the command
+            failed = failed_runs(runs)
+            scenario = {"name": name, "argv": argv, "runs": runs, "failed": bool(failed),
+                        "median": None if failed else summarize(runs)}
+            if args.syscalls:
+                scenario["syscalls"] = bench.count_syscalls(argv, stdin)
+            results["scenarios"].append(scenario)
+            if failed:
+                print(f"❌ {name:<28} exited {failed[0]['exit']} in {len(failed)} of {len(runs)} run(s), "
+                      f"see {bench.logs}/{name.replace(' ', '_')}-*.log (keep them with --workdir)")
+            else:
+                print(f"⏱️  {name:<28} {scenario['median']['wall_s']:.3f}s")
+
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print_results(results)
+        print(f"\n✅ Results written to {args.output}")
+
+        failed = [s["name"] for s in results["scenarios"] if s["failed"]]
+        if failed:
+            print(f"❌ {len(failed)} scenario(s) failed and were not timed: {', '.join(failed)}")
+
+        regressions = 0
+        if args.compare:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+            regressions = compare(results, previous, args.threshold)
+        if failed or regressions:
+            sys.exit(1)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import json
+import random
+import subprocess
+from pathlib import Path
+
+# Synthetic OrcaSlicer library for benchmarks.  User profiles are variations
+# of the sample profiles in orca_profiles/default; the system tree mimics
+# vendor bundles with three levels of inheritance:
+#   fdm_*_common -> "<Vendor> <base>" -> "<Vendor> <variant> @<model>"
+# and a share of the user profiles inherit from it, as Orca's own presets do.
+PROFILE_FOLDERS = ("filament", "machine", "process")
+SHARES = {"filament": 0.6, "process": 0.25, "machine": 0.15}
+FILAMENT_TYPES = ("PLA", "PETG", "ABS", "ASA", "TPU", "PA", "PC")
+LAYER_HEIGHTS = ("0.08", "0.12", "0.16", "0.20", "0.24", "0.28")
+SETTINGS_ID = {"filament": "filament_settings_id", "machine": "printer_settings_id", "process": "print_settings_id"}
+
+def load_templates(profile_root: Path):
+    templates = {}
+    for folder in PROFILE_FOLDERS:
+        templates[folder] = [json.loads(p.read_text(encoding="utf-8")) for p in sorted((profile_root / folder).glob("*.json"))]
+        if not templates[folder]:
+            raise SystemExit(f"No {folder} templates in {profile_root}")
+    return templates
+
+def _write(path: Path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+
+def _nudge(value: str, rng):
+    """Scale a numeric setting by up to ±10%, keeping whole numbers whole; flags and text are kept."""
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    if number <= 1:
+        return value
+    scaled = number * rng.uniform(0.9, 1.1)
+    return str(round(scaled)) if "." not in value else str(round(scaled, 2))
+
+def _vary(data, rng):
+    """Nudge some numeric settings so generated profiles differ in content."""
+    for key, value in data.items():
+        if rng.random() >= 0.05:
+            continue
+        if isinstance(value, list) and all(isinstance(v, str) for v in value):
+            data[key] = [_nudge(v, rng) for v in value]
+        elif isinstance(value, str):
+            data[key] = _nudge(value, rng)
+    return data
+
+def system_tree(orca_root: Path, vendors: int, models: int, rng):
+    """Write the vendor tree; returns {type: [instantiable system profile names]}."""
+    system = orca_root / "system"
+    leaves = {folder: [] for folder in PROFILE_FOLDERS}
+    for folder in PROFILE_FOLDERS:
+        _write(system / "Common" / folder / f"fdm_{folder}_common.json",
+               {"type": folder, "name": f"fdm_{folder}_common", "from": "system", "instantiation": "false",
+                "version": "2.0.0.0"})
+    for v in range(vendors):
+        vendor = f"Vendor{v:03d}"
+        base = system / vendor
+        _write(base / "machine" / f"{vendor} base.json",
+               {"type": "machine", "name": f"{vendor} base", "inherits": "fdm_machine_common", "from": "system",
+                "instantiation": "false", "nozzle_diameter": ["0.4"], "printable_height": "300"})
+        model_names = []
+        for m in range(models):
+            name = f"{vendor} Model{m:02d} 0.4 nozzle"
+            model_names.append(name)
+            leaves["machine"].append(name)
+            _write(base / "machine" / f"{name}.json",
+                   {"type": "machine", "name": name, "inherits": f"{vendor} base", "from": "system",
+                    "instantiation": "true", "printer_model": f"{vendor} Model{m:02d}",
+                    "printable_height": str(200 + 10 * m), "retraction_length": [str(round(rng.uniform(0.3, 2), 2))]})
+        for filament_type in FILAMENT_TYPES:
+            generic = f"{vendor} Generic {filament_type}"
+            _write(base / "filament" / f"{generic}.json",
+                   {"type": "filament", "name": generic, "inherits": "fdm_filament_common", "from": "system",
+                    "instantiation": "false", "filament_type": [filament_type],
+                    "nozzle_temperature": [str(rng.randrange(190, 280))]})
+            for model in model_names:
+                name = f"{generic} @{model}"
+                leaves["filament"].append(name)
+                _write(base / "filament" / f"{name}.json",
+                       {"type": "filament", "name": name, "inherits": generic, "from": "system",
+                        "instantiation": "true", "filament_settings_id": [name], "compatible_printers": [model]})
+        _write(base / "process" / f"{vendor} process base.json",
+               {"type": "process", "name": f"{vendor} process base", "inherits": "fdm_process_common",
+                "from": "system", "instantiation": "false", "wall_loops": "2"})
+        for height in LAYER_HEIGHTS:
+            name = f"{height}mm Standard @{vendor}"
+            leaves["process"].append(name)
+            _write(base / "process" / f"{name}.json",
+                   {"type": "process", "name": name, "inherits": f"{vendor} process base", "from": "system",
+                    "instantiation": "true", "layer_height": height, "compatible_printers": model_names})
+    return leaves
+
+def user_profiles(templates, count: int, leaves, inherit_share: float, rng):
+    """Return {folder/filename: data} for count managed user profiles."""
+    profiles, machines = {}, []
+    for folder in ("machine", "filament", "process"):
+        for i in range(max(1, int(count * SHARES[folder]))):
+            name = f"(ON) Bench {folder} {i:05d}"
+            if leaves[folder] and rng.random() < inherit_share:
+                parent = rng.choice(leaves[folder])
+                data = {"name": name, "inherits": parent, "from": "User", "is_custom_defined": "0",
+                        SETTINGS_ID[folder]: [name] if folder == "filament" else name}
+            else:
+                data = _vary(json.loads(json.dumps(rng.choice(templates[folder]))), rng)
+                data["name"] = name
+                data[SETTINGS_ID[folder]] = [name] if folder == "filament" else name
+                data.pop("inherits", None)
+            if folder == "machine":
+                machines.append(name)
+            elif machines:
+                data["compatible_printers"] = rng.sample(machines, min(3, len(machines)))
+            profiles[f"{folder}/{name}.json"] = data
+    return profiles
+
+def git(cwd: Path, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True,
+                   env={"GIT_AUTHOR_NAME": "bench", "GIT_AUTHOR_EMAIL": "bench@example.com",
+                        "GIT_COMMITTER_NAME": "bench", "GIT_COMMITTER_EMAIL": "bench@example.com",
+                        "HOME": str(cwd), "PATH": "/usr/bin:/bin:/usr/local/bin"})
+
+def generate(home: Path, code: Path, templates, profiles=3000, vendors=20, models=8, commits=20,
+             inherit_share=0.1, diverged=0.05, seed=1):
+    """Create home/.config/OrcaSlicer and a git-tracked local copy in code/orca_profiles; returns a summary."""
+    rng = random.Random(seed)
+    orca_root = home / ".config" / "OrcaSlicer"
+    leaves = system_tree(orca_root, vendors, models, rng)
+    users = user_profiles(templates, profiles, leaves, inherit_share, rng)
+
+    user_root = orca_root / "user" / "default"
+    local_root = code / "orca_profiles" / "default"
+    for rel, data in users.items():
+        _write(user_root / rel, data)
+        _write(local_root / rel, data)
+
+    # History of edits to the local copy; the last round is left uncommitted
+    # on the OrcaSlicer side so diff/fetch/push have something to do
+    git(code, "init", "-q")
+    git(code, "add", "-A", "orca_profiles")
+    git(code, "commit", "-q", "-m", "Initial profiles")
+    rels = sorted(users)
+    for c in range(commits):
+        for rel in rng.sample(rels, max(1, len(rels) // 50)):
+            data = _vary(dict(users[rel]), rng)
+            data["bench_revision"] = str(c)
+            users[rel] = data
+            _write(local_root / rel, data)
+        git(code, "commit", "-q", "-am", f"Tune profiles, round {c + 1}")
+    for rel in rng.sample(rels, int(len(rels) * diverged)):
+        data = dict(users[rel])
+        data["bench_revision"] = "orca"
+        _write(user_root / rel, data)
+
+    return {
+        "user_profiles": len(users),
+        "system_profiles": sum(1 for _ in (orca_root / "system").rglob("*.json")),
+        "vendors": vendors,
+        "commits": commits + 1,
+        "diverged": int(len(rels) * diverged),
+        "inheriting": sum(1 for d in users.values() if "inherits" in d),
+    }
+
+def touch_profiles(folder: Path, count: int, seed: int):
+    """Edit count managed profiles below folder in place (between benchmark runs)."""
+    rng = random.Random(seed)
+    files = sorted(folder.rglob("*.json"))
+    for path in rng.sample(files, min(count, len(files))):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        data["bench_touch"] = str(seed)
+        _write(path, data)
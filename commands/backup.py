@@ -1,39 +1,53 @@
-from datetime import datetime
-import shutil
-from pathlib import Path
+import orca  # Main CLI loader with run_command()
+from core import store
 
-def copy_folder_recursive(src: Path, dst: Path):
-    if not src.exists():
-        return []
-
-    copied_files = []
-    for item in src.rglob("*"):
-        if item.is_dir():
-            continue
-        if not any(marker in item.name for marker in MANAGED_PROFILE_MARKERS):
-            continue
+def register(subparsers):
+    parser = subparsers.add_parser("backup", help="Create a backup of current OrcaSlicer profiles")
+    parser.add_argument("--jobs", type=int, help="Number of parallel copy workers")
+    parser.add_argument("--format", choices=["snapshot", "archive"], default="snapshot",
+                        help="snapshot: deduplicated object store (default); archive: one compressed file")
+    parser.add_argument("--train-dict", action="store_true",
+                        help="Train a new compression dictionary on the current profiles (archive format)")
+    parser.add_argument("--no-prune", action="store_true", help="Do not apply the retention policy after this backup")
 
-        target_path = dst / item.relative_to(src)
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(item, target_path)
-        copied_files.append(item.relative_to(src))
-    return copied_files
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
 
-def register(subparsers):
-    subparsers.add_parser("backup", help="Create a backup of current OrcaSlicer profiles")
+def backup_archive(args):
+    name, stats = store.create_archive(BACKUP_PATH, ORCA_USER_PATH, PROFILE_FOLDERS, MANAGED_PROFILE_MARKERS,
+                                       train=getattr(args, "train_dict", False), jobs=getattr(args, "jobs", None))
+    ratio = stats["raw_bytes"] / stats["archive_bytes"] if stats["archive_bytes"] else 0
+    throughput = stats["raw_bytes"] / stats["seconds"] / (1024 * 1024) if stats["seconds"] else 0
+    dictionary = f"new dictionary {stats['dict']}" if stats["trained"] else f"dictionary {stats['dict']}"
+    print(f"✅ Archive {name}: {stats['files']} file(s), {format_size(stats['raw_bytes'])} -> "
+          f"{format_size(stats['archive_bytes'])} ({ratio:.1f}:1, {dictionary}), "
+          f"{stats['seconds']:.2f}s ({throughput:.1f} MB/s)")
 
-def run(args):
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-    backup_dir = BACKUP_PATH / timestamp / "default"
-    print(f"Backing up OrcaSlicer profiles to: {backup_dir}")
+def backup_snapshot(args):
+    name, results = store.create_snapshot(BACKUP_PATH, ORCA_USER_PATH, PROFILE_FOLDERS, MANAGED_PROFILE_MARKERS,
+                                          jobs=getattr(args, "jobs", None))
 
     for folder in PROFILE_FOLDERS:
-        src = ORCA_USER_PATH / folder
-        dst = backup_dir / folder
-        copied = copy_folder_recursive(src, dst)
-        if copied:
+        rows = [(rel.split("/", 1)[1], status) for rel, status in results if rel.split("/", 1)[0] == folder]
+        if rows:
             print(f"[{folder}]")
             print("{:<60} {:<20}".format("Filename", "Status"))
             print("-" * 80)
-            for file in copied:
-                print("{:<60} {:<20}".format(str(file), "backed up"))
+            for file, status in rows:
+                print("{:<60} {:<20}".format(file, status))
+
+    stored = sum(1 for _, status in results if status == "stored")
+    print(f"✅ Snapshot {name}: {len(results)} file(s), {stored} new object(s) stored.")
+
+def run(args):
+    print(f"Backing up OrcaSlicer profiles to: {BACKUP_PATH}")
+    if getattr(args, "format", "snapshot") == "archive":
+        backup_archive(args)
+    else:
+        backup_snapshot(args)
+    if not getattr(args, "no_prune", False):
+        orca.run_command("prune", {"quiet": True, "jobs": getattr(args, "jobs", None)})
@@ -0,0 +1,79 @@
+import subprocess
+import sys
+import time
+import orca  # Main CLI loader with cli() and load_command_module()
+from core import daemon, gitmeta, jsoncache
+from core.profile_index import open_index
+
+START_TIMEOUT_SECONDS = 10
+
+def register(subparsers):
+    parser = subparsers.add_parser("daemon", help="Start, stop or query the resident orca-manager daemon")
+    parser.add_argument("action", choices=["start", "stop", "status"], help="What to do with the daemon")
+    parser.add_argument("--foreground", action="store_true", help="Serve in this process instead of detaching")
+
+def ping():
+    try:
+        return daemon.request(CACHE_PATH, {"type": "ping"})
+    except OSError:
+        return None
+
+def warm_up():
+    """Load everything the commands reuse between requests."""
+    for entry in orca.load_command_manifest().values():
+        orca.load_command_module(entry["module"])
+    index = open_index(CACHE_PATH, orca.ORCA_PATH)
+    index.refresh()
+    gitmeta.last_commits(GIT_ROOT_PATH, CACHE_PATH / "git_meta.json")
+
+def start(args):
+    status = ping()
+    if status:
+        print(f"ℹ️  Daemon already running (pid {status['pid']}).")
+        return
+
+    if args.foreground:
+        try:
+            with jsoncache.session():
+                warm_up()
+                daemon.serve(CACHE_PATH, orca.cli)
+        except KeyboardInterrupt:
+            pass
+        print("👋 Daemon stopped.")
+        return
+
+    CACHE_PATH.mkdir(parents=True, exist_ok=True)
+    log_file = CACHE_PATH / "daemon.log"
+    with log_file.open("a", encoding="utf-8") as log:
+        subprocess.Popen(
+            [sys.executable, str(LOCAL_ROOT / "orca.py"), "daemon", "start", "--foreground"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            cwd=str(LOCAL_ROOT), start_new_session=True,
+        )
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        status = ping()
+        if status:
+            print(f"✅ Daemon started (pid {status['pid']}), socket {daemon.socket_path(CACHE_PATH)}")
+            print(f"   Use 'orca-manager --daemon <command>' or set {orca.DAEMON_ENV}=1 to use it.")
+            return
+        time.sleep(0.1)
+    print(f"❌ Daemon did not start, see {log_file}")
+    sys.exit(1)
+
+def run(args):
+    if args.action == "start":
+        start(args)
+    elif args.action == "stop":
+        try:
+            daemon.request(CACHE_PATH, {"type": "stop"})
+            print("✅ Daemon stopped.")
+        except OSError:
+            print("ℹ️  No daemon running.")
+    else:
+        status = ping()
+        if not status:
+            print("ℹ️  No daemon running.")
+            return
+        print(f"✅ Daemon running (pid {status['pid']}), up {status['uptime']:.0f}s, "
+              f"{status['served']} command(s) served, socket {daemon.socket_path(CACHE_PATH)}")
@@ -1,14 +1,60 @@
 import difflib
+from collections import defaultdict
 from pathlib import Path
+from core import journal, jsondiff, scancache, trace
+
+GREEN = "\033[32m"
+RED = "\033[31m"
+YELLOW = "\033[33m"
+RESET = "\033[0m"
 
 def register(subparsers):
     parser = subparsers.add_parser("diff", help="Show differences between OrcaSlicer and local profiles")
     parser.add_argument("--all", action="store_true", help="Show all files, including identical ones")
-    parser.add_argument("--details", action="store_true", help="Show line-by-line file diffs for differing files")
+    parser.add_argument("--details", action="store_true", help="Show changed settings (git value -> Orca value) for differing files")
+    parser.add_argument("--changed", action="store_true",
+                        help="Only compare profiles changed in OrcaSlicer since the last --changed diff (needs a running 'watch')")
+
+def print_line_diff(local_file: Path, orca_file: Path, folder: str, filename: str):
+    """Fallback for files that are not valid JSON profiles."""
+    git_lines = local_file.read_text(errors='ignore').splitlines()
+    orca_lines = orca_file.read_text(errors='ignore').splitlines()
+    diff = difflib.unified_diff(
+        git_lines,
+        orca_lines,
+        fromfile=f"git/{folder}/{filename}",
+        tofile=f"orca/{folder}/{filename}",
+        lineterm=""
+    )
+    for line in diff:
+        if line.startswith("+") and not line.startswith("+++"):
+            print(f"    {GREEN}{line}{RESET}")
+        elif line.startswith("-") and not line.startswith("---"):
+            print(f"    {RED}{line}{RESET}")
+        elif line.startswith("@@"):
+            print(f"    {YELLOW}{line}{RESET}")
+        else:
+            print("    " + line)
+
+def print_changes(changes):
+    for change in changes:
+        if change.kind == "added":
+            print(f"    {GREEN}+ {change.key}: {jsondiff.format_value(change.new)}{RESET}")
+        elif change.kind == "removed":
+            print(f"    {RED}- {change.key}: {jsondiff.format_value(change.old)}{RESET}")
+        else:
+            print(f"    {YELLOW}~ {change.key}: {jsondiff.format_value(change.old, 40)} -> "
+                  f"{jsondiff.format_value(change.new, 40)}{RESET}")
 
 def run(args):
     show_all = args.all
     show_diff = args.details
+    changed_settings = defaultdict(int)
+    changed_paths, position = None, None
+    if args.changed:
+        changed_paths, position = journal.read_changes(CACHE_PATH, ORCA_USER_PATH, "diff")
+        if changed_paths is None:
+            print("ℹ️  No change journal from a running 'watch' session, comparing all profiles.")
 
     print("Comparing OrcaSlicer profiles with local git-tracked profiles:")
     print("{:<60} {:<20}".format("Filename", "Status"))
@@ -18,51 +64,62 @@ def run(args):
         orca_dir = ORCA_USER_PATH / folder
         local_dir = LOCAL_PROFILE_PATH / folder
 
-        orca_files = {f.name: f for f in orca_dir.rglob("*") if f.is_file() and any(m in f.name for m in MANAGED_PROFILE_MARKERS)}
-        local_files = {f.name: f for f in local_dir.rglob("*") if f.is_file() and any(m in f.name for m in MANAGED_PROFILE_MARKERS)}
+        if changed_paths is None:
+            with trace.span("scan", folder=folder):
+                orca_files = {f.name: f for f in scancache.files(orca_dir) if any(m in f.name for m in MANAGED_PROFILE_MARKERS)}
+                local_files = {f.name: f for f in scancache.files(local_dir) if any(m in f.name for m in MANAGED_PROFILE_MARKERS)}
+        else:
+            rels = [rel.split("/", 1)[1] for rel in changed_paths if rel.split("/", 1)[0] == folder]
+            candidates = [(orca_dir / rel, local_dir / rel) for rel in rels
+                          if any(m in Path(rel).name for m in MANAGED_PROFILE_MARKERS)]
+            orca_files = {f.name: f for f, _ in candidates if f.is_file()}
+            local_files = {f.name: f for _, f in candidates if f.is_file()}
 
         all_filenames = set(orca_files.keys()).union(local_files.keys())
 
         for filename in sorted(all_filenames):
-            status = []
             orca_file = orca_files.get(filename)
             local_file = local_files.get(filename)
+            changes = []
+            parse_error = None
 
             if orca_file and not local_file:
-                status.append("only in Orca")
+                status = "only in Orca"
             elif local_file and not orca_file:
-                status.append("only in Git")
-            elif orca_file and local_file:
-                if orca_file.read_bytes() != local_file.read_bytes():
-                    status.append("differs")
-                else:
-                    status.append("same")
+                status = "only in Git"
+            elif filename.endswith(".json"):
+                try:
+                    status, changes = jsondiff.compare_files(local_file, orca_file)
+                except (OSError, ValueError) as e:
+                    status, parse_error = "differs", e
+            else:
+                status = "same" if jsondiff.files_identical(local_file, orca_file) else "differs"
 
-            if not show_all and "same" in status:
+            if not show_all and status in ("same", "equivalent"):
                 continue
 
-            print("{:<60} {:<20}".format(filename, ", ".join(status)))
+            label = f"differs ({len(changes)} settings)" if changes else status
+            print("{:<60} {:<20}".format(filename, label))
+            for change in changes:
+                changed_settings[change.key] += 1
 
-            if "differs" in status and show_diff and orca_file and local_file:
-                print("    --- Git version vs Orca version ---")
-                try:
-                    git_lines = local_file.read_text(errors='ignore').splitlines()
-                    orca_lines = orca_file.read_text(errors='ignore').splitlines()
-                    diff = difflib.unified_diff(
-                        git_lines,
-                        orca_lines,
-                        fromfile=f"git/{folder}/{filename}",
-                        tofile=f"orca/{folder}/{filename}",
-                        lineterm=""
-                    )
-                    for line in diff:
-                        if line.startswith("+") and not line.startswith("+++"):
-                            print("    \033[32m" + line + "\033[0m")  # green
-                        elif line.startswith("-") and not line.startswith("---"):
-                            print("    \033[31m" + line + "\033[0m")  # red
-                        elif line.startswith("@@"):
-                            print("    \033[33m" + line + "\033[0m")  # yellow
-                        else:
-                            print("    " + line)
-                except Exception as e:
-                    print(f"    [Error showing diff: {e}]")
+            if status == "differs" and show_diff:
+                if changes:
+                    print("    --- Git value -> Orca value ---")
+                    print_changes(changes)
+                else:
+                    if parse_error:
+                        print(f"    [Not a valid profile ({parse_error}), showing line diff]")
+                    try:
+                        print_line_diff(local_file, orca_file, folder, filename)
+                    except Exception as e:
+                        print(f"    [Error showing diff: {e}]")
+
+    journal.commit_cursor(CACHE_PATH, "diff", position)
+
+    if show_diff and changed_settings:
+        print("\nChanged settings across all profiles:")
+        print("{:<60} {:<20}".format("Setting", "Profiles"))
+        print("-" * 80)
+        for key, count in sorted(changed_settings.items(), key=lambda item: (-item[1], item[0])):
+            print("{:<60} {:<20}".format(key, count))
@@ -1,130 +1,126 @@
-import shutil
+import sys
 from pathlib import Path
-from datetime import datetime
-import pandas as pd
-
-def copy_folder_recursive(src: Path, dst: Path, match_filter: str = None):
-    if not src.exists():
-        return []
-
-    copied_files = []
-    for item in src.rglob("*.json"):
-        if item.is_dir():
-            continue
-        if not any(marker in item.name for marker in MANAGED_PROFILE_MARKERS):
-            continue
-        if match_filter and match_filter.lower() not in item.name.lower():
-            continue
-
-        target_path = dst / item.relative_to(src)
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(item, target_path)
-        copied_files.append(item.relative_to(src))
-    return copied_files
-
-def compare_file_status(src_file: Path, dst_file: Path):
-    if not dst_file.exists():
-        return "new"
-    orca_time = src_file.stat().st_mtime
-    local_time = dst_file.stat().st_mtime
-    if orca_time > local_time:
-        return "updated in orca"
-    elif local_time > orca_time:
-        return "newer locally"
-    else:
-        return "same"
+
+from core import copier, journal, syncstate
+
+RESET = "\033[0m"
+GREEN = "\033[92m"
+BLUE = "\033[94m"
+RED = "\033[91m"
+
+FETCH_STATUS = {
+    syncstate.ORCA_ONLY: "new",
+    syncstate.ORCA_CHANGED: "updated in orca",
+    syncstate.LOCAL_CHANGED: "newer locally",
+    syncstate.CONFLICT: "conflict",
+}
 
 def register(subparsers):
     parser = subparsers.add_parser("fetch", help="Fetch profiles from OrcaSlicer to local folder")
     parser.add_argument("--filter", help="Optional string to match part of profile filename")
     parser.add_argument("--force", action="store_true", help="Force fetch even if local files are newer")
     parser.add_argument("--skip-newer", action="store_true", help="Skip files that are newer locally")
+    parser.add_argument("--jobs", type=int, help="Number of parallel copy workers")
+    parser.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+    parser.add_argument("--changed", action="store_true",
+                        help="Only consider profiles changed since the last --changed fetch (needs a running 'watch')")
 
 def run(args):
-    match = args.filter or ""
-    fetch_summary = []
-
-    for folder in PROFILE_FOLDERS:
-        src = ORCA_USER_PATH / folder
-        dst = LOCAL_PROFILE_PATH / folder
-
-        for f in src.rglob("*.json"):
-            if not any(marker in f.name for marker in MANAGED_PROFILE_MARKERS):
-                continue
-            if match and match.lower() not in f.name.lower():
-                continue
-
-            rel_path = f.relative_to(src)
-            dst_file = dst / rel_path
-            status = compare_file_status(f, dst_file)
-
-            fetch_summary.append({
-                "Folder": folder,
-                "Filename": str(rel_path),
-                "Status": status
-            })
+    if fetch(args):
+        sys.exit(1)
 
+def fetch(args):
+    """Fetch profiles as described by args; returns 1 if the fetch failed or was aborted, else 0."""
+    match = args.filter or ""
+    manifest_path = CACHE_PATH / "sync_manifest.json"
+    manifest = syncstate.load_manifest(manifest_path)
+
+    paths = getattr(args, "paths", None)
+    position = None
+    unmatched = []  # changes outside --filter stay pending for a later --changed fetch
+    if getattr(args, "changed", False):
+        paths, position = journal.read_changes(CACHE_PATH, ORCA_USER_PATH, "fetch")
+        if paths is None:
+            print("ℹ️  No change journal from a running 'watch' session, scanning all profiles.")
+        elif match:
+            unmatched = [rel for rel in paths if match.lower() not in Path(rel).name.lower()]
+
+    if paths is None:
+        orca_files = syncstate.scan_profiles(ORCA_USER_PATH, PROFILE_FOLDERS, MANAGED_PROFILE_MARKERS, match)
+        local_files = syncstate.scan_profiles(LOCAL_PROFILE_PATH, PROFILE_FOLDERS, MANAGED_PROFILE_MARKERS, match)
+    else:
+        orca_files = syncstate.profiles_from_paths(ORCA_USER_PATH, paths, PROFILE_FOLDERS, MANAGED_PROFILE_MARKERS, match)
+        local_files = syncstate.profiles_from_paths(LOCAL_PROFILE_PATH, paths, PROFILE_FOLDERS, MANAGED_PROFILE_MARKERS, match)
+    plan = syncstate.SyncPlan(manifest, ORCA_USER_PATH, LOCAL_PROFILE_PATH).build(orca_files, {
+        rel: f for rel, f in local_files.items() if rel in orca_files
+    })
+
+    if not plan.items:
+        journal.commit_cursor(CACHE_PATH, "fetch", position, pending=unmatched)
+        if paths is not None:
+            print("✅ No matching profiles changed since the last --changed fetch.")
+        else:
+            print("ℹ️  No matching profiles found.")
+        return 0  # nothing to fetch is not a failure
+
+    fetch_summary = [item for item in plan.items if item["state"] in FETCH_STATUS]
+    unchanged = len(plan.items) - len(fetch_summary)
     if not fetch_summary:
-        print("❌ No matching profiles found.")
-        return
+        syncstate.save_manifest(manifest_path, manifest)
+        journal.commit_cursor(CACHE_PATH, "fetch", position, pending=unmatched)
+        print(f"✅ All {unchanged} matching profile(s) are already up to date.")
+        return 0
 
     # Show preview table
-    df = pd.DataFrame(fetch_summary)
     print("\nThe following profiles will be fetched:\n")
-    RESET = "\033[0m"
-    GREEN = "\033[92m"
-    BLUE = "\033[94m"
-    RED = "\033[91m"
     newer_local = False
     print(f"{'Folder':<12} {'Filename':<90} {'Status':<20}")
     print("-" * 130)
-    for row in fetch_summary:
+    for item in fetch_summary:
         color = ""
-        status = row['Status']
-        if status == "newer locally":
+        status = FETCH_STATUS[item["state"]]
+        if item["state"] in (syncstate.LOCAL_CHANGED, syncstate.CONFLICT):
             color = RED
             newer_local = True
-        elif status == "updated in orca":
+        elif item["state"] == syncstate.ORCA_CHANGED:
             color = BLUE
 
-        print(f"{color}{row['Folder']:<12} {row['Filename']:<90} {status:<20}{RESET}")
+        folder, filename = item["rel"].split("/", 1)
+        print(f"{color}{folder:<12} {filename:<90} {status:<20}{RESET}")
+    if unchanged:
+        print(f"({unchanged} unchanged profile(s) skipped)")
 
     if newer_local and not args.force:
         print(f"{RED}⚠️  Warning: Some local profiles are newer than the versions in OrcaSlicer.")
         print("   Fetching will overwrite these changes and the newer local versions will be lost.")
         print(f"   If you want to keep your local edits, consider pushing or backing up before proceeding.{RESET}")
         if not args.skip_newer:
-            return
-
-    confirm = input("\nContinue with fetch? (yes/no): ").strip().lower()
-    if confirm != "yes":
-        print("❌ Aborted.")
-        return
-
-    for folder in PROFILE_FOLDERS:
-        src = ORCA_USER_PATH / folder
-        dst = LOCAL_PROFILE_PATH / folder
-        copied = []
-        for f in src.rglob("*.json"):
-            if not any(marker in f.name for marker in MANAGED_PROFILE_MARKERS):
-                continue
-            if match and match.lower() not in f.name.lower():
-                continue
-
-            rel_path = f.relative_to(src)
-            dst_file = dst / rel_path
-            status = compare_file_status(f, dst_file)
-
-            if args.skip_newer and status == "newer locally":
-                continue
-
-            target_path = dst / rel_path
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(f, target_path)
-            copied.append(rel_path)
-
-        if copied:
-            print("\n{:<60} {:<20}".format("Filename", "Status"))
-            print("-" * 80)
-            for file in copied:
-                print("{:<60} {:<20}".format(str(file), "fetched"))
+            return 1
+
+    if not getattr(args, "yes", False):
+        confirm = input("\nContinue with fetch? (yes/no): ").strip().lower()
+        if confirm != "yes":
+            print("❌ Aborted.")
+            return 1
+
+    to_copy = [item for item in fetch_summary
+               if not (args.skip_newer and item["state"] in (syncstate.LOCAL_CHANGED, syncstate.CONFLICT))]
+    results = copier.copy_files([(item["orca"], LOCAL_PROFILE_PATH / item["rel"]) for item in to_copy], args.jobs)
+    for item, result in zip(to_copy, results):
+        if result.ok:
+            plan.record(item["rel"], item.get("orca_hash"))
+    syncstate.save_manifest(manifest_path, manifest)
+    skipped = [item["rel"] for item in fetch_summary if item not in to_copy]
+    journal.commit_cursor(CACHE_PATH, "fetch", position, pending=skipped + unmatched)
+
+    if results:
+        print("\n{:<60} {:<20}".format("Filename", "Status"))
+        print("-" * 80)
+        for item, result in zip(to_copy, results):
+            status = "fetched" if result.ok else f"failed: {result.error}"
+            print("{:<60} {:<20}".format(item["rel"], status))
+    failed = sum(1 for result in results if not result.ok)
+    if failed:
+        print(f"{RED}❌ {failed} profile(s) could not be fetched.{RESET}")
+        return 1
+    return 0
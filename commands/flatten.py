@@ -1,35 +1,39 @@
 import json
-from pathlib import Path
 import sys
+from pathlib import Path
 import orca  # Main CLI loader with run_command()
 from textwrap import wrap
+from core import jsoncache, scancache
+from core.inherit import InheritanceError, InheritanceResolver
+from core.profile_index import open_index
 
 def build_global_name_index(orca_root: Path):
-    """Index all JSON files under ORCA_PATH by their internal 'name' value."""
-    name_map = {}
-    for file in orca_root.rglob("*.json"):
-        try:
-            with file.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                profile_name = data.get("name")
-                if profile_name:
-                    name_map[profile_name] = file
-        except Exception as e:
-            print(f"⚠️ Failed to parse {file}: {e}")
-    return name_map
+    """Index all JSON files under ORCA_PATH by their internal 'name' value.
+
+    Backed by the persistent profile index, so only files that changed since
+    the last run are parsed again.  Parents are looked up in the inheriting
+    profile's vendor folder first (see NameIndex).
+    """
+    index = open_index(CACHE_PATH, orca_root)
+    _, _, errors = index.refresh()
+    for file, error in errors:
+        print(f"⚠️ Failed to parse {file}: {error}")
+    return index.name_index()
 
 def load_profiles_in_folder(folder: Path):
     profiles = {}
-    for file in folder.rglob("*.json"):
+    for file in scancache.files(folder):
+        if not file.name.endswith(".json"):
+            continue
         try:
-            with file.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                profiles[file.name] = data
+            profiles[file.name] = jsoncache.load(file)
         except Exception as e:
             print(f"⚠️ Could not load {file.name}: {e}")
     return profiles
 
-def flatten_inherited_profiles(name_map, profiles):
+def flatten_inherited_profiles(name_map, profiles, resolver=None, folder=None):
+    """Merge every inheriting profile with its full chain of ancestors."""
+    resolver = resolver or InheritanceResolver(name_map.get)
     flattened_results = {}
     summary = []
 
@@ -38,80 +42,85 @@ def flatten_inherited_profiles(name_map, profiles):
             continue
 
         inherits_from = profile["inherits"]
-        base_file = name_map.get(inherits_from)
-
-        if not base_file or not base_file.exists():
-            print(f"⚠️ Skipping {filename}, base profile not found: {inherits_from}")
-            continue
-
         try:
-            with base_file.open("r", encoding="utf-8") as bf:
-                base_data = json.load(bf)
-        except Exception as e:
-            print(f"⚠️ Cannot read inherited base {base_file}: {e}")
+            flattened, chain = resolver.merge(profile, near=folder / filename if folder else None)
+        except InheritanceError as e:
+            print(f"⚠️ Skipping {filename}: {e}")
             continue
 
-        flattened = base_data.copy()
-        flattened.update(profile)
-        flattened.pop("inherits", None)
-
         flattened_results[filename] = flattened
 
-        added_keys = set(base_data.keys()) - set(profile.keys())
+        added_keys = set(flattened.keys()) - set(profile.keys())
         summary.append({
             "target": filename,
             "inherits_from": inherits_from,
+            "chain": chain,
             "added_keys": sorted(added_keys)
         })
 
     return summary, flattened_results
 
 def register(subparsers):
-    subparsers.add_parser("flatten", help="Make inherited profiles standalone in OrcaSlicer")
+    parser = subparsers.add_parser("flatten", help="Make inherited profiles standalone in OrcaSlicer")
+    parser.add_argument("--type", choices=PROFILE_FOLDERS + ["all"], help="Profile type to flatten (skips the prompt)")
+    parser.add_argument("--yes", action="store_true", help="Do not ask for confirmation before writing")
 
 def run(args):
     print("🔧 Flatten OrcaSlicer Profiles")
-    print("Available types: filament, machine, process")
-    profile_type = input("Select profile type to flatten: ").strip().lower()
+    profile_type = getattr(args, "type", None)
+    if not profile_type:
+        print("Available types: filament, machine, process")
+        profile_type = input("Select profile type to flatten: ").strip().lower()
 
-    if profile_type not in PROFILE_FOLDERS:
+    if profile_type not in PROFILE_FOLDERS + ["all"]:
         print("❌ Invalid profile type selected.")
-        return
+        sys.exit(1)
+    profile_types = PROFILE_FOLDERS if profile_type == "all" else [profile_type]
 
     # Build global name → file index from all of ORCA_PATH
     name_index = build_global_name_index(orca.ORCA_PATH)
+    # One resolver for all types, so shared ancestors are merged only once
+    resolver = InheritanceResolver(name_index.get)
 
-    # Load only profiles of the selected type (user folder only)
-    target_folder = ORCA_USER_PATH / profile_type
-    profiles = load_profiles_in_folder(target_folder)
+    pending = []
+    for current_type in profile_types:
+        # Load only profiles of the selected type (user folder only)
+        target_folder = ORCA_USER_PATH / current_type
+        profiles = load_profiles_in_folder(target_folder)
 
-    # Identify flattenable profiles
-    summary, results = flatten_inherited_profiles(name_index, profiles)
+        # Identify flattenable profiles
+        summary, results = flatten_inherited_profiles(name_index, profiles, resolver, target_folder)
 
-    if not summary:
-        print(f"✅ No inherited {profile_type} profiles found. Nothing to flatten.")
-        return
+        if not summary:
+            print(f"✅ No inherited {current_type} profiles found. Nothing to flatten.")
+            continue
+
+        print(f"\nThe following {current_type} profiles will be flattened directly in OrcaSlicer:\n")
+        for item in summary:
+            print(f"- {item['target']} (inherits: {' -> '.join(item['chain'])})")
+            if item['added_keys']:
+                print("  + Will include keys:")
+                for line in wrap(", ".join(item['added_keys']), width=80):
+                    print(f"    {line}")
+        pending.append((current_type, target_folder, results))
 
-    print(f"\nThe following {profile_type} profiles will be flattened directly in OrcaSlicer:\n")
-    for item in summary:
-        print(f"- {item['target']} (inherits: {item['inherits_from']})")
-        if item['added_keys']:
-            print("  + Will include keys:")
-            for line in wrap(", ".join(item['added_keys']), width=80):
-                print(f"    {line}")
-
-    confirm = input("\nProceed with flattening and overwrite Orca files? (yes/no): ").strip().lower()
-    if confirm != "yes":
-        print("❌ Aborted.")
+    if not pending:
         return
 
+    if not getattr(args, "yes", False):
+        confirm = input("\nProceed with flattening and overwrite Orca files? (yes/no): ").strip().lower()
+        if confirm != "yes":
+            print("❌ Aborted.")
+            sys.exit(1)
+
     # Backup all profiles before flattening
     orca.run_command("backup")
 
     # Write flattened profiles back to original user folder
-    for filename, data in results.items():
-        file_path = target_folder / filename
-        with file_path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+    for current_type, target_folder, results in pending:
+        for filename, data in results.items():
+            file_path = target_folder / filename
+            with file_path.open("w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
 
-    print(f"\n✅ Flattening complete for {profile_type} profiles.")
+        print(f"\n✅ Flattening complete for {current_type} profiles.")
@@ -0,0 +1,212 @@
+import json
+import sys
+from pathlib import Path
+
+import orca  # Main CLI loader with run_command()
+from core import generator, jsoncache, scancache
+from core.fsutil import is_managed, write_json_atomic
+from core.generator import SpecError
+from core.profile_index import open_index
+
+# What each spec generated last time (per spec file and output folder), so a
+# profile whose name changed or whose matrix value was dropped is renamed or
+# removed, and the references to it follow.
+STATE_VERSION = 1
+
+def register(subparsers):
+    parser = subparsers.add_parser("generate", help="Generate profiles from a base profile and a parameter matrix")
+    parser.add_argument("spec", help="Generator spec (JSON) with the base profile, matrix, overrides and name template")
+    parser.add_argument("--orca", action="store_true", help="Write into OrcaSlicer's user folder (after a backup) instead of the local repo")
+    parser.add_argument("--dry-run", action="store_true", help="Only show what would be written")
+    parser.add_argument("--all", action="store_true", help="Also list generated profiles that are unchanged")
+    parser.add_argument("--force", action="store_true", help="Overwrite existing profiles this spec did not generate")
+    parser.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+
+def load_state(path: Path):
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"version": STATE_VERSION, "specs": {}}
+
+def load_profiles(root: Path):
+    """{"folder/file.json": data} for every profile in root's profile folders."""
+    profiles = {}
+    for folder in PROFILE_FOLDERS:
+        for f in scancache.files(root / folder):
+            if not f.name.endswith(".json"):
+                continue
+            try:
+                data = jsoncache.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not load {f.name}: {e}")
+                continue
+            if isinstance(data, dict):
+                profiles[f"{folder}/{f.relative_to(root / folder).as_posix()}"] = data
+    return profiles
+
+def find_base(gen, spec_dir: Path, profiles, root: Path):
+    """The base profile's data: a file (relative to the spec) or a profile name in the output folder or OrcaSlicer."""
+    if gen.base.endswith(".json"):
+        path = spec_dir / gen.base
+        try:
+            return jsoncache.load(path)
+        except (OSError, ValueError) as e:
+            raise SpecError(f"{gen.id}: cannot load base {path}: {e}")
+    searched = [profiles] if root == ORCA_USER_PATH else [profiles, load_profiles(ORCA_USER_PATH)]
+    for candidates in searched:
+        for rel, data in candidates.items():
+            if rel.split("/", 1)[0] == gen.type and data.get("name") == gen.base:
+                return data
+    raise SpecError(f"{gen.id}: no {gen.type} profile named '{gen.base}'")
+
+def known_names(profiles):
+    """Profile names by type: the output folder plus everything in the OrcaSlicer profile index."""
+    names = {folder: set() for folder in PROFILE_FOLDERS}
+    for rel, data in profiles.items():
+        names[rel.split("/", 1)[0]].add(data.get("name"))
+    index = open_index(CACHE_PATH, orca.ORCA_PATH)
+    index.refresh()
+    for folder in PROFILE_FOLDERS:
+        names[folder].update(row["name"] for row in index.profiles(folder))
+    return names
+
+def plan(generators, spec_dir: Path, root: Path, previous, force=False):
+    """Work out every change; returns (writes {rel: data}, statuses {rel: status}, stale [rel], records, warnings)."""
+    on_disk = load_profiles(root)
+    profiles = dict(on_disk)
+    ours = {record["rel"] for records in previous.values() for record in records.values()}
+    outputs, records, extend, warnings = {}, {}, {}, []
+
+    for gen in generators:
+        base = find_base(gen, spec_dir, profiles, root)
+        records[gen.id] = {}
+        for key, data in generator.build(gen, base):
+            rel = f"{gen.type}/{data['name']}.json"
+            if rel in outputs:
+                raise SpecError(f"{gen.id}: '{data['name']}' is also generated by another generator")
+            if rel in on_disk and rel not in ours and not force:
+                raise SpecError(f"{gen.id}: {rel} already exists and was not generated by this spec (--force overwrites it)")
+            if not is_managed(data["name"], MANAGED_PROFILE_MARKERS):
+                warnings.append(f"{rel}: name has no managed marker ({', '.join(MANAGED_PROFILE_MARKERS)}), fetch/push will ignore it")
+            outputs[rel] = profiles[rel] = data
+            records[gen.id][key] = {"rel": rel, "name": data["name"]}
+        if gen.extend_compatible:
+            generated = [r["name"] for r in records[gen.id].values() if r["name"] != base.get("name")]
+            extend[(generator.COMPATIBLE_KEYS[gen.type], base.get("name"))] = generated
+
+    # Profiles generated last time under another name, or not at all any more
+    renames, removed, stale = {}, set(), []
+    bases = {gen.base for gen in generators}
+    for gen_id, old_records in previous.items():
+        for key, old in old_records.items():
+            new = records.get(gen_id, {}).get(key)
+            if new and new["name"] == old["name"]:
+                continue
+            if old["name"] in bases:
+                warnings.append(f"{old['rel']}: no longer generated but kept, it is the base of a generator")
+                continue
+            if old["rel"] in on_disk and old["rel"] not in outputs:
+                if generator.content_hash(on_disk[old["rel"]]) != old.get("hash"):
+                    warnings.append(f"{old['rel']}: edited since it was generated, left in place")
+                    continue
+                stale.append(old["rel"])
+                del profiles[old["rel"]]
+            if new:
+                renames[old["name"]] = new["name"]
+            else:
+                removed.add(old["name"])
+
+    writes, statuses = {}, {}
+    for rel, data in profiles.items():
+        updated, problems = generator.relink(data, renames, removed, extend)
+        warnings.extend(f"{rel}: {problem}" for problem in problems)
+        if updated is not None:
+            data = profiles[rel] = updated
+        if rel not in outputs and updated is None:
+            continue
+        if rel not in on_disk:
+            statuses[rel] = "new"
+        elif on_disk[rel] == data:
+            statuses[rel] = "unchanged"
+        else:
+            statuses[rel] = "updated" if rel in outputs else "references updated"
+        if statuses[rel] != "unchanged":
+            writes[rel] = data
+    for rel in stale:
+        statuses[rel] = "removed"
+
+    names = known_names(profiles)
+    for rel in outputs:
+        for folder, key in generator.COMPATIBLE_KEYS.items():
+            for name in profiles[rel].get(key) or []:
+                if name not in names[folder]:
+                    warnings.append(f"{rel}: {key} lists unknown {folder} profile '{name}'")
+    for gen_id in records:
+        for record in records[gen_id].values():
+            record["hash"] = generator.content_hash(profiles[record["rel"]])
+    return writes, statuses, stale, records, warnings
+
+def run(args):
+    spec_path = Path(args.spec).resolve()
+    root = ORCA_USER_PATH if getattr(args, "orca", False) else LOCAL_PROFILE_PATH
+    state_path = CACHE_PATH / "generate_state.json"
+    state = load_state(state_path)
+    state_key = f"{spec_path}|{root}"
+
+    print(f"🏭 Generating profiles from {spec_path.name} into {root}...")
+    try:
+        with spec_path.open("r", encoding="utf-8") as f:
+            spec = json.load(f)
+        generators = generator.parse_spec(spec)
+        writes, statuses, stale, records, warnings = plan(
+            generators, spec_path.parent, root, state["specs"].get(state_key, {}), getattr(args, "force", False))
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    counts = {}
+    for status in statuses.values():
+        counts[status] = counts.get(status, 0) + 1
+    shown = [(rel, status) for rel, status in sorted(statuses.items()) if status != "unchanged" or getattr(args, "all", False)]
+    if shown:
+        print("\n{:<70} {:<20}".format("Profile", "Status"))
+        print("-" * 90)
+        for rel, status in shown:
+            print("{:<70} {:<20}".format(rel, status))
+    for warning in warnings:
+        print(f"⚠️  {warning}")
+    total = sum(len(r) for r in records.values())
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"\n{total} profile(s) from {len(generators)} generator(s): {summary}.")
+
+    if getattr(args, "dry_run", False):
+        print("ℹ️  Dry run: nothing written.")
+        return
+    if not writes and not stale:
+        state["specs"][state_key] = records
+        write_json_atomic(state_path, state)
+        print("✅ All generated profiles are up to date.")
+        return
+
+    if not getattr(args, "yes", False):
+        confirm = input(f"\nWrite {len(writes)} and remove {len(stale)} profile(s) in {root}? (yes/no): ").strip().lower()
+        if confirm != "yes":
+            print("❌ Aborted.")
+            sys.exit(1)
+    if root == ORCA_USER_PATH:
+        orca.run_command("backup")
+
+    for rel, data in sorted(writes.items()):
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+    for rel in stale:
+        (root / rel).unlink(missing_ok=True)
+    state["specs"][state_key] = records
+    write_json_atomic(state_path, state)
+    print(f"✅ Wrote {len(writes)} profile(s), removed {len(stale)}.")
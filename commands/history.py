@@ -1,9 +1,37 @@
 import subprocess
+from datetime import datetime
 from pathlib import Path
+from core import blame, jsondiff, trace
 
 def register(subparsers):
     parser = subparsers.add_parser("history", help="Show Git commit history of a profile")
     parser.add_argument("filename", nargs="?", help="Profile filename (optional)")
+    parser.add_argument("--blame", action="store_true", help="Show which commit and author last changed each setting")
+    parser.add_argument("--key", help="Show the change timeline of one setting (e.g. nozzle_temperature)")
+
+def short_date(date: str):
+    return datetime.fromisoformat(date).strftime("%Y-%m-%d %H:%M")
+
+def print_blame(result):
+    print("{:<45} {:<9} {:<20} {:<17} {}".format("Setting", "Commit", "Author", "Date", "Value"))
+    print("-" * 130)
+    for key, event in sorted(result["blame"].items()):
+        value = "(removed)" if event["kind"] == "removed" else jsondiff.format_value(event["new"], 35)
+        print("{:<45} {:<9} {:<20} {:<17} {}".format(key, event["short"], event["author"][:20], short_date(event["date"]), value))
+
+def print_timeline(result, key):
+    events = result["timeline"].get(key)
+    if not events:
+        print(f"  No changes to '{key}' found.")
+        return
+    for event in events:
+        if event["kind"] == "added":
+            change = f"set to {jsondiff.format_value(event['new'])}"
+        elif event["kind"] == "removed":
+            change = f"removed (was {jsondiff.format_value(event['old'])})"
+        else:
+            change = f"{jsondiff.format_value(event['old'], 40)} -> {jsondiff.format_value(event['new'], 40)}"
+        print(f"  {event['short']}  {short_date(event['date'])}  {event['author']:<20} {change}")
 
 def run(args):
     if args.filename:
@@ -45,15 +73,30 @@ def run(args):
         return
 
     for folder, path in matches:
+        if args.blame or args.key:
+            try:
+                result = blame.profile_blame(GIT_ROOT_PATH, path, CACHE_PATH / "history")
+            except blame.BlameError as e:
+                print(f"\n📜 Setting history for: {folder}/{path.name}\n")
+                print(f"  Error reading history: {e}")
+                continue
+            print(f"\n📜 Setting history for: {folder}/{path.name} ({result['revisions']} revision(s))\n")
+            if args.key:
+                print_timeline(result, args.key)
+            else:
+                print_blame(result)
+            continue
+
         print(f"\n📜 Git history for: {folder}/{path.name}\n")
         try:
-            result = subprocess.run(
-                ["git", "log", "--", str(path)],
-                cwd=GIT_ROOT_PATH,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
+            with trace.span("git", cmd="log"):
+                result = subprocess.run(
+                    ["git", "log", "--", str(path)],
+                    cwd=GIT_ROOT_PATH,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                )
             if result.stdout:
                 print(result.stdout)
             else:
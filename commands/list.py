@@ -1,39 +1,48 @@
 from datetime import datetime
 from pathlib import Path
-import subprocess
-
-def get_git_last_editor(file_path: Path):
-    try:
-        result = subprocess.run(
-            ["git", "log", "-1", "--pretty=format:%an", str(file_path)],
-            cwd=GIT_ROOT_PATH,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.DEVNULL,
-            text=True
-        )
-        return result.stdout.strip() if result.stdout else "-"
-    except Exception:
-        return "-"
+from core import gitmeta, journal, scancache, trace
 
 def register(subparsers):
-    subparsers.add_parser("list", help="List all managed profiles in OrcaSlicer")
+    parser = subparsers.add_parser("list", help="List all managed profiles in OrcaSlicer")
+    parser.add_argument("--changed", action="store_true",
+                        help="Only list profiles changed since the last --changed list (needs a running 'watch')")
 
 def run(args):
     print("Listing managed profiles in OrcaSlicer:")
+    changed_paths, position = None, None
+    if getattr(args, "changed", False):
+        changed_paths, position = journal.read_changes(CACHE_PATH, ORCA_USER_PATH, "list")
+        if changed_paths is None:
+            print("ℹ️  No change journal from a running 'watch' session, listing all profiles.")
+
+    # Last commit of every local profile, from one (cached) git log walk
+    commits = gitmeta.last_commits(GIT_ROOT_PATH, CACHE_PATH / "git_meta.json")
 
     found = False
     for folder in PROFILE_FOLDERS:
         src = ORCA_USER_PATH / folder
-        files = [f for f in src.rglob("*") if f.is_file() and any(marker in f.name for marker in MANAGED_PROFILE_MARKERS)]
+        if changed_paths is None:
+            with trace.span("scan", root=src):
+                files = [f for f in scancache.files(src) if any(marker in f.name for marker in MANAGED_PROFILE_MARKERS)]
+        else:
+            files = [ORCA_USER_PATH / rel for rel in changed_paths if rel.split("/", 1)[0] == folder]
+            files = [f for f in files if f.is_file() and any(marker in f.name for marker in MANAGED_PROFILE_MARKERS)]
         if files:
             found = True
             print(f"\n[{folder}]")
-            print("{:<60} {:<20} {:<20}".format("Filename", "Modified", "Last Edited By"))
-            print("-" * 100)
+            print("{:<60} {:<20} {:<20} {:<20} {:<9}".format("Filename", "Modified", "Last Edited By", "Commit Date", "Commit"))
+            print("-" * 133)
             for f in sorted(files):
                 modified = datetime.fromtimestamp(f.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-                git_author = get_git_last_editor(LOCAL_PROFILE_PATH / folder / f.name)
+                commit = commits.get(f"{folder}/{f.name}")
+                if commit:
+                    git_author = commit["author"]
+                    commit_date = datetime.fromisoformat(commit["date"]).strftime("%Y-%m-%d %H:%M:%S")
+                    commit_hash = commit["short"]
+                else:
+                    git_author = commit_date = commit_hash = "-"
                 filename = f.name[:57] + "..." if len(f.name) > 60 else f.name
-                print("{:<60} {:<20} {:<20}".format(filename, modified, git_author))
+                print("{:<60} {:<20} {:<20} {:<20} {:<9}".format(filename, modified, git_author, commit_date, commit_hash))
+    journal.commit_cursor(CACHE_PATH, "list", position)
     if not found:
         print("\nNo managed profiles found.")
@@ -0,0 +1,48 @@
+from core import retention
+
+def register(subparsers):
+    parser = subparsers.add_parser("prune", help="Delete backups outside the retention policy")
+    parser.add_argument("--dry-run", action="store_true", help="Only show what would be kept and deleted")
+    parser.add_argument("--keep-last", type=int, help="Override the policy's keep_last")
+    parser.add_argument("--max-total-mb", type=int, help="Override the policy's max_total_mb")
+    parser.add_argument("--jobs", type=int, help="Number of parallel delete workers")
+    parser.add_argument("--include-legacy", action="store_true",
+                        help="Also apply the policy to folder-copy backups from older versions (kept otherwise)")
+
+def policy_from(args):
+    policy = dict(BACKUP_RETENTION)
+    if getattr(args, "keep_last", None) is not None:
+        policy["keep_last"] = args.keep_last
+    if getattr(args, "max_total_mb", None) is not None:
+        policy["max_total_mb"] = args.max_total_mb
+    return policy
+
+def run(args):
+    dry_run = getattr(args, "dry_run", False)
+    quiet = getattr(args, "quiet", False)  # set when called after a backup
+    backups = retention.describe_backups(BACKUP_PATH)
+    if not backups:
+        if not quiet:
+            print("ℹ️  No backups to prune.")
+        return
+    kept, deleted = retention.plan(backups, policy_from(args), getattr(args, "include_legacy", False))
+
+    if dry_run or not quiet:
+        print("Retention policy: " + ", ".join(f"{k}={v}" for k, v in policy_from(args).items()))
+        print("{:<30} {:<10} {:<10} {:<30}".format("Backup", "Kind", "Action", "Kept by"))
+        print("-" * 80)
+        for backup, reasons in kept:
+            print("{:<30} {:<10} {:<10} {:<30}".format(backup["name"], backup["kind"], "keep", ", ".join(reasons)))
+        for backup in deleted:
+            print("{:<30} {:<10} {:<10} {:<30}".format(backup["name"], backup["kind"], "delete", "-"))
+
+    if dry_run:
+        freed = retention.estimate_freed(BACKUP_PATH, kept, deleted)
+        print(f"\nℹ️  Dry run: {len(deleted)} backup(s) would be deleted, freeing {freed / (1024 * 1024):.1f} MB.")
+        return
+
+    removed, freed = retention.apply(BACKUP_PATH, kept, deleted, jobs=getattr(args, "jobs", None))
+    if removed or not quiet:
+        print(f"🧹 Pruned {len(removed)} backup(s), freed {freed / (1024 * 1024):.1f} MB, {len(kept)} kept.")
+    if len(removed) < len(deleted):
+        print(f"⚠️  {len(deleted) - len(removed)} backup(s) could not be deleted.")
@@ -1,7 +1,8 @@
-import shutil
-from pathlib import Path
+import shlex
 import sys
-import pandas as pd
+from pathlib import Path
+from core import copier, retention, store, syncstate, targets
+from core.txn import PushTransaction, TransactionError
 
 # Make sure the main script (orca.py) is importable
 import orca  # this is orca.py
@@ -11,120 +12,278 @@ GREEN = "\033[92m"
 BLUE = "\033[94m"
 RED = "\033[91m"
 
-def compare_file_status(src_file: Path, dst_file: Path):
-    if not dst_file.exists():
-        return "new"
-    src_time = src_file.stat().st_mtime
-    dst_time = dst_file.stat().st_mtime
-    if src_time > dst_time:
-        return "updated locally"
-    elif dst_time > src_time:
-        return "newer in orca"
-    else:
-        return "same"
+PUSH_STATUS = {
+    syncstate.LOCAL_ONLY: "new",
+    syncstate.LOCAL_CHANGED: "updated locally",
+    syncstate.ORCA_CHANGED: "newer in orca",
+    syncstate.CONFLICT: "conflict",
+    syncstate.ORCA_ONLY: "only in orca",
+}
+# States that would discard changes made in OrcaSlicer
+ORCA_SIDE_CHANGES = (syncstate.ORCA_CHANGED, syncstate.CONFLICT, syncstate.ORCA_ONLY)
+# Targets planned and written at the same time (each also copies on --jobs workers)
+DEFAULT_TARGET_JOBS = 8
 
-def copy_folder_recursive(src: Path, dst: Path, skip_newer=False):
-    if not src.exists():
-        return []
+def push_status(item):
+    if item["state"] == syncstate.ORCA_ONLY and item["entry"]:
+        return "removed locally"
+    return PUSH_STATUS[item["state"]]
 
-    copied_files = []
-    for item in src.rglob("*.json"):
-        if item.is_dir():
-            continue
-        if not any(marker in item.name for marker in MANAGED_PROFILE_MARKERS):
-            continue
+def is_orca_side_change(item):
+    return item["state"] in ORCA_SIDE_CHANGES and push_status(item) != "removed locally"
 
-        rel_path = item.relative_to(src)
-        dst_file = dst / rel_path
-        status = compare_file_status(item, dst_file)
+def orca_profile_files(root: Path, rel: str):
+    """The profile itself plus the .info file OrcaSlicer keeps next to it."""
+    info = str(Path(rel).with_suffix(".info"))
+    return [rel, info] if (root / info).exists() else [rel]
 
-        if skip_newer and status == "newer in orca":
-            continue
+def is_default(target):
+    return target.root == ORCA_USER_PATH
+
+def target_flag(target):
+    """The --target option that names target again (empty for the configured user folder)."""
+    if is_default(target):
+        return ""
+    if target.root.parent == ORCA_USER_ROOT:
+        return f" --target {shlex.quote(target.label)}"
+    return f" --target {shlex.quote(str(target.root))}"
 
-        target_path = dst / rel_path
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(item, target_path)
-        copied_files.append((rel_path, status))
-    return copied_files
-
-def delete_all_profiles_in(folder: Path):
-    if folder.exists():
-        for item in folder.rglob("*"):
-            if item.is_file():
-                item.unlink()
-            elif item.is_dir():
-                try:
-                    item.rmdir()
-                except OSError:
-                    pass  # Not empty
+def finish_pending(args, found):
+    for target in found:
+        txn = PushTransaction(target.root)
+        journal = txn.pending()
+        where = "" if is_default(target) else f" to {target.label}"
+        if not journal:
+            print(f"✅ No interrupted push{where} found.")
+        elif args.rollback:
+            restored = txn.rollback()
+            print(f"↩️  Rolled back interrupted push{where} {journal['id']} ({len(restored)} file(s) restored).")
+        else:
+            ops = txn.commit()
+            print(f"✅ Resumed and completed interrupted push{where} {journal['id']} ({len(ops)} operation(s)).")
 
 def register(subparsers):
-    parser = subparsers.add_parser("push", help="Backup and push local profiles to OrcaSlicer (cleans destination)")
+    parser = subparsers.add_parser("push", help="Backup and push changed local profiles to OrcaSlicer")
     parser.add_argument("--force", action="store_true", help="Force push even if OrcaSlicer files are newer")
     parser.add_argument("--skip-newer", action="store_true", help="Skip files that are newer in OrcaSlicer")
+    parser.add_argument("--jobs", type=int, help="Number of parallel copy workers")
+    parser.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+    parser.add_argument("--target", action="append",
+                        help="Push to this OrcaSlicer user ID or folder (user folder, OrcaSlicer folder or home) instead; repeatable")
+    parser.add_argument("--all-users", action="store_true", help="Push to every user folder in OrcaSlicer's user directory")
+    parser.add_argument("--target-jobs", type=int, help=f"Targets to compare and write in parallel (default {DEFAULT_TARGET_JOBS})")
+    parser.add_argument("--resume", action="store_true", help="Complete a push that was interrupted")
+    parser.add_argument("--rollback", action="store_true", help="Undo a push that was interrupted")
 
-def run(args):
-    print("\U0001F4E4 Pushing local profiles to OrcaSlicer after backup...")
-
-    push_summary = []
-    has_newer_orca = False
-
-    for folder in PROFILE_FOLDERS:
-        orca_dir = ORCA_USER_PATH / folder
-        local_dir = LOCAL_PROFILE_PATH / folder
-
-        for f in local_dir.rglob("*.json"):
-            if not any(marker in f.name for marker in MANAGED_PROFILE_MARKERS):
-                continue
-
-            rel_path = f.relative_to(local_dir)
-            dst_file = orca_dir / rel_path
-            status = compare_file_status(f, dst_file)
-            if status == "newer in orca":
-                has_newer_orca = True
-            push_summary.append({
-                "Folder": folder,
-                "Filename": str(rel_path),
-                "Status": status
-            })
-
-    if not push_summary:
-        print("❌ No profiles found to push.")
-        return
+def resolve_targets(args):
+    """The targets named by --target/--all-users, or the configured user folder; None after an error."""
+    found = []
+    for spec in getattr(args, "target", None) or []:
+        try:
+            found.append(targets.resolve(spec, ORCA_USER_ROOT, PROFILE_FOLDERS))
+        except targets.TargetError as e:
+            print(f"❌ {e}")
+            return None
+    if getattr(args, "all_users", False):
+        found += targets.all_users(ORCA_USER_ROOT)
+    if not found:
+        found = [targets.Target(ORCA_USER_PATH.name, ORCA_USER_PATH)]
+    return targets.unique(found)
 
+def plan_target(target, manifest, local_files):
+    orca_files = syncstate.scan_profiles(target.root, PROFILE_FOLDERS, MANAGED_PROFILE_MARKERS)
+    plan = syncstate.SyncPlan(manifest, target.root, LOCAL_PROFILE_PATH).build(orca_files, local_files)
+    return plan, [item for item in plan.items if item["state"] in PUSH_STATUS]
+
+def backup_target(target, jobs):
+    """Snapshot a target into its own backup folder and apply the retention policy there."""
+    root = targets.backup_root(BACKUP_PATH, target, ORCA_USER_PATH)
+    name, _ = store.create_snapshot(root, target.root, PROFILE_FOLDERS, MANAGED_PROFILE_MARKERS, jobs=jobs)
+    kept, deleted = retention.plan(retention.describe_backups(root), BACKUP_RETENTION)
+    retention.apply(root, kept, deleted, jobs=jobs)
+    return name
+
+def write_target(target, plan, push_summary, args, backup):
+    """Back up (if asked) and push one target; returns {"backup", "pushed": [(rel, status)], "error"}."""
+    outcome = {"backup": None, "pushed": [], "error": None}
+    writes, deletes, removed = [], [], []
+    for item in push_summary:
+        if args.skip_newer and is_orca_side_change(item):
+            continue
+        if item["state"] == syncstate.ORCA_ONLY:
+            deletes.extend(orca_profile_files(target.root, item["rel"]))
+            removed.append(item)
+        else:
+            writes.append(item)
+
+    # Stage every change next to OrcaSlicer's folders, then commit by renames
+    txn = PushTransaction(target.root)
+    try:
+        if backup:
+            outcome["backup"] = backup_target(target, args.jobs)
+        results = txn.stage([(item["local"], item["rel"]) for item in writes], deletes, args.jobs)
+        txn.commit()
+    except (OSError, TransactionError) as e:
+        outcome["error"] = str(e)
+        return outcome
+
+    for item in removed:
+        plan.forget(item["rel"])
+        outcome["pushed"].append((item["rel"], "deleted"))
+    for item, result in zip(writes, results):
+        if result.ok:
+            plan.record(item["rel"], item.get("local_hash"))
+            outcome["pushed"].append((item["rel"], "pushed"))
+        else:
+            outcome["pushed"].append((item["rel"], f"failed: {result.error}"))
+    return outcome
+
+def print_push_table(push_summary, unchanged):
     print("\nThe following profiles will be pushed:\n")
     print(f"{'Folder':<12} {'Filename':<90} {'Status':<20}")
     print("-" * 130)
-    for row in push_summary:
+    for item in push_summary:
         color = ""
-        if row['Status'] == "updated locally":
+        status = push_status(item)
+        if item["state"] == syncstate.LOCAL_CHANGED:
             color = GREEN
-        elif row['Status'] == "newer in orca":
+        elif is_orca_side_change(item):
             color = RED
-        print(f"{color}{row['Folder']:<12} {row['Filename']:<90} {row['Status']:<20}{RESET}")
+        folder, filename = item["rel"].split("/", 1)
+        print(f"{color}{folder:<12} {filename:<90} {status:<20}{RESET}")
+    if unchanged:
+        print(f"({unchanged} unchanged profile(s) skipped)")
+
+def print_target_table(planned):
+    print("\nThe following targets will be updated:\n")
+    print("{:<40} {:<70} {:>10}".format("Target", "Changes", "Unchanged"))
+    print("-" * 122)
+    for target, plan, push_summary in planned:
+        counts = {}
+        for item in push_summary:
+            counts[push_status(item)] = counts.get(push_status(item), 0) + 1
+        changes = ", ".join(f"{n} {status}" for status, n in counts.items()) or "up to date"
+        color = RED if any(is_orca_side_change(item) for item in push_summary) else ""
+        print(f"{color}{target.label[:40]:<40} {changes:<70} {len(plan.items) - len(push_summary):>10}{RESET}")
 
-    if has_newer_orca and not args.force:
-        print(f"{RED}⚠️  Warning: Some OrcaSlicer profiles are newer than local ones.")
+def run(args):
+    found = resolve_targets(args)
+    if found is None:
+        sys.exit(1)
+    if args.resume or args.rollback:
+        finish_pending(args, found)
+        return
+
+    single = len(found) == 1
+    if single:
+        where = "OrcaSlicer" if is_default(found[0]) else found[0].label
+    else:
+        where = f"{len(found)} target(s)"
+    print(f"\U0001F4E4 Pushing local profiles to {where} after backup...")
+
+    ready, blocked = [], []
+    for target in found:
+        journal = PushTransaction(target.root).pending()
+        if journal:
+            print(f"{RED}❌ A previous push{'' if is_default(target) else ' to ' + target.label} ({journal['id']}) was interrupted.")
+            print(f"   Run 'orca-manager push{target_flag(target)} --resume' to complete it or "
+                  f"'orca-manager push{target_flag(target)} --rollback' to undo it.{RESET}")
+            blocked.append(target)
+        else:
+            ready.append(target)
+    if not ready:
+        sys.exit(1)
+
+    manifest_path = CACHE_PATH / "sync_manifest.json"
+    manifest = syncstate.load_manifest(manifest_path)
+    local_files = syncstate.scan_profiles(LOCAL_PROFILE_PATH, PROFILE_FOLDERS, MANAGED_PROFILE_MARKERS)
+    if not local_files:
+        print("ℹ️  No profiles found to push.")
+        if blocked:
+            sys.exit(1)
+        return
+
+    target_jobs = getattr(args, "target_jobs", None) or DEFAULT_TARGET_JOBS
+    plans = copier.parallel_map(lambda t: plan_target(t, manifest, local_files), ready, target_jobs)
+    planned = [(target, plan, push_summary) for target, (plan, push_summary) in zip(ready, plans)]
+
+    pending = [entry for entry in planned if entry[2]]
+    if not pending:
+        syncstate.save_manifest(manifest_path, manifest)
+        unchanged = len(planned[0][1].items)
+        if single:
+            print(f"✅ {where} already matches all {unchanged} local profile(s).")
+        else:
+            print(f"✅ All {len(planned)} target(s) already match the {unchanged} local profile(s).")
+        if blocked:
+            sys.exit(1)
+        return
+
+    if single:
+        print_push_table(pending[0][2], len(pending[0][1].items) - len(pending[0][2]))
+    else:
+        print_target_table(planned)
+
+    newer = [target for target, _, push_summary in pending if any(is_orca_side_change(i) for i in push_summary)]
+    if newer and not args.force:
+        print(f"{RED}⚠️  Warning: Some OrcaSlicer profiles are newer than local ones"
+              + ("." if single else f" in {len(newer)} target(s): {', '.join(t.label for t in newer)}."))
         print("   Pushing will overwrite these changes and the newer Orca files will be lost.")
         print(f"   If you want to keep those changes, consider fetching or backing up first.{RESET}")
         if not args.skip_newer:
+            sys.exit(1)
+
+    if not getattr(args, "yes", False):
+        confirm = input("\nContinue with push? (yes/no): ").strip().lower()
+        if confirm != "yes":
+            print("❌ Aborted.")
+            sys.exit(1)
+
+    # The configured user folder is backed up as always; other targets get
+    # their own backup folder, written by the target's worker
+    if any(is_default(target) for target, _, _ in pending):
+        orca.run_command("backup", {"jobs": args.jobs})  # Dynamically execute the backup command
+
+    def report(entry, outcome):
+        target = entry[0]
+        if single:
+            if outcome["backup"]:
+                print(f"✅ Backup {outcome['backup']} of {target.label} created.")
+            return
+        if outcome["error"]:
+            print(f"{RED}❌ {target.label}: push failed: {outcome['error']}{RESET}")
             return
+        failed = sum(1 for _, status in outcome["pushed"] if status.startswith("failed"))
+        backup = f", backup {outcome['backup']}" if outcome["backup"] else ""
+        icon = "⚠️ " if failed else "✅"
+        print(f"{icon} {target.label}: {len(outcome['pushed']) - failed} profile(s) pushed, {failed} failed{backup}")
 
-    confirm = input("\nContinue with push? (yes/no): ").strip().lower()
-    if confirm != "yes":
-        print("❌ Aborted.")
-        return
+    outcomes = copier.parallel_map(
+        lambda entry: write_target(entry[0], entry[1], entry[2], args, backup=not is_default(entry[0])),
+        pending, target_jobs, on_done=report)
+    syncstate.save_manifest(manifest_path, manifest)
 
-    orca.run_command("backup")  # Dynamically execute the backup command
-    for folder in PROFILE_FOLDERS:
-        orca_dir = ORCA_USER_PATH / folder
-        local_dir = LOCAL_PROFILE_PATH / folder
+    failed_targets = [(target, outcome) for (target, _, _), outcome in zip(pending, outcomes) if outcome["error"]]
+    for target, outcome in failed_targets:
+        if single:
+            print(f"{RED}❌ Push failed: {outcome['error']}")
+        print(f"{RED}   Run 'orca-manager push{target_flag(target)} --rollback' to undo a partial push, or '--resume' to retry it.{RESET}")
 
-        delete_all_profiles_in(orca_dir)
-        print(f"\n[{folder}]")
-        copied = copy_folder_recursive(local_dir, orca_dir, skip_newer=args.skip_newer)
-        if copied:
-            print("{:<60} {:<20}".format("Filename", "Status"))
+    for (target, _, _), outcome in zip(pending, outcomes):
+        rows = outcome["pushed"] if single else [row for row in outcome["pushed"] if row[1].startswith("failed")]
+        if rows:
+            print(("\n" if single else f"\n[{target.label}]\n") + "{:<60} {:<20}".format("Filename", "Status"))
             print("-" * 80)
-            for rel_path, status in copied:
-                print("{:<60} {:<20}".format(str(rel_path), "pushed"))
+            for rel_path, status in rows:
+                print("{:<60} {:<20}".format(rel_path, status))
+    if not single:
+        print(f"\n✅ Pushed to {len(pending) - len(failed_targets)} of {len(pending)} target(s)"
+              + (f" ({len(planned) - len(pending)} already up to date)." if len(planned) > len(pending) else "."))
+
+    failed_files = sum(1 for outcome in outcomes for _, status in outcome["pushed"] if status.startswith("failed"))
+    if failed_targets or failed_files or blocked:
+        problems = [f"{n} {what}" for n, what in ((len(failed_targets), "target(s) failed"),
+                                                  (failed_files, "profile(s) could not be pushed"),
+                                                  (len(blocked), "target(s) skipped for an interrupted push")) if n]
+        print(f"{RED}❌ {', '.join(problems)}.{RESET}")
+        sys.exit(1)
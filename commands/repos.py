@@ -1,34 +1,45 @@
 #Still a work in progress
 
 import json
+import os
 import subprocess
 import shutil
+import time
 from pathlib import Path
 from datetime import datetime
+from core import copier, gitmeta, trace
+from core.fsutil import hash_file, stat_key, write_json_atomic
+from core.repo_index import QueryError, RepoIndex
 
 # Configuration paths
 CONFIG_DIR = Path(__file__).parent.parent / "orca_repositories"
 CONFIG_FILE = CONFIG_DIR / "orca_repositories.json"
 INSTALLED_FILE = CONFIG_DIR / "orca_installed.json"
+INSTALLED_VERSION = 2
 REPO_DIR = CONFIG_DIR
 
-# Ensure config directory and files exist
-CONFIG_DIR.mkdir(exist_ok=True)
-if not CONFIG_FILE.exists():
-    CONFIG_FILE.write_text(json.dumps({"repositories": []}, indent=2))
-if not INSTALLED_FILE.exists():
-    INSTALLED_FILE.write_text(json.dumps({"installed": []}, indent=2))
-
 # Profile settings
 PROFILE_FOLDERS = ["filament", "machine", "process"]
 PROFILE_EXTENSIONS = [".json", ".info"]
 ORCA_USER_PATH = Path(__file__).parent.parent / "orca_profiles" / "default"
 
+# Sync settings
+DEFAULT_SYNC_JOBS = 8
+GIT_TIMEOUT_SECONDS = 120
+
 # Console colors
 RESET = "\033[0m"
 GREEN = "\033[92m"
 YELLOW = "\033[93m"
 
+def ensure_config():
+    """Create the config directory and files on first use."""
+    CONFIG_DIR.mkdir(exist_ok=True)
+    if not CONFIG_FILE.exists():
+        CONFIG_FILE.write_text(json.dumps({"repositories": []}, indent=2))
+    if not INSTALLED_FILE.exists():
+        INSTALLED_FILE.write_text(json.dumps({"version": INSTALLED_VERSION, "installed": {}}, indent=2))
+
 def load_config():
     with CONFIG_FILE.open("r") as f:
         return json.load(f)
@@ -37,13 +48,147 @@ def save_config(data):
     with CONFIG_FILE.open("w") as f:
         json.dump(data, f, indent=2)
 
+def installed_key(repo: str, folder: str, profile: str):
+    return f"{repo}/{folder}/{profile}"
+
 def load_installed():
+    """Load the installed-profile registry, migrating the old list format.
+
+    Old entries carry no hash, so the file currently installed is assumed to
+    be unmodified and its hash is recorded.
+    """
     with INSTALLED_FILE.open("r") as f:
-        return json.load(f)
+        data = json.load(f)
+    if data.get("version") == INSTALLED_VERSION:
+        return data
+    registry = {"version": INSTALLED_VERSION, "installed": {}}
+    for e in data.get("installed", []):
+        dst = ORCA_USER_PATH / e["folder"] / e["profile"]
+        entry = {"repo": e["repo"], "folder": e["folder"], "profile": e["profile"], "hash": None, "commit": None}
+        if dst.exists():
+            entry["hash"] = hash_file(dst)
+            entry["installed_stat"] = stat_key(dst.stat())
+        registry["installed"][installed_key(e["repo"], e["folder"], e["profile"])] = entry
+    save_installed(registry)
+    return registry
 
 def save_installed(data):
-    with INSTALLED_FILE.open("w") as f:
-        json.dump(data, f, indent=2)
+    write_json_atomic(INSTALLED_FILE, data)
+
+def installed_hash(entry, dst: Path):
+    """Hash of the installed file, skipping the read when its stat is unchanged."""
+    st = dst.stat()
+    if entry and entry.get("installed_stat") == stat_key(st):
+        return entry["hash"]
+    return hash_file(dst)
+
+def install_action(entry, src_hash: str, dst: Path, force: bool):
+    """Decide what installing src over dst means: install/upgrade/unchanged/modified/conflict."""
+    if not dst.exists():
+        return "install"
+    current = installed_hash(entry, dst)
+    if current == src_hash:
+        return "unchanged"
+    if entry is None:
+        return "install" if force else "conflict"   # not ours: never overwrite silently
+    if current != entry["hash"]:
+        return "upgrade" if force else "modified"   # edited in OrcaSlicer since install
+    return "upgrade"
+
+def git_env():
+    # Never block on a credential or host key prompt from a dead remote
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    env.setdefault("GIT_SSH_COMMAND", "ssh -o BatchMode=yes")
+    return env
+
+def update_repo(repo):
+    """Fast-forward one repository checkout; failures are returned, not raised."""
+    path = REPO_DIR / repo["name"]
+    result = {"name": repo["name"], "ok": False, "before": None, "after": None, "error": None}
+    if not (path / ".git").exists():
+        result["error"] = "not cloned, re-add the repository"
+        return result
+    result["before"] = gitmeta.read_head(path)
+    try:
+        with trace.span("git", cmd="pull", repo=repo["name"]):
+            proc = subprocess.run(
+                ["git", "-C", str(path), "pull", "--ff-only", "--quiet"],
+                stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                timeout=GIT_TIMEOUT_SECONDS, env=git_env(),
+            )
+    except subprocess.TimeoutExpired:
+        result["error"] = f"timed out after {GIT_TIMEOUT_SECONDS}s"
+        return result
+    except OSError as e:
+        result["error"] = str(e)
+        return result
+    if proc.returncode != 0:
+        lines = (proc.stderr or proc.stdout).strip().splitlines()
+        errors = [line for line in lines if line.startswith(("fatal:", "error:"))]
+        result["error"] = (errors or lines or [f"git pull exited with {proc.returncode}"])[0]
+        return result
+    result["ok"] = True
+    result["after"] = gitmeta.read_head(path)
+    return result
+
+def report_update(repo, result):
+    if not result["ok"]:
+        print(f"❌ {result['name']}: {result['error']}")
+    elif result["before"] != result["after"]:
+        print(f"{GREEN}✅ {result['name']}: updated {(result['before'] or '-')[:7]}..{(result['after'] or '-')[:7]}{RESET}")
+    else:
+        print(f"✅ {result['name']}: up to date")
+
+def scan_profile_files(folder: Path):
+    """Map relative path -> (Path, mtime) for profile files below folder."""
+    files = {}
+    if folder.exists():
+        for p in folder.rglob("*"):
+            if p.suffix in PROFILE_EXTENSIONS and p.is_file():
+                files[str(p.relative_to(folder))] = (p, p.stat().st_mtime)
+    return files
+
+def plan_repo(repo, local_scan):
+    """Compare one repository with the local profiles; safe to run in a worker thread."""
+    plan = {"name": repo["name"], "items": [], "warnings": [], "error": None}
+    try:
+        repo_path = REPO_DIR / repo["name"]
+        for folder in PROFILE_FOLDERS:
+            repo_dir = repo_path / folder
+            if not repo_dir.exists():
+                plan["warnings"].append(f"Missing folder '{folder}' in repo '{repo['name']}'")
+                continue
+            repo_files = scan_profile_files(repo_dir)
+            local_files = local_scan[folder]
+            for rel_path in sorted(set(repo_files) | set(local_files)):
+                in_repo = rel_path in repo_files
+                in_local = rel_path in local_files
+                if in_repo and not in_local:
+                    status = "repo -> local (new)"
+                elif in_local and not in_repo:
+                    status = "local -> repo (new)"
+                else:
+                    rt = repo_files[rel_path][1]
+                    lt = local_files[rel_path][1]
+                    if rt > lt:
+                        status = "repo -> local (newer)"
+                    elif lt > rt:
+                        status = "local -> repo (newer)"
+                    else:
+                        status = "same"
+                if status != "same":
+                    plan["items"].append({
+                        "repo": repo['name'],
+                        "folder": folder,
+                        "rel_path": rel_path,
+                        "status": status
+                    })
+    except OSError as e:
+        plan["error"] = str(e)
+    return plan
+
+def open_repo_index():
+    return RepoIndex(CACHE_PATH / "repo_index.sqlite", REPO_DIR, PROFILE_FOLDERS)
 
 def register(subparsers):
     parser = subparsers.add_parser(
@@ -55,6 +200,12 @@ def register(subparsers):
         choices=["add", "list", "remove", "sync", "search", "install", "uninstall", "move"],
         help="Action to perform"
     )
+    parser.add_argument(
+        "query",
+        nargs="*",
+        help="Search terms: key=value (exact), key~text (substring) or a bare name fragment, "
+             "e.g. filament_type=PETG compatible_printers~VC4"
+    )
     parser.add_argument("--name", help="Repository name")
     parser.add_argument("--url", help="Git URL of the repository")
     parser.add_argument("--profile", help="Profile file name")
@@ -66,9 +217,16 @@ def register(subparsers):
         "--target",
         help="Target name or path for move"
     )
+    parser.add_argument("--jobs", type=int, help=f"Repositories to update and compare in parallel (default {DEFAULT_SYNC_JOBS})")
+    parser.add_argument("--offline", action="store_true", help="Sync against the current checkouts without pulling")
+    parser.add_argument("--force", action="store_true", help="Install or uninstall over profiles modified in OrcaSlicer")
+    parser.add_argument("--yes", action="store_true", help="Do not ask for confirmation before syncing")
+    parser.add_argument("--limit", type=int, help="Maximum number of search results")
+    parser.add_argument("--reindex", action="store_true", help="Rebuild the search index from scratch (e.g. after editing repository files by hand)")
 
 
 def run(args):
+    ensure_config()
     config = load_config()
     repos = config.get("repositories", [])
     installed = load_installed()
@@ -113,52 +271,24 @@ def run(args):
         return
 
     if args.action == "sync":
+        if not args.offline:
+            print(f"Updating {len(repos)} repositories...")
+            updates = copier.parallel_map(update_repo, repos, args.jobs or DEFAULT_SYNC_JOBS, on_done=report_update)
+            failed = [u["name"] for u in updates if not u["ok"]]
+            if failed:
+                print(f"{YELLOW}⚠️ {len(failed)} repositories could not be updated, planning against their last checkout: "
+                      f"{', '.join(failed)}{RESET}")
         print("Comparing local and repository profiles...")
+        local_scan = {folder: scan_profile_files(ORCA_USER_PATH / folder) for folder in PROFILE_FOLDERS}
+        plans = copier.parallel_map(lambda r: plan_repo(r, local_scan), repos, args.jobs or DEFAULT_SYNC_JOBS)
         sync_plan = []
-        for r in repos:
-            repo_path = REPO_DIR / r["name"]
-            for folder in PROFILE_FOLDERS:
-                repo_dir = repo_path / folder
-                local_dir = ORCA_USER_PATH / folder
-                if not repo_dir.exists():
-                    print(f"⚠️ Missing folder '{folder}' in repo '{r['name']}'")
-                    continue
-                # Build maps of relative paths to file Paths
-                repo_files = {}
-                for p in repo_dir.rglob("*"):
-                    if p.is_file() and p.suffix in PROFILE_EXTENSIONS:
-                        rel = p.relative_to(repo_dir)
-                        repo_files[str(rel)] = p
-                local_files = {}
-                if local_dir.exists():
-                    for p in local_dir.rglob("*"):
-                        if p.is_file() and p.suffix in PROFILE_EXTENSIONS:
-                            rel = p.relative_to(local_dir)
-                            local_files[str(rel)] = p
-                # Compare sets
-                for rel_path in sorted(set(repo_files) | set(local_files)):
-                    in_repo = rel_path in repo_files
-                    in_local = rel_path in local_files
-                    if in_repo and not in_local:
-                        status = "repo -> local (new)"
-                    elif in_local and not in_repo:
-                        status = "local -> repo (new)"
-                    else:
-                        rt = repo_files[rel_path].stat().st_mtime
-                        lt = local_files[rel_path].stat().st_mtime
-                        if rt > lt:
-                            status = "repo -> local (newer)"
-                        elif lt > rt:
-                            status = "local -> repo (newer)"
-                        else:
-                            status = "same"
-                    if status != "same":
-                        sync_plan.append({
-                            "repo": r['name'],
-                            "folder": folder,
-                            "rel_path": rel_path,
-                            "status": status
-                        })
+        for plan in plans:
+            for warning in plan["warnings"]:
+                print(f"⚠️ {warning}")
+            if plan["error"]:
+                print(f"❌ {plan['name']}: could not build sync plan: {plan['error']}")
+                continue
+            sync_plan.extend(plan["items"])
         # Print plan
         if not sync_plan:
             print("No changes detected.")
@@ -171,10 +301,11 @@ def run(args):
                 f"{item['repo']:<20} {item['folder']:<10} "
                 f"{item['rel_path']:<50} {item['status']}"
             )
-        if input("\nProceed? (yes/no): ").strip().lower() != "yes":
+        if not getattr(args, "yes", False) and input("\nProceed? (yes/no): ").strip().lower() != "yes":
             print("Aborted.")
             return
         # Execute sync
+        repo_writes = {}
         for item in sync_plan:
             repo_dir = REPO_DIR / item['repo'] / item['folder']
             local_dir = ORCA_USER_PATH / item['folder']
@@ -189,19 +320,34 @@ def run(args):
             print(f"Copying '{rel}' [{item['status']}] from '{src}' to '{dst}'")
             dst.parent.mkdir(parents=True, exist_ok=True)
             shutil.copy2(src, dst)
+            if dst.is_relative_to(REPO_DIR):
+                repo_writes.setdefault(item['repo'], []).append(f"{item['folder']}/{rel}")
+        with open_repo_index() as index:
+            for repo, rels in repo_writes.items():
+                index.update_paths(repo, rels)
         print("✅ Sync complete.")
         return
 
     if args.action == "search":
-        print("Available profiles in repositories:")
-        for r in repos:
-            print(f"\n[{r['name']}]'")
-            for folder in PROFILE_FOLDERS:
-                path = REPO_DIR / r['name'] / folder
-                if path.exists():
-                    for p in path.rglob("*"):
-                        if p.is_file() and p.suffix in PROFILE_EXTENSIONS:
-                            print(f"  {folder}/{p.relative_to(path)}")
+        started = time.perf_counter()
+        with open_repo_index() as index:
+            updated = index.refresh([r["name"] for r in repos], force=args.reindex)
+            for name, count in updated.items():
+                print(f"ℹ️  Indexed {count} changed profile(s) in '{name}'")
+            try:
+                matches = list(index.search(args.query, args.limit))
+            except QueryError as e:
+                print(f"❌ {e}")
+                return
+        elapsed = (time.perf_counter() - started) * 1000
+        if not matches:
+            print(f"No profiles match {' '.join(args.query) or 'the index'}.")
+            return
+        print(f"{'Repo':<20} {'Path':<60} {'Name'}")
+        print("-" * 120)
+        for repo, path, name, _ in matches:
+            print(f"{repo:<20} {path:<60} {name}")
+        print(f"\n{len(matches)} profile(s) in {elapsed:.1f} ms")
         return
 
     if args.action == "install":
@@ -212,42 +358,76 @@ def run(args):
         if not repo_path.exists():
             print("❌ Repository not found.")
             return
-        count = 0
+        commit = gitmeta.read_head(repo_path) if (repo_path / ".git").exists() else None
+        registry = installed["installed"]
+        counts = {"install": 0, "upgrade": 0, "unchanged": 0, "modified": 0, "conflict": 0}
         for folder in PROFILE_FOLDERS:
-            for rel, p in {
-                str(p.relative_to(repo_path / folder)): p
-                for p in (repo_path / folder).rglob("*") if p.is_file() and p.suffix in PROFILE_EXTENSIONS
-            }.items():
+            if args.folder and folder != args.folder:
+                continue
+            folder_path = repo_path / folder
+            for p in sorted(folder_path.rglob("*")):
+                if not (p.suffix in PROFILE_EXTENSIONS and p.is_file()):
+                    continue
+                rel = str(p.relative_to(folder_path))
+                if args.profile and rel != args.profile:
+                    continue
+                key = installed_key(args.name, folder, rel)
+                entry = registry.get(key)
+                src_stat = stat_key(p.stat())
+                if entry and entry.get("source_stat") == src_stat:
+                    src_hash = entry["source_hash"]
+                else:
+                    src_hash = hash_file(p)
                 dst = ORCA_USER_PATH / folder / rel
-                dst.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(p, dst)
-                installed['installed'].append({
-                    'repo': args.name, 'folder': folder, 'profile': rel
-                })
-                print(f"{GREEN}Installed: {folder}/{rel}{RESET}")
-                count += 1
+                action = install_action(entry, src_hash, dst, args.force)
+                counts[action] += 1
+                if action == "modified":
+                    print(f"{YELLOW}⚠️ Skipped {folder}/{rel}: modified in OrcaSlicer since it was installed (--force to overwrite){RESET}")
+                    continue
+                if action == "conflict":
+                    print(f"{YELLOW}⚠️ Skipped {folder}/{rel}: a different profile with this name exists (--force to overwrite){RESET}")
+                    continue
+                if action != "unchanged":
+                    dst.parent.mkdir(parents=True, exist_ok=True)
+                    result = copier.copy_file(p, dst)
+                    if not result.ok:
+                        print(f"❌ Failed to install {folder}/{rel}: {result.error}")
+                        continue
+                    label = "Installed" if action == "install" else "Upgraded"
+                    print(f"{GREEN}{label}: {folder}/{rel}{RESET}")
+                    entry = dict(entry or {}, installed=datetime.now().isoformat(timespec="seconds"))
+                registry[key] = dict(
+                    entry or {}, repo=args.name, folder=folder, profile=rel, hash=src_hash, commit=commit,
+                    source_hash=src_hash, source_stat=src_stat, installed_stat=stat_key(dst.stat()),
+                )
         save_installed(installed)
-        print(f"✅ Installed {count} profiles.")
+        print(f"✅ {counts['install']} installed, {counts['upgrade']} upgraded, {counts['unchanged']} unchanged"
+              + (f", {counts['modified'] + counts['conflict']} skipped" if counts['modified'] + counts['conflict'] else "")
+              + ".")
         return
 
     if args.action == "uninstall":
         if not args.name or not args.profile:
             print("--name and --profile are required to uninstall a profile")
             return
-        rem = []
-        removed = False
-        for e in installed['installed']:
-            if e['repo']==args.name and e['profile']==args.profile:
-                path = ORCA_USER_PATH / e['folder'] / e['profile']
-                if path.exists(): path.unlink()
-                removed = True
-            else:
-                rem.append(e)
-        if removed:
-            save_installed({'installed': rem})
-            print(f"✅ Uninstalled: {args.profile}")
-        else:
+        registry = installed["installed"]
+        folders = [args.folder] if args.folder else PROFILE_FOLDERS
+        keys = [installed_key(args.name, folder, args.profile) for folder in folders]
+        keys = [key for key in keys if key in registry]
+        if not keys:
             print("❌ Profile not found in installed list.")
+            return
+        for key in keys:
+            entry = registry[key]
+            path = ORCA_USER_PATH / entry['folder'] / entry['profile']
+            if path.exists():
+                if not args.force and installed_hash(entry, path) != entry["hash"]:
+                    print(f"{YELLOW}⚠️ Kept {entry['folder']}/{entry['profile']}: modified in OrcaSlicer since it was installed (--force to remove){RESET}")
+                    continue
+                path.unlink()
+            del registry[key]
+            print(f"✅ Uninstalled: {entry['folder']}/{entry['profile']}")
+        save_installed(installed)
         return
 
     if args.action == "move":
@@ -261,6 +441,8 @@ def run(args):
             return
         dst.parent.mkdir(parents=True, exist_ok=True)
         shutil.move(str(src), str(dst))
+        with open_repo_index() as index:
+            index.update_paths(args.name, [f"{args.folder}/{args.profile}", f"{args.folder}/{args.target}"])
         print(f"✅ Moved {args.profile} to {args.target}")
         return
 
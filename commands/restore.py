@@ -1,72 +1,241 @@
+import json
+import sys
+import time
+from datetime import datetime, time as day_time
 from pathlib import Path
-import shutil
+from core import archive, copier, jsondiff, store, targets
+from core.catalog import open_catalog
+from core.fsutil import hash_file, is_managed
 
-def copy_folder_recursive(src: Path, dst: Path):
+def restore_folder_copy(backup_dir: Path, folder: str, orca_dir: Path, jobs=None, only=None):
+    src = backup_dir / folder
     if not src.exists():
         return []
+    if only:
+        files = [src / only] if (src / only).is_file() else []
+    else:
+        files = [item for item in src.rglob("*") if item.is_file()]
+    return copier.copy_files([(item, orca_dir / item.relative_to(src)) for item in files], jobs)
 
-    copied_files = []
-    for item in src.rglob("*"):
-        if item.is_dir():
-            continue
-        target_path = dst / item.relative_to(src)
-        target_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(item, target_path)
-        copied_files.append(item.relative_to(src))
-    return copied_files
+def restore_snapshot(backup_root: Path, name: str, folder: str, orca_dir: Path, jobs=None, only=None):
+    manifest = store.load_snapshot(backup_root, name)
+    entries = {rel.split("/", 1)[1]: entry for rel, entry in manifest["files"].items()
+               if rel.split("/", 1)[0] == folder and (only is None or rel.split("/", 1)[1] == only)}
+    return store.materialize(backup_root, entries, orca_dir, jobs=jobs)
+
+def restore_archive(backup_root: Path, path: Path, folder: str, orca_dir: Path, only=None):
+    """Extract one folder (or just the profile `only`) from an archive backup."""
+    index = archive.read_index(path)
+    entries = {rel.split("/", 1)[1]: entry for rel, entry in index["files"].items()
+               if rel.split("/", 1)[0] == folder and (only is None or rel.split("/", 1)[1] == only)}
+    return archive.extract(backup_root, path, entries, orca_dir)
 
-def delete_all_profiles_in(folder: Path):
+def remove_stale_profiles(folder: Path, restored):
+    """Delete managed profiles that are not part of the restored backup; unmanaged ones are kept."""
+    removed = []
     if folder.exists():
         for item in folder.rglob("*"):
-            if item.is_file():
+            if item.is_file() and is_managed(item.name, MANAGED_PROFILE_MARKERS) and item not in restored:
                 item.unlink()
-            elif item.is_dir():
-                try:
-                    item.rmdir()
-                except OSError:
-                    pass  # not empty
+                removed.append(item)
+    return removed
+
+def parse_as_of(value: str):
+    """Accept a date (end of that day), a date and time, or a backup name."""
+    for fmt in (store.TIMESTAMP_FORMAT, "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return datetime.combine(datetime.strptime(value, "%Y-%m-%d").date(), day_time.max)
+
+def print_history(catalog, orca_root: Path, rel: str, show_all: bool):
+    versions = catalog.versions(rel) if show_all else catalog.changes(rel)
+    if not versions:
+        print(f"❌ {rel} is not in any backup.")
+        sys.exit(1)
+    current = orca_root / rel
+    current_hash = hash_file(current) if current.is_file() else None
+    print(f"Backups of {rel}" + ("" if show_all else " (only those where it changed)") + ":")
+    print("{:<30} {:<20} {:<10} {:<10} {:<10}".format("Backup", "Taken", "Kind", "Hash", "Size"))
+    print("-" * 84)
+    for v in versions:
+        marker = "  = current" if v["hash"] == current_hash else ""
+        print("{:<30} {:<20} {:<10} {:<10} {:<10}".format(
+            v["name"], v["time"].strftime("%Y-%m-%d %H:%M:%S"), v["kind"], v["hash"][:8], v["size"]) + marker)
+
+def preview(backup_root: Path, orca_root: Path, name: str, kind: str, path: Path, rel: str):
+    """Show what restoring rel from a backup would change; returns False if nothing would."""
+    data = store.read_backup_file(backup_root, name, kind, path, rel)
+    current = orca_root / rel
+    if not current.is_file():
+        print(f"ℹ️  {rel} does not exist in OrcaSlicer, it will be created from {name}.")
+        return True
+    if current.read_bytes() == data:
+        print(f"✅ {rel} is already identical to the version in {name}.")
+        return False
+    try:
+        changes = jsondiff.diff_values(jsondiff.load_profile(current), json.loads(data))
+    except (OSError, ValueError):
+        print(f"ℹ️  {rel} differs from the version in {name} (not comparable as JSON).")
+        return True
+    print(f"Changes when restoring {rel} from {name} (current -> backup):")
+    for change in changes:
+        if change.kind == "added":
+            print(f"    + {change.key}: {jsondiff.format_value(change.new)}")
+        elif change.kind == "removed":
+            print(f"    - {change.key}: {jsondiff.format_value(change.old)}")
+        else:
+            print(f"    ~ {change.key}: {jsondiff.format_value(change.old, 40)} -> {jsondiff.format_value(change.new, 40)}")
+    if not changes:
+        print("    (formatting or key order only)")
+    return True
 
 def register(subparsers):
-    subparsers.add_parser("restore", help="Interactively restore a backup to OrcaSlicer")
+    parser = subparsers.add_parser("restore", help="Restore a backup (or a single profile) to OrcaSlicer")
+    parser.add_argument("--jobs", type=int, help="Number of parallel copy workers")
+    parser.add_argument("--file", help="Restore only this profile (e.g. 'filament/My PETG.json') and keep everything else")
+    parser.add_argument("--backup", help="Backup name to restore instead of choosing from the menu")
+    parser.add_argument("--as-of", help="Use the newest backup taken at or before this date ('2026-10-01' or '2026-10-01 14:30')")
+    parser.add_argument("--history", action="store_true", help="With --file: list the backups in which the profile changed")
+    parser.add_argument("--all", action="store_true", help="With --history: list every backup holding the profile")
+    parser.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+    parser.add_argument("--target", help="Restore a push target's own backups (user ID or folder, as given to push --target)")
+
+def select_backup(args, backups, catalog, rel):
+    by_name = {name: (name, kind, path) for name, kind, path in backups}
+    if args.backup:
+        if args.backup not in by_name:
+            print(f"❌ No backup named {args.backup}.")
+            return None
+        return by_name[args.backup]
+    if args.as_of:
+        try:
+            when = parse_as_of(args.as_of)
+        except ValueError:
+            print(f"❌ Cannot read date '{args.as_of}'.")
+            return None
+        name = catalog.as_of(when, rel)
+        if name is None or name not in by_name:
+            print(f"❌ No backup{' of ' + rel if rel else ''} taken at or before {when:%Y-%m-%d %H:%M:%S}.")
+            return None
+        print(f"Using backup {name} (newest{' holding ' + rel if rel else ''} as of {when:%Y-%m-%d %H:%M:%S}).")
+        return by_name[name]
+
+    print("Available backups:")
+    for idx, (name, kind, _) in enumerate(backups):
+        print(f"  [{idx}] {name}" + {"folder": " (folder copy)", "archive": " (archive)"}.get(kind, ""))
+    try:
+        choice = int(input("Select a backup to restore by index: "))
+        return backups[choice]
+    except (ValueError, IndexError):
+        print("❌ Invalid selection.")
+        return None
+
+def locations(args):
+    """(backup folder, OrcaSlicer user folder, catalog cache folder) to restore with; None after an error."""
+    if not getattr(args, "target", None):
+        return BACKUP_PATH, ORCA_USER_PATH, CACHE_PATH
+    try:
+        target = targets.resolve(args.target, ORCA_USER_ROOT, PROFILE_FOLDERS)
+    except targets.TargetError as e:
+        print(f"❌ {e}")
+        return None
+    backup_root = targets.backup_root(BACKUP_PATH, target, ORCA_USER_PATH)
+    if backup_root == BACKUP_PATH:
+        return BACKUP_PATH, ORCA_USER_PATH, CACHE_PATH
+    return backup_root, target.root, CACHE_PATH / store.TARGETS_DIR / target.label
 
 def run(args):
     print("🔁 Restoring a backup to OrcaSlicer...")
 
-    if not BACKUP_PATH.exists():
+    found = locations(args)
+    if found is None:
+        sys.exit(1)
+    backup_root, orca_root, cache_path = found
+    if not backup_root.exists():
         print("❌ No backup directory found.")
-        return
+        sys.exit(1)
 
-    backups = sorted([d for d in BACKUP_PATH.iterdir() if d.is_dir()], reverse=True)
+    backups = store.list_backups(backup_root)
     if not backups:
         print("❌ No backups available to restore.")
-        return
+        sys.exit(1)
 
-    print("Available backups:")
-    for idx, backup in enumerate(backups):
-        print(f"  [{idx}] {backup.name}")
+    only_folder = only_file = rel = None
+    if getattr(args, "file", None):
+        rel = Path(args.file).as_posix()
+        only_folder, _, only_file = rel.partition("/")
+        if only_folder not in PROFILE_FOLDERS or not only_file:
+            print(f"❌ --file must look like <{'|'.join(PROFILE_FOLDERS)}>/<profile file>.")
+            sys.exit(1)
 
-    try:
-        choice = int(input("Select a backup to restore by index: "))
-        selected_backup = backups[choice] / "default"
-    except (ValueError, IndexError):
-        print("❌ Invalid selection.")
-        return
+    with open_catalog(cache_path, backup_root) as catalog:
+        if getattr(args, "history", False):
+            if not rel:
+                print("❌ --history needs --file.")
+                sys.exit(1)
+            print_history(catalog, orca_root, rel, getattr(args, "all", False))
+            return
+        selected = select_backup(args, backups, catalog, rel)
+    if selected is None:
+        sys.exit(1)
+    selected_name, selected_kind, selected_backup = selected
 
-    print("⚠️  This will overwrite current OrcaSlicer profiles. Are you sure? (yes/no)")
-    confirm = input().strip().lower()
-    if confirm != "yes":
-        print("❌ Aborted.")
-        return
+    if rel:
+        try:
+            if not preview(backup_root, orca_root, selected_name, selected_kind, selected_backup, rel):
+                return
+        except KeyError:
+            print(f"❌ {rel} is not in backup {selected_name}.")
+            sys.exit(1)
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot read {rel} from backup {selected_name}: {e}")
+            sys.exit(1)
+        question = f"⚠️  This will overwrite {rel} in OrcaSlicer. Are you sure? (yes/no)"
+    else:
+        question = "⚠️  This will overwrite current OrcaSlicer profiles. Are you sure? (yes/no)"
+    if not getattr(args, "yes", False):
+        print(question)
+        confirm = input().strip().lower()
+        if confirm != "yes":
+            print("❌ Aborted.")
+            sys.exit(1)
 
+    started = time.perf_counter()
+    restored = restored_bytes = failed = 0
     for folder in PROFILE_FOLDERS:
-        orca_dir = ORCA_USER_PATH / folder
-        backup_dir = selected_backup / folder
+        if only_folder and folder != only_folder:
+            continue
+        orca_dir = orca_root / folder
 
-        delete_all_profiles_in(orca_dir)
         print(f"[{folder}]")
-        copied = copy_folder_recursive(backup_dir, orca_dir)
-        if copied:
+        jobs = getattr(args, "jobs", None)
+        if selected_kind == "archive":
+            results = restore_archive(backup_root, selected_backup, folder, orca_dir, only=only_file)
+        elif selected_kind == "snapshot":
+            results = restore_snapshot(backup_root, selected_name, folder, orca_dir, jobs=jobs, only=only_file)
+        else:
+            results = restore_folder_copy(selected_backup, folder, orca_dir, jobs=jobs, only=only_file)
+        # A full restore also drops managed profiles created after the backup
+        removed = [] if only_file else remove_stale_profiles(orca_dir, {r.dst for r in results})
+        if results or removed:
             print("{:<60} {:<20}".format("Filename", "Status"))
             print("-" * 80)
-            for file in copied:
-                print("{:<60} {:<20}".format(str(file), "restored"))
+            for result in results:
+                status = "restored" if result.ok else f"failed: {result.error}"
+                print("{:<60} {:<20}".format(str(result.dst.relative_to(orca_dir)), status))
+                if result.ok:
+                    restored += 1
+                    restored_bytes += result.bytes
+                else:
+                    failed += 1
+            for item in removed:
+                print("{:<60} {:<20}".format(str(item.relative_to(orca_dir)), "removed (not in backup)"))
+
+    elapsed = time.perf_counter() - started
+    throughput = restored_bytes / elapsed / (1024 * 1024) if elapsed else 0
+    print(f"{'⚠️ ' if failed else '✅'} Restored {restored} file(s), {restored_bytes / 1024:.1f} KB in {elapsed:.2f}s ({throughput:.1f} MB/s).")
+    if failed:
+        print(f"❌ {failed} file(s) could not be restored.")
+        sys.exit(1)
@@ -0,0 +1,137 @@
+import argparse
+import io
+import json
+import shlex
+import sys
+import time
+from pathlib import Path
+
+import orca  # Main CLI loader with run_command()
+from core import jsoncache, scancache, trace
+
+# Job files list the commands to run, one step per entry, either as a
+# command line or as a list of arguments:
+#
+#   {"steps": [
+#       "fetch --skip-newer",
+#       "validate --local",
+#       ["flatten", "--type", "machine"],
+#       "backup",
+#       "push --skip-newer"
+#   ]}
+#
+# Every step runs as if --yes was given and without a terminal: a prompt
+# that cannot be skipped fails the step instead of waiting.  Steps share one
+# process, so parsed profiles, the profile index and git metadata stay
+# loaded, and folder listings are reused until a step changes that folder.
+EXCLUDED_COMMANDS = orca.LOCAL_ONLY_COMMANDS | {"run"}
+
+def register(subparsers):
+    parser = subparsers.add_parser("run", help="Run the steps of a job file non-interactively in one process")
+    parser.add_argument("job", help="Job file (JSON) listing the commands to run")
+    parser.add_argument("--keep-going", action="store_true", help="Run the remaining steps after a step fails")
+    parser.add_argument("--dry-run", action="store_true", help="Check the job file and list its steps without running them")
+
+class JobError(Exception):
+    pass
+
+def load_job(path: Path):
+    """Return the steps of a job file as argument lists."""
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            job = json.load(f)
+    except OSError as e:
+        raise JobError(f"Cannot read {path}: {e.strerror}")
+    except ValueError as e:
+        raise JobError(f"{path} is not valid JSON: {e}")
+    steps = job.get("steps") if isinstance(job, dict) else job
+    if not isinstance(steps, list) or not steps:
+        raise JobError(f"{path} has no steps (expected {{\"steps\": [...]}})")
+    argvs = []
+    for number, step in enumerate(steps, 1):
+        if isinstance(step, str):
+            argv = shlex.split(step)
+        elif isinstance(step, list) and all(isinstance(a, str) for a in step):
+            argv = list(step)
+        else:
+            raise JobError(f"Step {number} must be a command line or a list of arguments")
+        if not argv:
+            raise JobError(f"Step {number} is empty")
+        argvs.append(argv)
+    return argvs
+
+def parse_steps(argvs):
+    """Parse every step up front, so a typo in the last step fails before the first one runs."""
+    parser = argparse.ArgumentParser(prog="orca-manager", add_help=False)
+    command_funcs = orca.load_commands(parser)
+    steps = []
+    for number, argv in enumerate(argvs, 1):
+        if argv[0] in EXCLUDED_COMMANDS:
+            raise JobError(f"Step {number}: '{argv[0]}' cannot run inside a job")
+        stderr, sys.stderr = sys.stderr, io.StringIO()
+        try:
+            step_args = parser.parse_args(argv)
+        except SystemExit:
+            message = sys.stderr.getvalue().strip().splitlines()
+            raise JobError(f"Step {number} ({shlex.join(argv)}): {message[-1] if message else 'invalid arguments'}")
+        finally:
+            sys.stderr = stderr
+        step_args.yes = True
+        steps.append((argv, step_args, command_funcs[step_args.command]))
+    return steps
+
+def run_step(func, step_args):
+    """Run one step; returns None on success or the reason it failed."""
+    stdin, sys.stdin = sys.stdin, io.StringIO()
+    try:
+        func(step_args)
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            return f"exit code {e.code}"
+    except EOFError:
+        return "asked for input (pass the options that skip the prompt)"
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    finally:
+        sys.stdin = stdin
+    return None
+
+def run(args):
+    try:
+        steps = parse_steps(load_job(Path(args.job)))
+    except JobError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    if args.dry_run:
+        print(f"✅ {args.job}: {len(steps)} step(s)")
+        for number, (argv, _, _) in enumerate(steps, 1):
+            print(f"  {number}. orca-manager {shlex.join(argv)}")
+        return
+
+    results = []
+    with scancache.session(), jsoncache.session():
+        for number, (argv, step_args, func) in enumerate(steps, 1):
+            line = shlex.join(argv)
+            print(f"\n▶️  [{number}/{len(steps)}] orca-manager {line}")
+            started = time.perf_counter()
+            with trace.span(f"step:{argv[0]}", step=number):
+                error = run_step(func, step_args)
+            results.append((line, error, time.perf_counter() - started))
+            if error:
+                print(f"❌ Step {number} failed: {error}")
+                if not args.keep_going:
+                    break
+
+    print("\n{:<60} {:<20} {:>8}".format("Step", "Status", "Seconds"))
+    print("-" * 90)
+    for line, error, seconds in results:
+        print("{:<60} {:<20} {:>8.2f}".format(line[:60], "failed" if error else "ok", seconds))
+    for argv, _, _ in steps[len(results):]:
+        print("{:<60} {:<20} {:>8}".format(shlex.join(argv)[:60], "not run", "-"))
+
+    failed = sum(1 for _, error, _ in results if error)
+    if failed:
+        print(f"\n❌ {failed} of {len(steps)} step(s) failed.")
+        sys.exit(1)
+    print(f"\n✅ All {len(steps)} step(s) completed.")
@@ -1,46 +1,179 @@
 import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import orca
+from core import jsoncache, refgraph, scancache, schema, trace
+from core.profile_index import open_index, profile_refs
+from core.fsutil import write_json_atomic
+
+# Files left to check before a process pool pays for its start-up
+PARALLEL_MIN_FILES = 64
+
 def register(subparsers):
-    subparsers.add_parser("validate", help="Validate OrcaSlicer profiles for syntax, structure, and inheritance")
+    parser = subparsers.add_parser("validate", help="Validate profiles for syntax, structure, value types and ranges")
+    parser.add_argument("paths", nargs="*", help="Profile files to check (default: all managed profiles)")
+    parser.add_argument("--local", action="store_true", help="Check the local repo's profiles instead of OrcaSlicer's")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="Output format")
+    parser.add_argument("--strict", action="store_true", help="Fail on warnings as well as errors")
+    parser.add_argument("--jobs", type=int, help="Worker processes for checking changed files")
+    parser.add_argument("--no-cache", action="store_true", help="Re-check every file")
+    parser.add_argument("--no-refs", action="store_true", help="Skip the inherits/compatible_printers reference checks")
 
-def run(args):
-    print("🔍 Validating OrcaSlicer user profile files...\n")
-    issues = []
+def profile_type_of(path: Path):
+    for part in reversed(path.parts[:-1]):
+        if part in PROFILE_FOLDERS:
+            return part
+    return None
 
+def collect_files(args):
+    """Return [(Path, profile type)] to validate; explicit paths are returned as given (see run)."""
+    if getattr(args, "paths", None):
+        return [(Path(p).resolve(), profile_type_of(Path(p).resolve())) for p in args.paths]
+    local = getattr(args, "local", False)
+    root = LOCAL_PROFILE_PATH if local else ORCA_USER_PATH
+    files = []
     for profile_type in PROFILE_FOLDERS:
-        folder = ORCA_USER_PATH / profile_type
-        files = [f for f in folder.rglob("*.json")
-                 if any(marker in f.name for marker in MANAGED_PROFILE_MARKERS)]
+        folder = root / profile_type
+        files += [(f, profile_type) for f in sorted(scancache.files(folder)) if f.name.endswith(".json")
+                  and (local or any(marker in f.name for marker in MANAGED_PROFILE_MARKERS))]
+    return files
 
-        if not files:
-            print(f"[{profile_type}] ⚠️ No managed profile files found.")
-            continue
+def empty_cache():
+    return {"version": schema.SCHEMA_VERSION, "stats": {}, "results": {}}
 
-        print(f"[{profile_type}] Checking {len(files)} managed file(s)...")
+def load_cache(path: Path):
+    """{"stats": {path: [size, mtime_ns, hash, type]}, "results": {"type:hash": issues}} for this schema."""
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("version") == schema.SCHEMA_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return empty_cache()
 
-        for f in files:
-            try:
-                with f.open("r", encoding="utf-8") as fp:
-                    data = json.load(fp)
-            except json.JSONDecodeError as e:
-                issues.append((profile_type, f.name, f"Invalid JSON: {str(e)}"))
+def save_cache(path: Path, cache):
+    live = {f"{t}:{h}" for _, _, h, t in cache["stats"].values()}
+    cache["results"] = {k: v for k, v in cache["results"].items() if k in live}
+    write_json_atomic(path, cache)
+
+def check_files(todo, jobs):
+    """Validate [(Path, type)]; returns [(hash, issues)] in order."""
+    paths = [str(f) for f, _ in todo]
+    types = [t for _, t in todo]
+    with trace.span("validate", files=len(todo)):
+        if len(todo) < PARALLEL_MIN_FILES or jobs == 1:
+            return list(map(schema.validate_file, paths, types))
+        workers = jobs or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(schema.validate_file, paths, types, chunksize=max(1, len(todo) // (workers * 4))))
+
+def validate(files, cache, jobs=None):
+    """Return ({path: issues}, number of files actually checked), reusing cached results."""
+    results, todo, stats = {}, [], {}
+    for f, profile_type in files:
+        try:
+            st = f.stat()
+        except OSError as e:
+            results[f] = [schema.Issue("error", None, f"Cannot read file: {e.strerror}")]
+            continue
+        stats[f] = (st.st_size, st.st_mtime_ns)
+        known = cache["stats"].get(str(f))
+        if known and tuple(known[:2]) == stats[f] and known[3] == profile_type:
+            cached = cache["results"].get(f"{profile_type}:{known[2]}")
+            if cached is not None:
+                results[f] = [schema.Issue(*issue) for issue in cached]
                 continue
+        todo.append((f, profile_type))
 
-            # Basic field checks
-            if "name" not in data:
-                issues.append((profile_type, f.name, "Missing 'name' field"))
+    for (f, profile_type), (digest, issues) in zip(todo, check_files(todo, jobs)):
+        results[f] = issues
+        cache["stats"][str(f)] = [*stats[f], digest, profile_type]
+        cache["results"][f"{profile_type}:{digest}"] = [list(issue) for issue in issues]
+    return results, len(todo)
 
-            if profile_type == "filament" and "filament_settings_id" not in data:
-                issues.append((profile_type, f.name, "Missing 'filament_settings_id'"))
+def reference_issues(files):
+    """{path: [Issue]} from the reference graph over all OrcaSlicer profiles plus files."""
+    index = open_index(CACHE_PATH, orca.ORCA_PATH)
+    with trace.span("index"):
+        index.refresh()
+    with trace.span("refs"):
+        graph = refgraph.build(index)
+    refs = {}
+    for f, profile_type in files:
+        if str(f) in graph:
+            refs[f] = index.references(f)
+            continue
+        try:
+            data = jsoncache.load(f)
+        except (OSError, ValueError):
+            continue  # already reported by the schema check
+        if isinstance(data, dict):
+            # Outside OrcaSlicer (local repo): shadows the installed profile of the same name
+            graph.add(str(f), data.get("name"), profile_type, data.get("inherits"), preferred=True)
+            refs[f] = profile_refs(data)
+    return {f: graph.check(str(f), found) for f, found in refs.items()}
+
+def run(args):
+    output = getattr(args, "format", "text")
+    strict = getattr(args, "strict", False)
+    files = collect_files(args)
+    not_json = [f for f, _ in files if not f.name.endswith(".json")]
+    untyped = [f for f, t in files if t is None and f.name.endswith(".json")]
+    files = [(f, t) for f, t in files if t is not None and f.name.endswith(".json")]
 
-            if "inherits" in data and data["inherits"].strip():
-                issues.append((profile_type, f.name, f"⚠️ Inherits from: {data['inherits']}"))
+    cache_file = CACHE_PATH / "validate_cache.json"
+    cache = empty_cache() if getattr(args, "no_cache", False) else load_cache(cache_file)
+    results, checked = validate(files, cache, getattr(args, "jobs", None))
+    if checked:
+        save_cache(cache_file, cache)
+    if not getattr(args, "no_refs", False):
+        for f, found in reference_issues(files).items():
+            results[f] = results[f] + found
 
-    # Summary
-    if issues:
-        print("❌ Issues found:")
-        for profile_type, file, msg in issues:
-            print(f"- [{profile_type}] {file}: {msg}")
+    issues = [(None, f, schema.Issue("error", None, "Not a profile (.json) file")) for f in not_json]
+    issues += [(None, f, schema.Issue("warning", None, f"Skipped: not inside a {', '.join(PROFILE_FOLDERS)} folder"))
+               for f in untyped]
+    issues += [(t, f, issue) for f, t in files for issue in results[f]]
+    errors = sum(1 for _, _, i in issues if i.severity == "error")
+    warnings = len(issues) - errors
+    failed = errors > 0 or (strict and warnings > 0)
+
+    if output == "json":
+        json.dump({
+            "ok": not failed,
+            "files": len(files),
+            "checked": checked,
+            "errors": errors,
+            "warnings": warnings,
+            "skipped": [str(f) for f in untyped],
+            "issues": [{"file": str(f), "type": t, "severity": i.severity, "key": i.key, "message": i.message}
+                       for t, f, i in issues],
+        }, sys.stdout, indent=2)
+        print()
     else:
-        print("✅ All managed Orca profiles are valid and standalone.")
\ No newline at end of file
+        print("🔍 Validating profile files...\n")
+        for profile_type in PROFILE_FOLDERS:
+            count = sum(1 for _, t in files if t == profile_type)
+            if count:
+                print(f"[{profile_type}] Checked {count} file(s).")
+            elif not getattr(args, "paths", None):
+                print(f"[{profile_type}] ⚠️ No managed profile files found.")
+        print(f"ℹ️  {checked} file(s) re-checked, {len(files) - checked} unchanged since the last run.\n")
+
+        if issues:
+            print("❌ Issues found:" if errors else "⚠️  Warnings:")
+            for profile_type, f, issue in issues:
+                icon = "❌" if issue.severity == "error" else "⚠️ "
+                key = f" {issue.key}:" if issue.key else ""
+                where = f"[{profile_type}] {f.name}" if profile_type else str(f)
+                print(f"- {icon} {where}:{key} {issue.message}")
+            print(f"\n{errors} error(s), {warnings} warning(s).")
+        else:
+            print("✅ All profiles are valid and standalone.")
+
+    if failed:
+        sys.exit(1)
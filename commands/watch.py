@@ -0,0 +1,76 @@
+import argparse
+import time
+import orca  # Main CLI loader with run_command()
+from core import journal
+from core.watcher import PollingWatcher, open_watcher
+
+DEBOUNCE_SECONDS = 0.5
+MAX_DELAY_SECONDS = 5.0
+
+def register(subparsers):
+    parser = subparsers.add_parser("watch", help="Watch the OrcaSlicer user folder and journal profile changes")
+    parser.add_argument("--auto-fetch", action="store_true", help="Fetch changed profiles into the local folder automatically")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS, help="Seconds of quiet before a burst of writes is recorded")
+    parser.add_argument("--poll", action="store_true", help="Poll file stats instead of using inotify")
+
+def auto_fetch(changed):
+    """Fetch the changed profiles; a failed fetch is reported and watching goes on."""
+    fetch = orca.load_command_module("fetch")
+    try:
+        status = fetch.fetch(argparse.Namespace(
+            filter=None, force=False, skip_newer=True, jobs=None,
+            yes=True, changed=False, paths=changed,
+        ))
+    except (OSError, SystemExit) as e:
+        print(f"⚠️  Auto-fetch failed ({e}), still watching.")
+        return
+    if status:
+        print("⚠️  Auto-fetch did not complete, still watching.")
+
+def run(args):
+    watcher = open_watcher(ORCA_USER_PATH, PROFILE_FOLDERS, poll=args.poll)
+    change_journal = journal.ChangeJournal(CACHE_PATH, ORCA_USER_PATH)
+    mode = "polling" if isinstance(watcher, PollingWatcher) else "inotify"
+    print(f"👀 Watching {ORCA_USER_PATH} ({mode}), press Ctrl+C to stop...")
+
+    pending = {}
+    first_event = last_event = None
+    try:
+        while True:
+            changes = watcher.read(args.debounce)
+            now = time.monotonic()
+            for change in changes:
+                if change is None:
+                    print("⚠️  Events were lost, starting a new journal session (next runs will rescan).")
+                    change_journal.restart()
+                    pending.clear()
+                    continue
+                rel, deleted = change
+                profile = journal.profile_path(rel)
+                if profile:
+                    pending[profile] = deleted
+                    first_event = first_event or now
+                    last_event = now
+
+            if not pending:
+                continue
+            # Wait for OrcaSlicer to finish writing the .json/.info pair
+            if now - last_event < args.debounce and now - first_event < MAX_DELAY_SECONDS:
+                continue
+
+            # Existence at flush time decides the event, not the last raw event
+            flushed = {rel: not (ORCA_USER_PATH / rel).exists() for rel in pending}
+            pending.clear()
+            first_event = last_event = None
+            for record in change_journal.record(flushed):
+                print(f"[{record['time']}] {record['event']:<8} {record['path']}")
+
+            if args.auto_fetch:
+                changed = [rel for rel, deleted in flushed.items() if not deleted]
+                if changed:
+                    auto_fetch(changed)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching.")
+    finally:
+        watcher.close()
+        change_journal.close()
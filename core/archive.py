@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import re
+import struct
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from core import copier, trace
+from core.copier import CopyResult
+
+# Archive backups: one file per snapshot, every profile compressed on its own
+# (raw deflate) against a preset dictionary trained on the profile corpus, so
+# a single profile can be extracted with one seek and one small inflate.
+#
+#   backups/archives/<name>.orcz   MAGIC, members..., zlib(JSON index), trailer
+#   backups/dicts/<digest>.zdict   dictionaries, shared by all archives
+#
+# The index maps "folder/file" -> {hash, size, mtime_ns, offset, length}; the
+# trailer holds the index offset so it is found with a single seek from the
+# end.  zlib only looks back 32 KiB, which bounds the useful dictionary size.
+ARCHIVES_DIR = "archives"
+DICTS_DIR = "dicts"
+ARCHIVE_SUFFIX = ".orcz"
+ARCHIVE_VERSION = 1
+MAGIC = b"ORCZ"
+TRAILER = struct.Struct("<4sQ")  # magic, index offset
+DICT_SIZE = 32 * 1024
+COMPRESS_LEVEL = 9
+WBITS = -15  # raw deflate: no per-member header or checksum, the index has the hash
+
+# One "key": value pair of pretty-printed or compact profile JSON
+JSON_PAIR = re.compile(rb'\s*"[^"\n]*"\s*:\s*(?:"[^"\n]*"|\[[^\]]*\]|[^,}\n]+),?')
+
+def archive_path(backup_root: Path, name: str):
+    return backup_root / ARCHIVES_DIR / f"{name}{ARCHIVE_SUFFIX}"
+
+def dict_path(backup_root: Path, digest: str):
+    return backup_root / DICTS_DIR / f"{digest}.zdict"
+
+def train_dictionary(samples, size=DICT_SIZE):
+    """Build a zlib preset dictionary from the key/value pairs shared by samples.
+
+    Pairs are ranked by the bytes they would save (occurrences beyond the
+    first times length); the best ones go last, where zlib reaches them
+    with the shortest distances.
+    """
+    counts = Counter()
+    for sample in samples:
+        counts.update(set(JSON_PAIR.findall(sample)))
+    ranked = sorted((pair for pair, n in counts.items() if n > 1),
+                    key=lambda pair: ((counts[pair] - 1) * len(pair), pair), reverse=True)
+    chosen, used = [], 0
+    for pair in ranked:
+        if used + len(pair) > size:
+            continue
+        chosen.append(pair)
+        used += len(pair)
+    return b"".join(reversed(chosen))
+
+def save_dictionary(backup_root: Path, data: bytes):
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    path = dict_path(backup_root, digest)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return digest
+
+def latest_dictionary(backup_root: Path):
+    """Digest of the dictionary used by the newest archive, if any."""
+    archives = []
+    for path in (backup_root / ARCHIVES_DIR).glob(f"*{ARCHIVE_SUFFIX}"):
+        try:
+            archives.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            pass
+    # By write time: names sort wrongly once same-second suffixes reach -10
+    for _, path in sorted(archives, reverse=True):
+        try:
+            digest = read_index(path)["dict"]
+        except (OSError, ValueError, KeyError):
+            continue
+        if dict_path(backup_root, digest).exists():
+            return digest
+    return None
+
+_dicts = {}
+
+def load_dictionary(backup_root: Path, digest: str):
+    key = (str(backup_root), digest)
+    if key not in _dicts:
+        _dicts[key] = dict_path(backup_root, digest).read_bytes()
+    return _dicts[key]
+
+def _compress(data: bytes, zdict: bytes):
+    c = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, WBITS, zdict=zdict) if zdict else \
+        zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, WBITS)
+    return c.compress(data) + c.flush()
+
+def _decompress(data: bytes, zdict: bytes):
+    d = zlib.decompressobj(WBITS, zdict=zdict) if zdict else zlib.decompressobj(WBITS)
+    return d.decompress(data) + d.flush()
+
+def write_archive(backup_root: Path, name: str, source: Path, files, train=False, jobs=None):
+    """Archive {rel: Path} as backups/archives/<name>.orcz; returns stats."""
+    started = time.perf_counter()
+    rels = sorted(files)
+    contents = copier.parallel_map(lambda rel: files[rel].read_bytes(), rels, jobs)
+    stats = [files[rel].stat() for rel in rels]
+
+    digest = None if train else latest_dictionary(backup_root)
+    trained = digest is None
+    if trained:
+        digest = save_dictionary(backup_root, train_dictionary(contents))
+    zdict = load_dictionary(backup_root, digest)
+
+    # zlib releases the GIL while deflating, so members compress in parallel
+    with trace.span("compress", files=len(contents)):
+        members = copier.parallel_map(lambda data: _compress(data, zdict), contents, jobs)
+
+    path = archive_path(backup_root, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    index = {
+        "version": ARCHIVE_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "source": str(source),
+        "dict": digest,
+        "files": {},
+    }
+    with tmp.open("wb") as f:
+        f.write(MAGIC)
+        offset = len(MAGIC)
+        for rel, data, member, st in zip(rels, contents, members, stats):
+            f.write(member)
+            index["files"][rel] = {
+                "hash": hashlib.sha256(data).hexdigest(),
+                "size": len(data),
+                "mtime_ns": st.st_mtime_ns,
+                "offset": offset,
+                "length": len(member),
+            }
+            offset += len(member)
+        f.write(zlib.compress(json.dumps(index).encode("utf-8")))
+        f.write(TRAILER.pack(MAGIC, offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    raw = sum(len(data) for data in contents)
+    return {
+        "files": len(rels),
+        "raw_bytes": raw,
+        "archive_bytes": path.stat().st_size,
+        "seconds": time.perf_counter() - started,
+        "dict": digest,
+        "trained": trained,
+    }
+
+def read_index(path: Path):
+    with path.open("rb") as f:
+        f.seek(-TRAILER.size, os.SEEK_END)
+        end = f.tell()
+        magic, offset = TRAILER.unpack(f.read(TRAILER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an orca-manager archive")
+        f.seek(offset)
+        return json.loads(zlib.decompress(f.read(end - offset)))
+
+def read_member(backup_root: Path, path: Path, rel: str):
+    """Inflate a single profile from an archive (KeyError if absent, ValueError if damaged)."""
+    index = read_index(path)
+    entry = index["files"][rel]
+    with path.open("rb") as f:
+        f.seek(entry["offset"])
+        try:
+            data = _decompress(f.read(entry["length"]), load_dictionary(backup_root, index["dict"]))
+        except zlib.error as e:
+            raise ValueError(f"{rel}: {e}, archive is damaged")
+    if hashlib.sha256(data).hexdigest() != entry["hash"]:
+        raise ValueError(f"{rel}: checksum mismatch, archive is damaged")
+    return data
+
+def extract(backup_root: Path, path: Path, entries, dst_root: Path):
+    """Write archive entries {rel: index entry} below dst_root; returns CopyResults.
+
+    Only the requested members are read and inflated.
+    """
+    index = read_index(path)
+    zdict = load_dictionary(backup_root, index["dict"])
+    results = []
+    with path.open("rb") as f:
+        for rel, entry in sorted(entries.items()):
+            dst = dst_root / rel
+            tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+            try:
+                f.seek(entry["offset"])
+                data = _decompress(f.read(entry["length"]), zdict)
+                if hashlib.sha256(data).hexdigest() != entry["hash"]:
+                    raise ValueError("checksum mismatch, archive is damaged")
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                tmp.write_bytes(data)
+                os.utime(tmp, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+                os.replace(tmp, dst)
+                results.append(CopyResult(path, dst, True, "archive", len(data), None))
+            except (OSError, ValueError, zlib.error) as e:
+                try:
+                    tmp.unlink()
+                except OSError:
+                    pass
+                results.append(CopyResult(path, dst, False, "archive", 0, str(e)))
+    return results
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import subprocess
+from pathlib import Path
+
+from core import trace
+from core.gitmeta import FIELD_SEP, LOG_FORMAT, RECORD_SEP, read_head
+from core.jsondiff import diff_values
+from core.fsutil import write_json_atomic
+
+# Setting-level blame for one profile: the file's history is listed with a
+# single `git log --follow`, every revision is streamed from one long-lived
+# `git cat-file --batch` process, and consecutive revisions are diffed key by
+# key.  Results are cached per file and HEAD.
+BLAME_VERSION = 1
+
+class BlameError(Exception):
+    pass
+
+def file_revisions(git_root: Path, path: Path):
+    """Return [(commit info, repo-relative path at that commit)], oldest first."""
+    try:
+        with trace.span("git", cmd="log --follow"):
+            result = subprocess.run(
+                ["git", "-c", "core.quotePath=false", "log", "--follow", "--name-only",
+                 f"--format={LOG_FORMAT}", "--", str(path)],
+                cwd=git_root,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+    except OSError as e:
+        raise BlameError(f"git not available: {e}")
+    revisions = []
+    for record in result.stdout.split(RECORD_SEP):
+        if not record.strip():
+            continue
+        header, _, names = record.partition("\n")
+        commit, short, author, date = header.split(FIELD_SEP)
+        names = [n for n in names.splitlines() if n]
+        if names:
+            revisions.append(({"hash": commit, "short": short, "author": author, "date": date}, names[0]))
+    revisions.reverse()
+    return revisions
+
+def stream_blobs(git_root: Path, specs):
+    """Yield the content (bytes, or None if missing) of each '<rev>:<path>' spec."""
+    try:
+        proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=git_root,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError as e:
+        raise BlameError(f"git not available: {e}")
+    try:
+        for spec in specs:
+            proc.stdin.write(spec.encode("utf-8") + b"\n")
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            if len(header) != 3 or header[-1] == b"missing":
+                yield None
+                continue
+            size = int(header[2])
+            content = proc.stdout.read(size)
+            proc.stdout.read(1)  # trailing newline
+            yield content
+    finally:
+        proc.stdin.close()
+        proc.wait()
+
+def compute_blame(git_root: Path, path: Path):
+    blame, timeline, revisions_seen = {}, {}, 0
+    previous = {}
+    revisions = file_revisions(git_root, path)
+    specs = [f"{info['hash']}:{repo_path}" for info, repo_path in revisions]
+    for (info, _), content in zip(revisions, stream_blobs(git_root, specs)):
+        if content is None:
+            current = {}
+        else:
+            try:
+                current = json.loads(content)
+            except ValueError:
+                continue  # unparsable revision: compare the next one against the last good one
+            if not isinstance(current, dict):
+                continue
+        revisions_seen += 1
+        for change in diff_values(previous, current):
+            event = dict(info, kind=change.kind, old=change.old, new=change.new)
+            blame[change.key] = event
+            timeline.setdefault(change.key, []).append(event)
+        previous = current
+    return {"revisions": revisions_seen, "blame": blame, "timeline": timeline}
+
+def profile_blame(git_root: Path, path: Path, cache_dir: Path):
+    """Blame and per-key timeline for path, cached per file and HEAD (BlameError without git)."""
+    head = read_head(git_root)
+    cache_file = cache_dir / f"{hashlib.sha1(str(Path(path).resolve()).encode()).hexdigest()}.json"
+    if head and cache_file.exists():
+        try:
+            with cache_file.open("r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("head") == head and cached.get("version") == BLAME_VERSION:
+                return cached
+        except (OSError, ValueError):
+            pass
+    result = compute_blame(git_root, path)
+    result.update({"head": head, "version": BLAME_VERSION, "path": str(path)})
+    if head:
+        try:
+            write_json_atomic(cache_file, result)
+        except OSError:
+            pass
+    return result
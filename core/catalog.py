@@ -0,0 +1,141 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from core import archive, store
+from core.fsutil import hash_file
+
+# Catalog over all backups: which version (content hash) of every profile
+# each backup holds.  A backup is read once; afterwards a stat of its
+# manifest, archive or folder tells whether it changed, so refreshing a
+# catalog of hundreds of backups costs one stat per backup.
+CATALOG_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS backups (
+    name TEXT PRIMARY KEY,
+    kind TEXT,
+    path TEXT,
+    time TEXT,
+    fingerprint TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    backup TEXT NOT NULL,
+    rel TEXT NOT NULL,
+    hash TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    PRIMARY KEY (backup, rel)
+);
+CREATE INDEX IF NOT EXISTS entries_rel ON entries (rel);
+"""
+
+def _fingerprint(path: Path):
+    st = path.stat()
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+def _read_entries(backup_root: Path, name: str, kind: str, path: Path):
+    if kind == "snapshot":
+        return store.load_snapshot(backup_root, name)["files"]
+    if kind == "archive":
+        return archive.read_index(path)["files"]
+    entries = {}
+    for item in path.rglob("*"):
+        if item.is_file():
+            st = item.stat()
+            entries[item.relative_to(path).as_posix()] = {
+                "hash": hash_file(item), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    return entries
+
+class BackupCatalog:
+    def __init__(self, db_path: Path, backup_root: Path):
+        self.db_path = Path(db_path)
+        self.backup_root = Path(backup_root)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.executescript(SCHEMA)
+        root = self.conn.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+        version = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if root is None or root[0] != str(self.backup_root) or version is None or version[0] != str(CATALOG_VERSION):
+            with self.conn:
+                self.conn.execute("DELETE FROM backups")
+                self.conn.execute("DELETE FROM entries")
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('root', ?)", (str(self.backup_root),))
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(CATALOG_VERSION),))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def refresh(self):
+        """Catalog new or changed backups and forget deleted ones; returns (read, removed)."""
+        known = {name: fp for name, fp in self.conn.execute("SELECT name, fingerprint FROM backups")}
+        seen, read = set(), 0
+        with self.conn:
+            for name, kind, path in store.list_backups(self.backup_root):
+                try:
+                    fingerprint = _fingerprint(path)
+                except OSError:
+                    continue
+                seen.add(name)
+                if known.get(name) == fingerprint:
+                    continue
+                try:
+                    entries = _read_entries(self.backup_root, name, kind, path)
+                except (OSError, ValueError, KeyError):
+                    continue  # unreadable: retried on the next refresh
+                self.conn.execute("DELETE FROM entries WHERE backup = ?", (name,))
+                self.conn.executemany(
+                    "INSERT INTO entries VALUES (?, ?, ?, ?, ?)",
+                    [(name, rel, e["hash"], e["size"], e["mtime_ns"]) for rel, e in entries.items()],
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO backups VALUES (?, ?, ?, ?, ?)",
+                    (name, kind, str(path), store.backup_time(name, path).isoformat(), fingerprint),
+                )
+                read += 1
+            removed = [name for name in known if name not in seen]
+            for name in removed:
+                self.conn.execute("DELETE FROM entries WHERE backup = ?", (name,))
+                self.conn.execute("DELETE FROM backups WHERE name = ?", (name,))
+        return read, len(removed)
+
+    def versions(self, rel: str):
+        """Every backup holding rel, oldest first: dicts with name, kind, path, time, hash, size."""
+        rows = self.conn.execute(
+            "SELECT b.name, b.kind, b.path, b.time, e.hash, e.size FROM entries e "
+            "JOIN backups b ON b.name = e.backup WHERE e.rel = ?", (rel,))
+        versions = [{"name": name, "kind": kind, "path": Path(path), "time": datetime.fromisoformat(time),
+                     "hash": digest, "size": size} for name, kind, path, time, digest, size in rows]
+        return sorted(versions, key=lambda v: (v["time"], store.name_suffix(v["name"]), v["name"]))
+
+    def changes(self, rel: str):
+        """versions() reduced to the backups where rel differs from the previous backup holding it."""
+        changed, previous = [], None
+        for version in self.versions(rel):
+            if version["hash"] != previous:
+                changed.append(version)
+            previous = version["hash"]
+        return changed
+
+    def as_of(self, when: datetime, rel: str = None):
+        """Newest backup taken at or before when (that holds rel, if given), or None."""
+        if rel is None:
+            rows = self.conn.execute(
+                "SELECT name, time FROM backups WHERE time = (SELECT MAX(time) FROM backups WHERE time <= ?)",
+                (when.isoformat(),)).fetchall()
+            return max(rows, key=lambda r: (store.name_suffix(r[0]), r[0]))[0] if rows else None
+        candidates = [v for v in self.versions(rel) if v["time"] <= when]
+        return candidates[-1]["name"] if candidates else None
+
+def open_catalog(cache_path: Path, backup_root: Path):
+    """Open and refresh the backup catalog."""
+    catalog = BackupCatalog(cache_path / "backup_catalog.sqlite", backup_root)
+    catalog.refresh()
+    return catalog
@@ -0,0 +1,215 @@
+import hashlib
+import io
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+# Resident daemon: keeps command modules, the profile index, parsed profiles
+# and git metadata loaded, and runs CLI invocations sent over a Unix socket.
+#
+# The protocol is newline-delimited JSON frames:
+#   client -> daemon  {"type": "run", "argv": [...], "cwd": "..."} | {"type": "ping"} | {"type": "stop"}
+#   daemon -> client  {"type": "out", "stream": "stdout"|"stderr", "data": "..."}
+#                     {"type": "input"}  (client answers {"type": "input", "data": line or null})
+#                     {"type": "exit", "code": n} | {"type": "pong", ...}
+#
+# A run request executes in the client's working directory, so relative paths
+# on its command line mean what they would without the daemon.
+#
+# Imports are kept light: the thin client loads this module on every call.
+SOCKET_NAME = "orca-manager.sock"
+MAX_UNIX_PATH = 100
+
+def socket_path(cache_path: Path):
+    path = cache_path / SOCKET_NAME
+    if len(str(path)) <= MAX_UNIX_PATH:
+        return path
+    import tempfile
+    digest = hashlib.sha1(str(cache_path).encode()).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"orca-manager-{os.getuid()}-{digest}.sock"
+
+class FrameConnection:
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.reader = sock.makefile("r", encoding="utf-8", newline="\n")
+
+    def send(self, frame):
+        self.sock.sendall((json.dumps(frame) + "\n").encode("utf-8"))
+
+    def receive(self):
+        line = self.reader.readline()
+        return json.loads(line) if line else None
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+class _SocketOutput(io.TextIOBase):
+    """Buffered writer: sends a frame per chunk, but at least every FLUSH_INTERVAL on new lines."""
+    FLUSH_BYTES = 16 * 1024
+    FLUSH_INTERVAL = 0.05
+
+    def __init__(self, conn: FrameConnection, stream: str):
+        self.conn = conn
+        self.stream = stream
+        self.pending = []
+        self.size = 0
+        self.last_flush = time.monotonic()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if data:
+            self.pending.append(data)
+            self.size += len(data)
+            if self.size >= self.FLUSH_BYTES or (
+                    "\n" in data and time.monotonic() - self.last_flush >= self.FLUSH_INTERVAL):
+                self.flush()
+        return len(data)
+
+    def flush(self):
+        if self.pending:
+            self.conn.send({"type": "out", "stream": self.stream, "data": "".join(self.pending)})
+            self.pending, self.size = [], 0
+        self.last_flush = time.monotonic()
+
+class _SocketInput(io.TextIOBase):
+    def __init__(self, conn: FrameConnection, outputs):
+        self.conn = conn
+        self.outputs = outputs
+
+    def readable(self):
+        return True
+
+    def readline(self, size=-1):
+        for output in self.outputs:
+            output.flush()  # the prompt must reach the user first
+        self.conn.send({"type": "input"})
+        frame = self.conn.receive()
+        if not frame or frame.get("data") is None:
+            return ""
+        return frame["data"]
+
+def serve(cache_path: Path, run_argv):
+    """Serve requests until a stop frame arrives; run_argv(argv) runs one CLI call."""
+    path = socket_path(cache_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        path.unlink()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    os.chmod(path, 0o600)
+    server.listen(8)
+    started, served = time.time(), 0
+    print(f"🚀 orca-manager daemon listening on {path} (pid {os.getpid()})", flush=True)
+
+    try:
+        while True:
+            sock, _ = server.accept()
+            conn = FrameConnection(sock)
+            try:
+                request = conn.receive()
+                if not request:
+                    continue
+                if request["type"] == "stop":
+                    conn.send({"type": "exit", "code": 0})
+                    break
+                if request["type"] == "ping":
+                    conn.send({"type": "pong", "pid": os.getpid(), "uptime": time.time() - started, "served": served})
+                    continue
+                if request["type"] == "run":
+                    served += 1
+                    conn.send({"type": "exit", "code": _run_request(conn, request["argv"], request.get("cwd"), run_argv)})
+            except (OSError, ValueError):
+                pass  # client went away
+            finally:
+                conn.close()
+    finally:
+        server.close()
+        if path.exists():
+            path.unlink()
+
+def _run_request(conn: FrameConnection, argv, cwd, run_argv):
+    saved = sys.stdout, sys.stderr, sys.stdin
+    saved_cwd = os.getcwd()
+    outputs = [_SocketOutput(conn, "stdout"), _SocketOutput(conn, "stderr")]
+    sys.stdout, sys.stderr = outputs
+    sys.stdin = _SocketInput(conn, outputs)
+    try:
+        if cwd:
+            try:
+                os.chdir(cwd)
+            except OSError as e:
+                print(f"❌ Cannot change to the working directory {cwd}: {e.strerror}")
+                return 1
+        run_argv(argv)
+        return 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except KeyboardInterrupt:
+        return 130
+    except EOFError:
+        print("\n❌ No input available.")
+        return 1
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        try:
+            for output in outputs:
+                output.flush()
+        finally:
+            sys.stdout, sys.stderr, sys.stdin = saved
+            os.chdir(saved_cwd)
+
+def connect(cache_path: Path, timeout=None):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    if timeout:
+        sock.settimeout(timeout)
+    try:
+        sock.connect(str(socket_path(cache_path)))
+    except OSError:
+        sock.close()
+        raise
+    return FrameConnection(sock)
+
+def request(cache_path: Path, frame):
+    """Send a single control frame (ping/stop) and return the reply."""
+    conn = connect(cache_path, timeout=5)
+    try:
+        conn.send(frame)
+        return conn.receive()
+    finally:
+        conn.close()
+
+def run_remote(cache_path: Path, argv):
+    """Thin client: forward argv to the daemon and relay its I/O.
+
+    Returns the exit code, or None if no daemon is reachable.
+    """
+    try:
+        conn = connect(cache_path)
+    except OSError:
+        return None
+    try:
+        conn.send({"type": "run", "argv": argv, "cwd": os.getcwd()})
+        while True:
+            frame = conn.receive()
+            if frame is None:
+                return 1
+            if frame["type"] == "out":
+                stream = sys.stderr if frame["stream"] == "stderr" else sys.stdout
+                stream.write(frame["data"])
+                stream.flush()
+            elif frame["type"] == "input":
+                line = sys.stdin.readline()
+                conn.send({"type": "input", "data": line or None})
+            elif frame["type"] == "exit":
+                return frame["code"]
+    finally:
+        conn.close()
@@ -0,0 +1,32 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def is_temporary(name: str):
+    """Temp files written next to their target before the rename into place (".<name>.<pid>.tmp")."""
+    return name.startswith(".") and name.endswith(".tmp")
+
+def is_managed(name: str, markers):
+    # A temp file left by an interrupted copy still carries the profile's marker
+    return not is_temporary(name) and any(marker in name for marker in markers)
+
+def hash_file(path: Path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def stat_key(st: os.stat_result):
+    """Cheap change detector: (size, mtime_ns) of a stat result."""
+    return [st.st_size, st.st_mtime_ns]
+
+def write_json_atomic(path: Path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
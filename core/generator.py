@@ -0,0 +1,167 @@
+import hashlib
+import itertools
+import json
+import re
+from collections import namedtuple
+
+# Parametric profile generation (`generate`).  A spec names a base profile and
+# a matrix of axes; every combination of axis values yields one profile: the
+# base with the spec's key overrides applied and its name rendered from a
+# template.  "{var}" in the name and in override values is replaced by the
+# combination's variables; other braces (G-code placeholders such as
+# {first_layer_temperature[0]}) are left alone.
+#
+#   {"type": "machine", "base": "(ON) VC4-1 IDEX 500 0.6 nozzle",
+#    "name": "(ON) VC4-1 IDEX 500{mode_label} {nozzle} nozzle",
+#    "matrix": {"nozzle": ["0.4", "0.6"],
+#               "mode": [{"value": "normal", "mode_label": ""},
+#                        {"value": "copy", "mode_label": " COPY MODE", "set": {"wipe": ["1", "1"]}}]},
+#    "set": {"nozzle_diameter": ["{nozzle}", "{nozzle}"], "printer_variant": "{nozzle}"}}
+#
+# An axis value given as an object binds its "value" to the axis name, its
+# other keys as extra variables, and applies its own "set" overrides.
+SETTINGS_ID = {"filament": "filament_settings_id", "machine": "printer_settings_id", "process": "print_settings_id"}
+# The reference list that names profiles of each type
+COMPATIBLE_KEYS = {"machine": "compatible_printers", "process": "compatible_prints"}
+SPEC_KEYS = {"id", "type", "base", "name", "matrix", "set", "unset", "extend_compatible"}
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+Generator = namedtuple("Generator", ["id", "type", "base", "name", "matrix", "overrides", "unset", "extend_compatible"])
+Variant = namedtuple("Variant", ["key", "variables", "overrides"])
+
+class SpecError(ValueError):
+    pass
+
+def render(value, variables):
+    """value with {var} placeholders replaced in every string; numbers become strings, as Orca stores them."""
+    if isinstance(value, str):
+        return PLACEHOLDER.sub(lambda m: variables.get(m.group(1), m.group(0)), value)
+    if isinstance(value, list):
+        return [render(v, variables) for v in value]
+    if isinstance(value, dict):
+        return {k: render(v, variables) for k, v in value.items()}
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+def content_hash(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+def parse_spec(spec):
+    """[Generator] from a spec: one generator object or {"generators": [...]}, run in order."""
+    items = spec.get("generators") if isinstance(spec, dict) and "generators" in spec else [spec]
+    if not isinstance(items, list) or not items:
+        raise SpecError("The spec has no generators")
+    generators = []
+    for number, item in enumerate(items, 1):
+        where = f"Generator {number}"
+        if not isinstance(item, dict):
+            raise SpecError(f"{where} must be an object")
+        unknown = sorted(set(item) - SPEC_KEYS)
+        if unknown:
+            raise SpecError(f"{where}: unknown key(s) {', '.join(unknown)}")
+        if item.get("type") not in SETTINGS_ID:
+            raise SpecError(f"{where}: \"type\" must be one of {', '.join(SETTINGS_ID)}")
+        for key in ("base", "name"):
+            if not isinstance(item.get(key), str) or not item[key].strip():
+                raise SpecError(f"{where}: \"{key}\" must be a non-empty string")
+        matrix, overrides, unset = item.get("matrix", {}), item.get("set", {}), item.get("unset", [])
+        if not isinstance(matrix, dict) or not isinstance(overrides, dict) or not isinstance(unset, list):
+            raise SpecError(f"{where}: \"matrix\" and \"set\" must be objects and \"unset\" a list")
+        generator = Generator(item.get("id") or f"{item['type']}:{item['base']}", item["type"], item["base"],
+                              item["name"], matrix, overrides, unset, bool(item.get("extend_compatible")))
+        if any(g.id == generator.id for g in generators):
+            raise SpecError(f"{where}: two generators share the id '{generator.id}' (give them an \"id\")")
+        if generator.extend_compatible and generator.type not in COMPATIBLE_KEYS:
+            raise SpecError(f"{where}: extend_compatible only applies to machine and process generators")
+        generators.append(generator)
+    return generators
+
+def _axis_values(axis, values):
+    if not isinstance(values, list) or not values:
+        raise SpecError(f"Matrix axis '{axis}' needs a non-empty list of values")
+    result = []
+    for value in values:
+        if isinstance(value, dict):
+            if "value" not in value:
+                raise SpecError(f"Matrix axis '{axis}': values given as objects need a \"value\"")
+            variables = {k: render(v, {}) for k, v in value.items() if k not in ("value", "set")}
+            variables[axis] = render(value["value"], {})
+            overrides = value.get("set", {})
+        else:
+            variables, overrides = {axis: render(value, {})}, {}
+        if not all(isinstance(v, str) for v in variables.values()):
+            raise SpecError(f"Matrix axis '{axis}': values and variables must be strings or numbers")
+        result.append((f"{axis}={variables[axis]}", variables, overrides))
+    return result
+
+def variants(matrix):
+    """Yield a Variant per combination of the matrix' axis values (one for an empty matrix)."""
+    axes = [_axis_values(axis, values) for axis, values in matrix.items()]
+    for combination in itertools.product(*axes):
+        variables, overrides = {}, {}
+        for _, axis_variables, axis_overrides in combination:
+            variables.update(axis_variables)
+            overrides.update(axis_overrides)
+        yield Variant("|".join(key for key, _, _ in combination), variables, overrides)
+
+def build(generator, base):
+    """Return [(variant key, profile)] generated from the base profile data."""
+    settings_key = SETTINGS_ID[generator.type]
+    profiles, names = [], {}
+    for variant in variants(generator.matrix):
+        variables = {"base": base.get("name", ""), **variant.variables}
+        data = json.loads(json.dumps(base))
+        for key in generator.unset:
+            data.pop(key, None)
+        data.update(render(generator.overrides, variables))
+        data.update(render(variant.overrides, variables))
+        name = render(generator.name, variables).strip()
+        missing = PLACEHOLDER.findall(name)
+        if missing:
+            raise SpecError(f"{generator.id}: unknown variable(s) {', '.join(missing)} in the name template")
+        if not name or "/" in name or "\\" in name:
+            raise SpecError(f"{generator.id}: '{name}' is not a valid profile name")
+        if name in names:
+            raise SpecError(f"{generator.id}: {names[name]} and {variant.key} both generate '{name}'")
+        names[name] = variant.key or "(base)"
+        data["name"] = name
+        as_list = isinstance(base.get(settings_key), list) or (generator.type == "filament" and settings_key not in base)
+        data[settings_key] = [name] if as_list else name
+        profiles.append((variant.key, data))
+    return profiles
+
+def relink(data, renames, removed, extend):
+    """Update references to generated profiles in one profile.
+
+    renames maps old to new names, removed holds names that are gone and
+    extend maps (reference key, name) to names to list next to it.  Returns
+    (new data or None if unchanged, [warnings]).
+    """
+    result, warnings = None, []
+    for key in COMPATIBLE_KEYS.values():
+        names = data.get(key)
+        if not isinstance(names, list):
+            continue
+        updated = []
+        for name in names:
+            if name in removed:
+                continue
+            name = renames.get(name, name)
+            for candidate in [name] + extend.get((key, name), []):
+                if candidate not in updated:
+                    updated.append(candidate)
+        if names and not updated:
+            # An empty list means "compatible with everything": keep the stale names instead
+            warnings.append(f"{key} only lists removed profile(s) {', '.join(names)}; left unchanged")
+            continue
+        if updated != names:
+            result = result or dict(data)
+            result[key] = updated
+    parent = data.get("inherits")
+    if isinstance(parent, str) and parent in renames:
+        result = result or dict(data)
+        result["inherits"] = renames[parent]
+    elif isinstance(parent, str) and parent in removed:
+        warnings.append(f"inherits removed profile '{parent}'")
+    return result, warnings
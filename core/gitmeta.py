@@ -0,0 +1,107 @@
+import json
+import subprocess
+from pathlib import Path
+
+from core import trace
+from core.fsutil import write_json_atomic
+
+# Last-commit metadata for every file below a folder, computed from a single
+# `git log` walk and cached on disk keyed by HEAD, so unchanged repositories
+# need no git process at all.
+RECORD_SEP = "\x1e"
+FIELD_SEP = "\x1f"
+LOG_FORMAT = f"{RECORD_SEP}%H{FIELD_SEP}%h{FIELD_SEP}%an{FIELD_SEP}%aI"
+
+_memory = {}
+
+def find_git_dir(path: Path):
+    for candidate in [path, *path.parents]:
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            content = dot_git.read_text().strip()
+            if content.startswith("gitdir:"):
+                return (candidate / content[len("gitdir:"):].strip()).resolve()
+    return None
+
+def read_head(path: Path):
+    """Resolve HEAD to a commit hash by reading .git directly (no subprocess)."""
+    git_dir = find_git_dir(path.resolve())
+    if git_dir is None:
+        return None
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+        if not head.startswith("ref:"):
+            return head
+        ref = head[len("ref:"):].strip()
+        common_dir = git_dir
+        if (git_dir / "commondir").exists():
+            common_dir = (git_dir / (git_dir / "commondir").read_text().strip()).resolve()
+        for base in (git_dir, common_dir):
+            ref_file = base / ref
+            if ref_file.exists():
+                return ref_file.read_text().strip()
+        packed = common_dir / "packed-refs"
+        if packed.exists():
+            for line in packed.read_text().splitlines():
+                if line.endswith(" " + ref):
+                    return line.split(" ", 1)[0]
+    except OSError:
+        pass
+    return None
+
+def parse_log(output: str):
+    files = {}
+    for record in output.split(RECORD_SEP):
+        if not record.strip():
+            continue
+        header, _, names = record.partition("\n")
+        commit, short, author, date = header.split(FIELD_SEP)
+        info = {"hash": commit, "short": short, "author": author, "date": date}
+        for name in names.splitlines():
+            if name and name not in files:
+                files[name] = info
+    return files
+
+def last_commits(git_root: Path, cache_file: Path = None):
+    """Map paths relative to git_root to their last commit (hash, short, author, date)."""
+    head = read_head(git_root)
+    key = str(git_root)
+    cached = _memory.get(key)
+    if head and cached and cached["head"] == head:
+        return cached["files"]
+    if head and cache_file and cache_file.exists():
+        try:
+            with cache_file.open("r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("head") == head and cached.get("root") == key:
+                _memory[key] = cached
+                return cached["files"]
+        except (OSError, ValueError):
+            pass
+
+    try:
+        with trace.span("git", cmd="log"):
+            result = subprocess.run(
+                ["git", "-c", "core.quotePath=false", "log", "--relative", "--name-only",
+                 f"--format={LOG_FORMAT}", "--", "."],
+                cwd=git_root,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+    except OSError:
+        return {}
+    if result.returncode != 0:
+        return {}
+
+    cached = {"head": head, "root": key, "files": parse_log(result.stdout)}
+    if head:
+        _memory[key] = cached
+        if cache_file:
+            try:
+                write_json_atomic(cache_file, cached)
+            except OSError:
+                pass
+    return cached["files"]
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+from core import jsoncache
+
+class InheritanceError(Exception):
+    pass
+
+class InheritanceResolver:
+    """Resolve OrcaSlicer 'inherits' chains to fully merged profiles.
+
+    Every ancestor is parsed and merged once and then reused for all of its
+    descendants, so flattening many profiles against a shared vendor tree
+    costs one read per distinct base profile.
+    """
+
+    def __init__(self, lookup):
+        self.lookup = lookup  # (profile name, path of the inheriting profile or None) -> Path (or None)
+        self._parsed = {}
+        self._resolved = {}
+        self._chains = {}
+
+    def load(self, path: Path):
+        if path not in self._parsed:
+            self._parsed[path] = jsoncache.load(path)
+        return self._parsed[path]
+
+    def resolve(self, name: str, _visiting=(), near=None):
+        """Return (merged profile without 'inherits', [name, parent, ...]).
+
+        near is the file of the profile inheriting name: the same name can
+        mean a different parent in another vendor's folder.
+        """
+        path = self.lookup(name, near)
+        if not path or not Path(path).exists():
+            if _visiting:
+                raise InheritanceError(f"missing ancestor '{name}' (via {' -> '.join(n for n, _ in _visiting)})")
+            raise InheritanceError(f"base profile not found: {name}")
+        path = Path(path)
+        if path in self._resolved:
+            return self._resolved[path], self._chains[path]
+        if any(p == path for _, p in _visiting):
+            cycle = " -> ".join([n for n, _ in _visiting] + [name])
+            raise InheritanceError(f"inheritance cycle: {cycle}")
+        try:
+            data = self.load(path)
+        except (OSError, ValueError) as e:
+            raise InheritanceError(f"cannot read {path}: {e}")
+
+        merged, chain = self.merge(data, _visiting + ((name, path),), near=path)
+        self._resolved[path] = merged
+        self._chains[path] = [name] + chain
+        return merged, self._chains[path]
+
+    def merge(self, profile: dict, _visiting=(), near=None):
+        """Merge profile (read from the file near, if known) over its resolved ancestors; returns (merged, ancestor names)."""
+        parent = (profile.get("inherits") or "").strip()
+        if not parent:
+            merged = dict(profile)
+            merged.pop("inherits", None)
+            return merged, []
+        base, chain = self.resolve(parent, _visiting, near)
+        merged = dict(base)
+        merged.update(profile)
+        merged.pop("inherits", None)
+        return merged, chain
@@ -0,0 +1,130 @@
+import json
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from core.fsutil import write_json_atomic
+
+# Change journal written by `orca-manager watch`.
+#
+# The watcher appends one JSON line per changed profile to JOURNAL_FILE and
+# describes itself in STATE_FILE (session id, pid, watched root).  Consumers
+# keep a cursor per name in CURSOR_FILE.  Incremental processing is only
+# trusted while the same watcher session that produced the consumer's cursor
+# is still running; otherwise consumers fall back to a full scan.
+JOURNAL_FILE = "change_journal.jsonl"
+STATE_FILE = "watch.json"
+CURSOR_FILE = "journal_cursors.json"
+
+def _load_json(path: Path, default):
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def _pid_alive(pid: int):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class ChangeJournal:
+    """Writer side, owned by the watch command."""
+
+    def __init__(self, cache_path: Path, root: Path):
+        self.cache_path = cache_path
+        self.root = root
+        self.session = uuid.uuid4().hex[:12]
+        self.seq = 0
+        cache_path.mkdir(parents=True, exist_ok=True)
+        self.file = (cache_path / JOURNAL_FILE).open("w", encoding="utf-8")
+        self._write_state()
+
+    def _write_state(self):
+        write_json_atomic(self.cache_path / STATE_FILE, {
+            "session": self.session,
+            "pid": os.getpid(),
+            "root": str(self.root),
+            "started": datetime.now().isoformat(timespec="seconds"),
+        })
+
+    def record(self, changes):
+        """Append {rel: deleted} changes; returns the records written."""
+        records = []
+        now = datetime.now().isoformat(timespec="seconds")
+        for rel, deleted in sorted(changes.items()):
+            self.seq += 1
+            record = {"seq": self.seq, "session": self.session, "time": now, "path": rel,
+                      "event": "deleted" if deleted else "changed"}
+            self.file.write(json.dumps(record) + "\n")
+            records.append(record)
+        self.file.flush()
+        return records
+
+    def restart(self):
+        """Start a new session after lost events so consumers rescan."""
+        self.file.close()
+        self.__init__(self.cache_path, self.root)
+
+    def close(self):
+        self.file.close()
+        try:
+            (self.cache_path / STATE_FILE).unlink()
+        except OSError:
+            pass
+
+def read_changes(cache_path: Path, root: Path, consumer: str):
+    """Return (changed relative paths, position) for a consumer.
+
+    The path set is None when the journal cannot be trusted (no watcher
+    running, a different root, or a new watcher session since the last
+    run); the caller must then scan everything.  Pass position to
+    commit_cursor() once the changes have been handled.
+    """
+    state = _load_json(cache_path / STATE_FILE, None)
+    if not state or state.get("root") != str(root) or not _pid_alive(state.get("pid", 0)):
+        return None, None
+    cursors = _load_json(cache_path / CURSOR_FILE, {})
+    cursor = cursors.get(consumer, {})
+
+    last_seq = 0
+    changed = set(cursor.get("pending", []))
+    try:
+        with (cache_path / JOURNAL_FILE).open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # partially written line
+                if record.get("session") != state["session"]:
+                    continue
+                last_seq = record["seq"]
+                if record["seq"] > cursor.get("seq", 0):
+                    changed.add(record["path"])
+    except OSError:
+        return None, None
+
+    position = {"session": state["session"], "seq": last_seq}
+    if cursor.get("session") != state["session"]:
+        return None, position
+    return changed, position
+
+def commit_cursor(cache_path: Path, consumer: str, position, pending=()):
+    """Advance a consumer past position, keeping unhandled paths pending."""
+    if not position:
+        return
+    cursors = _load_json(cache_path / CURSOR_FILE, {})
+    cursors[consumer] = dict(position, pending=sorted(pending))
+    write_json_atomic(cache_path / CURSOR_FILE, cursors)
+
+def profile_path(rel: str):
+    """Map a changed file to its profile: OrcaSlicer writes x.json and x.info together."""
+    path = Path(rel)
+    if path.suffix == ".info":
+        return path.with_suffix(".json").as_posix()
+    return rel if path.suffix == ".json" else None
@@ -0,0 +1,48 @@
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+from core import trace
+
+# Parsed JSON files keyed by path and validated by (size, mtime_ns), so a
+# long-lived process only re-parses files that changed.  Files are only kept
+# inside a session (the daemon, a `run` pipeline); a one-shot CLI run just
+# loads them and keeps no more in memory than the command itself does.
+# Callers must treat the returned objects as read-only.
+MAX_ENTRIES = 20000
+
+_active = False
+_cache = {}  # path -> ((size, mtime_ns), data), least recently used first
+
+@contextmanager
+def session():
+    """Keep parsed files until the block exits."""
+    global _active
+    outer = _active
+    _active = True
+    try:
+        yield
+    finally:
+        _active = outer
+        if not outer:
+            _cache.clear()
+
+def load(path: Path):
+    key = os.fspath(path)
+    st = os.stat(key)
+    stamp = (st.st_size, st.st_mtime_ns)
+    cached = _cache.pop(key, None)
+    if cached and cached[0] == stamp:
+        _cache[key] = cached
+        return cached[1]
+    with trace.span("parse"), open(key, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if _active:
+        if len(_cache) >= MAX_ENTRIES:
+            del _cache[next(iter(_cache))]
+        _cache[key] = (stamp, data)
+    return data
+
+def clear():
+    _cache.clear()
@@ -0,0 +1,60 @@
+import json
+from collections import namedtuple
+from pathlib import Path
+
+from core import jsoncache, trace
+
+COMPARE_CHUNK_SIZE = 64 * 1024
+
+Change = namedtuple("Change", ["key", "kind", "old", "new"])  # kind: added/removed/changed
+
+def files_identical(a: Path, b: Path):
+    """Byte comparison that never reads a file when the sizes differ and
+    stops at the first differing chunk otherwise."""
+    if a.stat().st_size != b.stat().st_size:
+        return False
+    with a.open("rb") as fa, b.open("rb") as fb:
+        while True:
+            chunk_a = fa.read(COMPARE_CHUNK_SIZE)
+            if chunk_a != fb.read(COMPARE_CHUNK_SIZE):
+                return False
+            if not chunk_a:
+                return True
+
+def diff_values(old, new, prefix=""):
+    """Key-level differences between two parsed profiles, sorted by key.
+
+    Nested objects are compared per key ("parent.child"); lists and scalars
+    are compared as whole values, so per-extruder lists show up as one change.
+    """
+    changes = []
+    for key in sorted(set(old) | set(new)):
+        path = f"{prefix}{key}"
+        if key not in new:
+            changes.append(Change(path, "removed", old[key], None))
+        elif key not in old:
+            changes.append(Change(path, "added", None, new[key]))
+        elif isinstance(old[key], dict) and isinstance(new[key], dict):
+            changes.extend(diff_values(old[key], new[key], f"{path}."))
+        elif old[key] != new[key]:
+            changes.append(Change(path, "changed", old[key], new[key]))
+    return changes
+
+def load_profile(path: Path):
+    data = jsoncache.load(path)
+    if not isinstance(data, dict):
+        raise ValueError("top-level JSON value is not an object")
+    return data
+
+def compare_files(old_file: Path, new_file: Path):
+    """Return (status, changes): 'same', 'equivalent' (formatting/key order
+    only) or 'differs'.  Raises ValueError if either file is not a profile."""
+    with trace.span("compare"):
+        if files_identical(old_file, new_file):
+            return "same", []
+        changes = diff_values(load_profile(old_file), load_profile(new_file))
+        return ("differs", changes) if changes else ("equivalent", [])
+
+def format_value(value, width=60):
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= width else text[:width - 3] + "..."
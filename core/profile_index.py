@@ -0,0 +1,293 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from core import trace
+from core.scancache import RACY_NS
+
+# Persistent name -> file index over an OrcaSlicer config tree (user and
+# system vendor profiles).  A refresh only re-parses files whose size or
+# mtime changed, and directories whose mtime is unchanged are not listed
+# again: their known entries are read back from the database instead.  A
+# directory modified within RACY_NS of the listing is not recorded, since a
+# file added in the same mtime tick would not move it (see core/scancache.py).
+INDEX_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    name TEXT,
+    type TEXT,
+    inherits TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    hash TEXT,
+    priority INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS refs (
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    target TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_name ON profiles (name);
+CREATE INDEX IF NOT EXISTS refs_path ON refs (path);
+CREATE INDEX IF NOT EXISTS profiles_dir ON profiles (dir);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+"""
+
+PROFILE_TYPES = ("filament", "machine", "process")
+# Settings that name other profiles
+REFERENCE_KEYS = ("inherits", "compatible_printers", "compatible_prints")
+
+def _priority(rel: str):
+    # User profiles shadow system ones with the same name
+    if rel.startswith("user/"):
+        return 0
+    if rel.startswith("system/"):
+        return 1
+    return 2
+
+def _profile_type(data, rel: str):
+    profile_type = data.get("type") if isinstance(data, dict) else None
+    if isinstance(profile_type, str) and profile_type:
+        return profile_type
+    for part in reversed(Path(rel).parts[:-1]):
+        if part in PROFILE_TYPES:
+            return part
+    return None
+
+def vendor_scope(rel: str):
+    """The vendor (system/<vendor>) or user (user/<id>) folder a profile lies in, or None."""
+    parts = rel.split("/")
+    if len(parts) > 2 and parts[0] in ("system", "user"):
+        return f"{parts[0]}/{parts[1]}"
+    return None
+
+class NameIndex:
+    """Profile name -> file, looking a parent up next to the profile that inherits it first.
+
+    Vendor folders reuse names such as "fdm_filament_common", so like
+    OrcaSlicer a name is resolved inside the inheriting profile's own vendor
+    (or user) folder and only then across the whole tree.
+    """
+
+    def __init__(self, root: Path, global_names, scoped_names):
+        self.root = root
+        self.global_names = global_names  # name -> winning path
+        self.scoped_names = scoped_names  # (scope, name) -> path
+
+    def scope_of(self, path):
+        try:
+            return vendor_scope(Path(path).relative_to(self.root).as_posix())
+        except ValueError:
+            return None  # outside the tree (e.g. the local repo)
+
+    def get(self, name: str, near=None):
+        if near is not None:
+            scope = self.scope_of(near)
+            if scope and (scope, name) in self.scoped_names:
+                return self.scoped_names[(scope, name)]
+        return self.global_names.get(name)
+
+    def __contains__(self, name):
+        return name in self.global_names
+
+def profile_refs(data):
+    """(key, profile name) for every reference a parsed profile makes."""
+    refs = []
+    if not isinstance(data, dict):
+        return refs
+    for key in REFERENCE_KEYS:
+        value = data.get(key)
+        for target in value if isinstance(value, list) else [value]:
+            if isinstance(target, str) and target.strip():
+                refs.append((key, target.strip()))
+    return refs
+
+class ProfileIndex:
+    def __init__(self, db_path: Path, root: Path):
+        self.db_path = Path(db_path)
+        self.root = Path(root)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.executescript(SCHEMA)
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+        version = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != str(self.root) or version is None or version[0] != str(INDEX_VERSION):
+            self._reset()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _reset(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM dirs")
+            self.conn.execute("DELETE FROM profiles")
+            self.conn.execute("DELETE FROM refs")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('root', ?)", (str(self.root),))
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(INDEX_VERSION),))
+
+    def _list_dir(self, rel_dir: str, full: Path, mtime_ns: int, known_dirs):
+        """Return (subdir names, json file names) of a directory."""
+        if known_dirs.get(rel_dir) == mtime_ns:
+            subdirs = [r[0] for r in self.conn.execute("SELECT path FROM dirs WHERE parent = ?", (rel_dir,))]
+            files = [r[0] for r in self.conn.execute("SELECT path FROM profiles WHERE dir = ?", (rel_dir,))]
+            return [Path(d).name for d in subdirs], [Path(f).name for f in files]
+        subdirs, files = [], []
+        with os.scandir(full) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue  # e.g. orca-manager's own staging folders
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.name.endswith(".json") and entry.is_file():
+                    files.append(entry.name)
+        return subdirs, files
+
+    def refresh(self):
+        """Bring the index up to date; returns (parsed, removed, errors)."""
+        known_dirs = dict(self.conn.execute("SELECT path, mtime_ns FROM dirs"))
+        known_files = {r[0]: (r[1], r[2]) for r in self.conn.execute("SELECT path, size, mtime_ns FROM profiles")}
+        seen_dirs, seen_files = {}, set()
+        parsed, errors = 0, []
+        racy_after = time.time_ns() - RACY_NS
+
+        with self.conn:
+            stack = [("", None)]
+            while stack:
+                rel_dir, parent = stack.pop()
+                full = self.root / rel_dir if rel_dir else self.root
+                try:
+                    mtime_ns = full.stat().st_mtime_ns
+                    subdirs, files = self._list_dir(rel_dir, full, mtime_ns, known_dirs)
+                except OSError:
+                    if parent is not None:
+                        seen_dirs[parent] = (seen_dirs[parent][0], None)
+                    continue
+                seen_dirs[rel_dir] = (parent, mtime_ns if mtime_ns < racy_after else None)
+                for name in subdirs:
+                    stack.append((f"{rel_dir}/{name}" if rel_dir else name, rel_dir))
+
+                for name in files:
+                    rel = f"{rel_dir}/{name}" if rel_dir else name
+                    try:
+                        st = (full / name).stat()
+                    except OSError:
+                        # Leave the directory unrecorded so the next refresh lists it again
+                        seen_dirs[rel_dir] = (parent, None)
+                        continue
+                    seen_files.add(rel)
+                    if known_files.get(rel) == (st.st_size, st.st_mtime_ns):
+                        continue
+                    error = self._index_file(rel_dir, rel, full / name, st)
+                    parsed += 1
+                    if error:
+                        errors.append((self.root / rel, error))
+
+            removed = [rel for rel in known_files if rel not in seen_files]
+            self.conn.executemany("DELETE FROM profiles WHERE path = ?", [(rel,) for rel in removed])
+            self.conn.executemany("DELETE FROM refs WHERE path = ?", [(rel,) for rel in removed])
+            self.conn.executemany("DELETE FROM dirs WHERE path = ?", [(d,) for d in known_dirs if d not in seen_dirs])
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)",
+                [(d, parent, mtime) for d, (parent, mtime) in seen_dirs.items()
+                 if d not in known_dirs or known_dirs[d] != mtime],
+            )
+        return parsed, len(removed), errors
+
+    def _index_file(self, rel_dir: str, rel: str, path: Path, st):
+        name = profile_type = inherits = error = None
+        refs = []
+        with trace.span("parse"):
+            try:
+                raw = path.read_bytes()
+                digest = hashlib.sha256(raw).hexdigest()
+                data = json.loads(raw)
+                if isinstance(data, dict):
+                    name = data.get("name")
+                    inherits = data.get("inherits") or None
+                    refs = profile_refs(data)
+                profile_type = _profile_type(data, rel)
+            except (OSError, ValueError) as e:
+                digest, error = None, str(e)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (rel, rel_dir, name, profile_type, inherits, st.st_size, st.st_mtime_ns, digest, _priority(rel), error),
+        )
+        self.conn.execute("DELETE FROM refs WHERE path = ?", (rel,))
+        self.conn.executemany("INSERT INTO refs VALUES (?, ?, ?)", [(rel, key, target) for key, target in refs])
+        return error
+
+    def lookup(self, name: str):
+        """Return the file for a profile name, preferring user profiles."""
+        row = self.conn.execute(
+            "SELECT path FROM profiles WHERE name = ? ORDER BY priority, path LIMIT 1", (name,)
+        ).fetchone()
+        return self.root / row[0] if row else None
+
+    def paths_by_name(self):
+        name_map = {}
+        for name, rel in self.conn.execute(
+            "SELECT name, path FROM profiles WHERE name IS NOT NULL ORDER BY priority DESC, path DESC"
+        ):
+            name_map[name] = self.root / rel
+        return name_map
+
+    def name_index(self):
+        """A NameIndex over every indexed profile."""
+        scoped = {}
+        for name, rel in self.conn.execute(
+            "SELECT name, path FROM profiles WHERE name IS NOT NULL ORDER BY path DESC"
+        ):
+            scope = vendor_scope(rel)
+            if scope:
+                scoped[(scope, name)] = self.root / rel
+        return NameIndex(self.root, self.paths_by_name(), scoped)
+
+    def profiles(self, profile_type: str = None):
+        """Yield dict rows for indexed profiles, optionally of one type."""
+        query = "SELECT path, name, type, inherits, size, mtime_ns, hash FROM profiles WHERE error IS NULL"
+        params = ()
+        if profile_type:
+            query += " AND type = ?"
+            params = (profile_type,)
+        for path, name, ptype, inherits, size, mtime_ns, digest in self.conn.execute(query, params):
+            yield {"path": self.root / path, "name": name, "type": ptype, "inherits": inherits,
+                   "size": size, "mtime_ns": mtime_ns, "hash": digest}
+
+    def references(self, path: Path):
+        """(key, profile name) references made by an indexed profile."""
+        rel = Path(path).relative_to(self.root).as_posix()
+        return list(self.conn.execute("SELECT kind, target FROM refs WHERE path = ?", (rel,)))
+
+_open_indexes = {}
+
+def open_index(cache_path: Path, orca_root: Path):
+    """Return the shared profile index for orca_root; call refresh() before use.
+
+    The connection stays open for the life of the process (the daemon keeps
+    it warm between commands), so callers must not close it.
+    """
+    db_path = cache_path / "profile_index.sqlite"
+    key = (str(db_path), str(orca_root))
+    index = _open_indexes.get(key)
+    if index is None or not db_path.exists():
+        index = _open_indexes[key] = ProfileIndex(db_path, orca_root)
+    return index
@@ -0,0 +1,123 @@
+import os
+from collections import defaultdict
+
+from core.profile_index import vendor_scope
+from core.schema import Issue
+
+# Reference graph between profiles: `inherits` edges (to a profile of any
+# type), `compatible_printers` (to machines) and `compatible_prints` (to
+# processes).  It is built from the profile index, which already holds every
+# profile's name, type and parent, so no file is read unless it changed or
+# lies outside the OrcaSlicer folder.  Inheritance chains are resolved once
+# per profile and memoised, keeping a full check linear in the number of
+# profiles.  Profiles are keyed by their path as a string.  Like OrcaSlicer,
+# a parent name is looked up in the inheriting profile's vendor folder first.
+TARGET_TYPES = {"inherits": None, "compatible_printers": "machine", "compatible_prints": "process"}
+
+class ReferenceGraph:
+    def __init__(self, root=None):
+        self.root = root  # tree whose system/<vendor> and user/<id> folders scope parent lookups
+        self.names = {}  # path -> name
+        self.parents = {}  # path -> inherited profile name
+        self.by_name = {}  # name -> path that wins the lookup
+        self.scoped = {}  # (vendor folder, name) -> path
+        self.names_by_type = defaultdict(set)
+        self._chains = None
+
+    def add(self, path: str, name, profile_type, inherits=None, preferred=False):
+        self.names[path] = name
+        self.parents[path] = inherits.strip() if isinstance(inherits, str) and inherits.strip() else None
+        if name:
+            self.names_by_type[profile_type].add(name)
+            if preferred or name not in self.by_name:
+                self.by_name[name] = path
+            scope = self._scope(path)
+            current = self.scoped.get((scope, name))
+            if scope and (current is None or path < current):
+                self.scoped[(scope, name)] = path  # same order as NameIndex: first path wins
+        self._chains = None
+
+    def _scope(self, path: str):
+        if self.root is None:
+            return None
+        rel = os.path.relpath(path, self.root)
+        return None if rel.startswith("..") else vendor_scope(rel.replace(os.sep, "/"))
+
+    def parent_of(self, path: str):
+        """Path of the profile path inherits from, or None if it inherits nothing or a missing name."""
+        target = self.parents[path]
+        if target is None:
+            return None
+        scope = self._scope(path)
+        return self.scoped.get((scope, target)) or self.by_name.get(target)
+
+    def __contains__(self, path):
+        return path in self.names
+
+    def resolves(self, key: str, target: str):
+        wanted = TARGET_TYPES[key]
+        return target in self.by_name if wanted is None else target in self.names_by_type[wanted]
+
+    def _label(self, path):
+        return self.names.get(path) or os.path.basename(path)
+
+    def chains(self):
+        """path -> None if its inherits chain resolves, else ("missing", profile, parent) or ("cycle", text, members)."""
+        if self._chains is not None:
+            return self._chains
+        state = {}
+        for start in self.names:
+            trail, position, path = [], {}, start
+            while path not in state:
+                if path in position:
+                    cycle = trail[position[path]:] + [path]
+                    text = " → ".join(self._label(p) for p in cycle)
+                    for p in cycle:
+                        state[p] = ("cycle", text, set(cycle))
+                    break
+                position[path] = len(trail)
+                trail.append(path)
+                target = self.parents[path]
+                if target is None:
+                    state[path] = None
+                elif self.parent_of(path) is None:
+                    state[path] = ("missing", path, target)
+                else:
+                    path = self.parent_of(path)
+            # Everything on the trail shares the outcome of the chain's end
+            for p in reversed(trail):
+                if p not in state:
+                    state[p] = state[self.parent_of(p)]
+        self._chains = state
+        return state
+
+    def check(self, path: str, refs):
+        """Dangling references, cycles and unusable-profile findings for one profile and its [(key, name)] refs."""
+        issues = []
+        for key, target in refs:
+            if not self.resolves(key, target):
+                kind = TARGET_TYPES[key] or "existing"
+                issues.append(Issue("error", key, f"'{target}' does not match any {kind} profile"))
+
+        chain = self.chains().get(path)
+        if chain and chain[0] == "cycle":
+            prefix = "Inheritance cycle" if path in chain[2] else "Cannot be loaded: ancestors form a cycle"
+            issues.append(Issue("error", "inherits", f"{prefix}: {chain[1]}"))
+        elif chain and chain[1] != path:
+            issues.append(Issue("error", "inherits",
+                                f"Cannot be loaded: ancestor '{self._label(chain[1])}' inherits missing '{chain[2]}'"))
+
+        for key, what in (("compatible_printers", "printer"), ("compatible_prints", "process")):
+            targets = [t for k, t in refs if k == key]
+            if targets and not any(self.resolves(key, t) for t in targets):
+                issues.append(Issue("warning", key, f"Unreachable: none of its {len(targets)} compatible {what}(s) exist"))
+        return issues
+
+def build(index):
+    """Graph over every profile in a refreshed ProfileIndex."""
+    graph = ReferenceGraph(str(index.root))
+    winners = index.paths_by_name()
+    for row in index.profiles():
+        graph.add(str(row["path"]), row["name"], row["type"], row["inherits"],
+                  preferred=winners.get(row["name"]) == row["path"])
+    return graph
@@ -0,0 +1,234 @@
+import json
+import re
+import sqlite3
+import subprocess
+from pathlib import Path
+
+from core import gitmeta, trace
+
+# Inverted index over the profiles of tracked repositories.  Each profile
+# contributes (key, value) rows to `attrs` for the keys in INDEXED_KEYS (list
+# values get one row per element), so a query is a handful of indexed
+# lookups intersected in SQLite.  A repository is re-indexed only when its
+# HEAD moved, and then only the files `git diff` reports as changed.
+INDEX_VERSION = 1
+
+INDEXED_KEYS = (
+    "repo", "folder", "name", "type", "vendor", "inherits", "compatible_printers",
+    "filament_type", "filament_vendor", "nozzle_diameter", "printer_model", "printer_variant",
+    "layer_height",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS repos (name TEXT PRIMARY KEY, head TEXT);
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    repo TEXT NOT NULL,
+    path TEXT NOT NULL,
+    name TEXT,
+    type TEXT,
+    error TEXT,
+    UNIQUE (repo, path)
+);
+CREATE TABLE IF NOT EXISTS attrs (
+    profile INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attrs_key_value ON attrs (key, value COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS attrs_profile ON attrs (profile);
+"""
+
+QUERY_TERM = re.compile(r"^([A-Za-z0-9_]+)(=|~)(.*)$")
+
+class QueryError(ValueError):
+    pass
+
+def _values(value):
+    if isinstance(value, list):
+        return [str(v) for v in value if v not in (None, "")]
+    if value in (None, ""):
+        return []
+    return [str(value)]
+
+def profile_attrs(repo: str, rel: str, data: dict):
+    """(key, value) rows indexed for one profile."""
+    attrs = {
+        "repo": [repo],
+        "folder": [rel.split("/", 1)[0]],
+        "vendor": _values(data.get("vendor")) or _values(data.get("filament_vendor")),
+    }
+    for key in INDEXED_KEYS:
+        if key not in attrs:
+            attrs[key] = _values(data.get(key))
+    if not attrs["name"]:
+        attrs["name"] = [Path(rel).stem]
+    if not attrs["type"]:
+        attrs["type"] = attrs["folder"]
+    return [(key, value) for key, values in attrs.items() for value in values]
+
+def parse_query(terms):
+    """Parse 'key=value' (exact) and 'key~text' (substring) terms; a bare word matches the name."""
+    parsed = []
+    for term in terms:
+        match = QUERY_TERM.match(term)
+        key, op, value = match.groups() if match else ("name", "~", term)
+        if key not in INDEXED_KEYS:
+            raise QueryError(f"'{key}' is not indexed (indexed keys: {', '.join(INDEXED_KEYS)})")
+        parsed.append((key, op, value))
+    return parsed
+
+class RepoIndex:
+    def __init__(self, db_path: Path, repo_root: Path, folders):
+        self.db_path = Path(db_path)
+        self.repo_root = Path(repo_root)
+        self.folders = list(folders)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.executescript(SCHEMA)
+        version = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if version is None or version[0] != str(INDEX_VERSION):
+            with self.conn:
+                for table in ("repos", "profiles", "attrs"):
+                    self.conn.execute(f"DELETE FROM {table}")
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(INDEX_VERSION),))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _changed_files(self, repo_path: Path, old: str, new: str):
+        """Paths changed between two commits, or None if git cannot tell."""
+        try:
+            with trace.span("git", cmd="diff", repo=repo_path.name):
+                proc = subprocess.run(
+                    ["git", "-C", str(repo_path), "diff", "--name-only", "--no-renames", "-z", old, new, "--", *self.folders],
+                    capture_output=True, text=True,
+                )
+        except OSError:
+            return None
+        if proc.returncode != 0:
+            return None
+        return [p for p in proc.stdout.split("\0") if p]
+
+    def _remove(self, repo: str, rel: str):
+        row = self.conn.execute("SELECT id FROM profiles WHERE repo = ? AND path = ?", (repo, rel)).fetchone()
+        if row:
+            self.conn.execute("DELETE FROM attrs WHERE profile = ?", row)
+            self.conn.execute("DELETE FROM profiles WHERE id = ?", row)
+
+    def _index_file(self, repo: str, rel: str, path: Path):
+        self._remove(repo, rel)
+        if not path.is_file():
+            return None
+        error = None
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("top-level JSON value is not an object")
+        except (OSError, ValueError) as e:
+            data, error = {}, str(e)
+        attrs = profile_attrs(repo, rel, data)
+        name = next(v for k, v in attrs if k == "name")
+        profile_type = next(v for k, v in attrs if k == "type")
+        cursor = self.conn.execute(
+            "INSERT INTO profiles (repo, path, name, type, error) VALUES (?, ?, ?, ?, ?)",
+            (repo, rel, name, profile_type, error),
+        )
+        self.conn.executemany(
+            "INSERT INTO attrs VALUES (?, ?, ?)",
+            [(cursor.lastrowid, key, value) for key, value in attrs],
+        )
+        return error
+
+    def _profile_paths(self, repo_path: Path):
+        for folder in self.folders:
+            base = repo_path / folder
+            if base.is_dir():
+                for p in base.rglob("*.json"):
+                    if p.is_file():
+                        yield p.relative_to(repo_path).as_posix()
+
+    def _version(self, repo_path: Path):
+        """HEAD commit of a checkout; plain folders fall back to their directory mtimes."""
+        if (repo_path / ".git").exists():
+            head = gitmeta.read_head(repo_path)
+            if head:
+                return head
+        stamps = []
+        for folder in self.folders:
+            try:
+                stamps.append(str((repo_path / folder).stat().st_mtime_ns))
+            except OSError:
+                stamps.append("-")
+        return "mtime:" + ",".join(stamps)
+
+    def update_paths(self, repo: str, rels):
+        """Re-index specific files after orca-manager changed them in a checkout."""
+        with self.conn:
+            for rel in rels:
+                if rel.endswith(".json") and rel.split("/", 1)[0] in self.folders:
+                    self._index_file(repo, rel, self.repo_root / repo / rel)
+
+    def refresh(self, repos, force=False):
+        """Bring the index up to date; returns {repo: number of files re-indexed}."""
+        known = dict(self.conn.execute("SELECT name, head FROM repos"))
+        updated = {}
+        with self.conn:
+            for gone in set(known) - set(repos):
+                self.conn.execute("DELETE FROM attrs WHERE profile IN (SELECT id FROM profiles WHERE repo = ?)", (gone,))
+                self.conn.execute("DELETE FROM profiles WHERE repo = ?", (gone,))
+                self.conn.execute("DELETE FROM repos WHERE name = ?", (gone,))
+
+            for repo in repos:
+                repo_path = self.repo_root / repo
+                if not repo_path.is_dir():
+                    continue
+                head = self._version(repo_path)
+                old = known.get(repo)
+                if not force and old == head:
+                    continue
+
+                changed = None
+                if not force and old and not old.startswith("mtime:") and not head.startswith("mtime:"):
+                    changed = self._changed_files(repo_path, old, head)
+                if changed is None:
+                    self.conn.execute("DELETE FROM attrs WHERE profile IN (SELECT id FROM profiles WHERE repo = ?)", (repo,))
+                    self.conn.execute("DELETE FROM profiles WHERE repo = ?", (repo,))
+                    changed = list(self._profile_paths(repo_path))
+                changed = [rel for rel in changed if rel.endswith(".json")]
+                for rel in changed:
+                    self._index_file(repo, rel, repo_path / rel)
+                self.conn.execute("INSERT OR REPLACE INTO repos VALUES (?, ?)", (repo, head))
+                updated[repo] = len(changed)
+        return updated
+
+    def search(self, terms, limit=None):
+        """Yield (repo, path, name, type) for profiles matching all terms."""
+        clauses, params = [], []
+        for key, op, value in parse_query(terms):
+            if op == "=":
+                clauses.append("SELECT profile FROM attrs WHERE key = ? AND value = ? COLLATE NOCASE")
+                params += [key, value]
+            else:
+                escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                clauses.append("SELECT profile FROM attrs WHERE key = ? AND value LIKE ? ESCAPE '\\'")
+                params += [key, f"%{escaped}%"]
+        query = "SELECT repo, path, name, type FROM profiles"
+        if clauses:
+            query += " WHERE id IN (" + " INTERSECT ".join(clauses) + ")"
+        query += " ORDER BY repo, path"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        yield from self.conn.execute(query, params)
+
+    def errors(self):
+        return list(self.conn.execute("SELECT repo, path, error FROM profiles WHERE error IS NOT NULL ORDER BY repo, path"))
@@ -0,0 +1,175 @@
+import os
+import shutil
+import time
+from collections import Counter
+from pathlib import Path
+
+from core import archive, copier, store
+
+# Backup retention.  A policy keeps:
+#   keep_last     the N newest backups
+#   hourly/daily/weekly
+#                 the newest backup of each of the N most recent hours/days/ISO weeks
+#   max_total_mb  then drops the oldest kept backups until the backups folder
+#                 (objects counted once, however many snapshots share them)
+#                 fits; the newest backup is never dropped
+# A value of 0 or None disables that rule.  Everything not kept is deleted,
+# followed by the objects and dictionaries no remaining backup refers to.
+#
+# Folder copies made before snapshots existed are never pruned unless asked
+# for (`prune --include-legacy`): they are always kept, outside the rules and
+# the size budget, so upgrading does not silently delete them.
+BUCKETS = {
+    "hourly": "%Y-%m-%d %H",
+    "daily": "%Y-%m-%d",
+    "weekly": "%G-W%V",
+}
+# Objects are written before their snapshot manifest, so recently created
+# ones may belong to a backup still in progress in another process.
+GC_GRACE_SECONDS = 3600
+
+def _folder_size(path: Path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+def describe_backups(backup_root: Path):
+    """Return backups oldest-last with their time, objects {hash: size} and own size."""
+    described = []
+    for name, kind, path in store.list_backups(backup_root):
+        backup = {"name": name, "kind": kind, "path": path, "time": store.backup_time(name, path),
+                  "objects": {}, "own_size": 0, "dict": None, "readable": True}
+        try:
+            if kind == "snapshot":
+                files = store.load_snapshot(backup_root, name)["files"]
+                backup["objects"] = {e["hash"]: e["size"] for e in files.values()}
+                backup["own_size"] = path.stat().st_size
+            elif kind == "archive":
+                backup["own_size"] = path.stat().st_size
+                backup["dict"] = archive.read_index(path)["dict"]
+            else:
+                backup["own_size"] = _folder_size(path.parent)
+        except (OSError, ValueError, KeyError):
+            backup["readable"] = False  # judged by name and time only
+        described.append(backup)
+    return described
+
+def plan(backups, policy, include_legacy=False):
+    """Split backups (newest first) into (kept [(backup, reasons)], deleted [backup])."""
+    if not include_legacy:
+        legacy = [b for b in backups if b["kind"] == "folder"]
+        kept, deleted = plan([b for b in backups if b["kind"] != "folder"], policy, include_legacy=True)
+        return kept + [(b, ["legacy folder"]) for b in legacy], deleted
+    reasons = {b["name"]: [] for b in backups}
+    keep_last = policy.get("keep_last") or 0
+    for b in backups[:keep_last]:
+        reasons[b["name"]].append("last")
+
+    for bucket, fmt in BUCKETS.items():
+        limit = policy.get(bucket) or 0
+        seen = set()
+        for b in backups:
+            if len(seen) >= limit:
+                break
+            key = b["time"].strftime(fmt)
+            if key not in seen:
+                seen.add(key)
+                reasons[b["name"]].append(bucket)
+
+    if not any(policy.get(rule) for rule in ("keep_last", *BUCKETS)):
+        for b in backups:
+            reasons[b["name"]].append("no rule")
+
+    kept = [b for b in backups if reasons[b["name"]]]
+    max_total = policy.get("max_total_mb")
+    if max_total and kept:
+        limit = max_total * 1024 * 1024
+        refs = Counter()
+        sizes = {}
+        for b in kept:
+            refs.update(b["objects"].keys())
+            sizes.update(b["objects"])
+        total = sum(sizes.values()) + sum(b["own_size"] for b in kept)
+        while total > limit and len(kept) > 1:
+            oldest = kept.pop()
+            reasons[oldest["name"]] = []
+            total -= oldest["own_size"]
+            for digest in oldest["objects"]:
+                refs[digest] -= 1
+                if refs[digest] == 0:
+                    total -= sizes[digest]
+
+    kept_names = {b["name"] for b in kept}
+    return ([(b, reasons[b["name"]]) for b in kept],
+            [b for b in backups if b["name"] not in kept_names])
+
+def unreferenced_objects(backup_root: Path, kept):
+    """Yield (path, size) of stored objects no kept snapshot refers to."""
+    referenced = set()
+    for b in kept:
+        referenced.update(b["objects"])
+    objects_dir = backup_root / store.OBJECTS_DIR
+    if not objects_dir.exists() or not all(b["readable"] for b in kept if b["kind"] == "snapshot"):
+        return  # cannot tell what an unreadable snapshot needs: collect nothing
+    cutoff = time.time() - GC_GRACE_SECONDS
+    with os.scandir(objects_dir) as prefixes:
+        for prefix in prefixes:
+            if not prefix.is_dir():
+                continue
+            with os.scandir(prefix.path) as entries:
+                for entry in entries:
+                    if prefix.name + entry.name in referenced:
+                        continue
+                    st = entry.stat()
+                    if st.st_ctime < cutoff:
+                        yield Path(entry.path), st.st_size
+
+def unreferenced_dicts(backup_root: Path, kept):
+    used = {b["dict"] for b in kept if b["dict"]}
+    dicts_dir = backup_root / archive.DICTS_DIR
+    if not dicts_dir.exists() or not all(b["readable"] for b in kept if b["kind"] == "archive"):
+        return []
+    cutoff = time.time() - GC_GRACE_SECONDS
+    return [(p, st.st_size) for p in dicts_dir.glob("*.zdict")
+            if p.stem not in used and (st := p.stat()).st_ctime < cutoff]
+
+def _delete(path: Path):
+    try:
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+        return True
+    except FileNotFoundError:
+        return True
+    except OSError:
+        return False
+
+def garbage(backup_root: Path, kept):
+    """(path, size) of objects and dictionaries that only deleted backups use."""
+    kept = [b for b, _ in kept]
+    return list(unreferenced_objects(backup_root, kept)) + unreferenced_dicts(backup_root, kept)
+
+def _targets(deleted):
+    return [(b["path"].parent if b["kind"] == "folder" else b["path"], b["own_size"]) for b in deleted]
+
+def estimate_freed(backup_root: Path, kept, deleted):
+    return sum(size for _, size in _targets(deleted)) + sum(size for _, size in garbage(backup_root, kept))
+
+def apply(backup_root: Path, kept, deleted, jobs=None):
+    """Delete backups, then the objects/dictionaries left unreferenced; returns (deleted names, bytes freed)."""
+    # Manifests go first: an interrupted prune then only leaves orphaned objects
+    targets = _targets(deleted)
+    results = copier.parallel_map(lambda t: _delete(t[0]), targets, jobs)
+    removed = [b["name"] for b, ok in zip(deleted, results) if ok]
+    freed = sum(size for (_, size), ok in zip(targets, results) if ok)
+    orphans = garbage(backup_root, kept)
+    for (_, size), ok in zip(orphans, copier.parallel_map(lambda g: _delete(g[0]), orphans, jobs)):
+        if ok:
+            freed += size
+    return removed, freed
@@ -0,0 +1,80 @@
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Directory listings of profile folders, shared by the steps of a `run`
+# pipeline.  Outside a session every call walks the folder as before.  Inside
+# one, a folder's listing is reused for as long as none of its directories'
+# mtimes changed, so a step that adds, removes or renames profiles only gets
+# the folders it touched listed again.  Edits in place keep a listing valid;
+# file contents have their own stat checks (jsoncache, the sync manifest, the
+# profile index).
+#
+# A directory modified shortly before it was listed may change again without
+# its (coarse) mtime moving, so such listings are not reused.
+RACY_NS = 2 * 10**9
+
+_active = False
+_listings = {}  # folder -> ({directory: mtime_ns}, [files])
+
+@contextmanager
+def session():
+    """Share folder listings until the block exits."""
+    global _active
+    outer = _active
+    _active = True
+    try:
+        yield
+    finally:
+        _active = outer
+        if not outer:
+            _listings.clear()
+
+def _walk(folder: str):
+    """Return ({directory: mtime_ns}, files, whether a directory changed right before the walk)."""
+    started = time.time_ns()
+    stamps, files, stack = {}, [], [folder]
+    while stack:
+        directory = stack.pop()
+        try:
+            stamps[directory] = os.stat(directory).st_mtime_ns
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    files.append(Path(entry.path))
+            except OSError:
+                continue
+    racy = any(mtime_ns >= started - RACY_NS for mtime_ns in stamps.values())
+    return stamps, files, racy
+
+def _unchanged(stamps):
+    for directory, mtime_ns in stamps.items():
+        try:
+            if os.stat(directory).st_mtime_ns != mtime_ns:
+                return False
+        except OSError:
+            return False
+    return True
+
+def files(folder: Path):
+    """Every regular file below folder, recursively (empty if it does not exist)."""
+    key = os.fspath(folder)
+    if not os.path.isdir(key):
+        _listings.pop(key, None)
+        return []
+    if _active:
+        cached = _listings.get(key)
+        if cached and _unchanged(cached[0]):
+            return list(cached[1])
+    stamps, found, racy = _walk(key)
+    if _active and not racy:
+        _listings[key] = (stamps, found)
+    else:
+        _listings.pop(key, None)
+    return list(found)
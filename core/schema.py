@@ -0,0 +1,259 @@
+import hashlib
+import json
+import re
+from collections import namedtuple
+
+# Value schema for OrcaSlicer profiles.  Orca stores every setting as a
+# string, or as a list of strings with one element per extruder (machine),
+# per filament (filament) or per printing mode (machine limits: normal and
+# silent).  A spec is (kind, shape, min, max):
+#   kind   float | int | bool | percent (float or "N%") | enum:<a|b|...> | str
+#   shape  scalar | extruder | filament | modes | list
+# Filament overrides may hold "nil" (= use the printer's value).
+SCHEMA_VERSION = 1
+
+Spec = namedtuple("Spec", ["kind", "shape", "min", "max"])
+Issue = namedtuple("Issue", ["severity", "key", "message"])  # severity: error | warning
+
+def _spec(kind, shape="scalar", lo=None, hi=None):
+    return Spec(kind, shape, lo, hi)
+
+TEMP = (0, 500)
+BED_TEMP = (0, 150)
+SPEED = (0, 2000)
+ACCEL = (0, 200000)
+
+SCHEMA = {
+    "filament": {
+        "filament_type": _spec("str", "filament"),
+        "filament_vendor": _spec("str", "filament"),
+        "filament_settings_id": _spec("str", "filament"),
+        "compatible_printers": _spec("str", "list"),
+        "compatible_prints": _spec("str", "list"),
+        "nozzle_temperature": _spec("int", "filament", *TEMP),
+        "nozzle_temperature_initial_layer": _spec("int", "filament", *TEMP),
+        "nozzle_temperature_range_low": _spec("int", "filament", *TEMP),
+        "nozzle_temperature_range_high": _spec("int", "filament", *TEMP),
+        "idle_temperature": _spec("int", "filament", *TEMP),
+        "chamber_temperature": _spec("int", "filament", 0, 120),
+        "temperature_vitrification": _spec("int", "filament", *TEMP),
+        "hot_plate_temp": _spec("int", "filament", *BED_TEMP),
+        "hot_plate_temp_initial_layer": _spec("int", "filament", *BED_TEMP),
+        "cool_plate_temp": _spec("int", "filament", *BED_TEMP),
+        "cool_plate_temp_initial_layer": _spec("int", "filament", *BED_TEMP),
+        "textured_plate_temp": _spec("int", "filament", *BED_TEMP),
+        "textured_plate_temp_initial_layer": _spec("int", "filament", *BED_TEMP),
+        "eng_plate_temp": _spec("int", "filament", *BED_TEMP),
+        "eng_plate_temp_initial_layer": _spec("int", "filament", *BED_TEMP),
+        "filament_diameter": _spec("float", "filament", 0.5, 4),
+        "filament_density": _spec("float", "filament", 0, 10),
+        "filament_cost": _spec("float", "filament", 0, None),
+        "filament_flow_ratio": _spec("float", "filament", 0.1, 2),
+        "filament_max_volumetric_speed": _spec("float", "filament", 0, 200),
+        "pressure_advance": _spec("float", "filament", 0, 2),
+        "enable_pressure_advance": _spec("bool", "filament"),
+        "fan_min_speed": _spec("int", "filament", 0, 100),
+        "fan_max_speed": _spec("int", "filament", 0, 100),
+        "overhang_fan_speed": _spec("int", "filament", 0, 100),
+        "additional_cooling_fan_speed": _spec("int", "filament", 0, 100),
+        "close_fan_the_first_x_layers": _spec("int", "filament", 0, 1000),
+        "slow_down_min_speed": _spec("float", "filament", 0, SPEED[1]),
+        "slow_down_layer_time": _spec("float", "filament", 0, 1000),
+        "filament_retraction_length": _spec("float", "filament", 0, 50),
+        "filament_retraction_speed": _spec("float", "filament", 0, 1000),
+        "filament_z_hop": _spec("float", "filament", 0, 20),
+        "filament_shrink": _spec("percent", "filament", 50, 150),
+        "filament_soluble": _spec("bool", "filament"),
+        "filament_is_support": _spec("bool", "filament"),
+    },
+    "machine": {
+        "printer_settings_id": _spec("str"),
+        "printer_model": _spec("str"),
+        "printer_variant": _spec("str"),
+        "printer_technology": _spec("enum:FFF|SLA"),
+        "gcode_flavor": _spec("enum:marlin|marlin2|klipper|reprapfirmware|repetier|teacup|makerware|"
+                              "sailfish|mach3|machinekit|smoothie|no-extrusion"),
+        "nozzle_diameter": _spec("float", "extruder", 0.05, 3),
+        "max_layer_height": _spec("float", "extruder", 0, 3),
+        "min_layer_height": _spec("float", "extruder", 0, 3),
+        "retraction_length": _spec("float", "extruder", 0, 50),
+        "retraction_speed": _spec("float", "extruder", 0, 1000),
+        "deretraction_speed": _spec("float", "extruder", 0, 1000),
+        "retract_length_toolchange": _spec("float", "extruder", 0, 200),
+        "retraction_minimum_travel": _spec("float", "extruder", 0, 1000),
+        "retract_before_wipe": _spec("percent", "extruder", 0, 100),
+        "wipe": _spec("bool", "extruder"),
+        "wipe_distance": _spec("float", "extruder", 0, 100),
+        "z_hop": _spec("float", "extruder", 0, 20),
+        "extruder_offset": _spec("str", "extruder"),
+        "extruder_colour": _spec("str", "extruder"),
+        "printable_height": _spec("float", "scalar", 0, 5000),
+        "printable_area": _spec("str", "list"),
+        "machine_max_speed_x": _spec("float", "modes", *SPEED),
+        "machine_max_speed_y": _spec("float", "modes", *SPEED),
+        "machine_max_speed_z": _spec("float", "modes", *SPEED),
+        "machine_max_speed_e": _spec("float", "modes", *SPEED),
+        "machine_max_acceleration_x": _spec("float", "modes", *ACCEL),
+        "machine_max_acceleration_y": _spec("float", "modes", *ACCEL),
+        "machine_max_acceleration_z": _spec("float", "modes", *ACCEL),
+        "machine_max_acceleration_e": _spec("float", "modes", *ACCEL),
+        "machine_max_acceleration_extruding": _spec("float", "modes", *ACCEL),
+        "machine_max_acceleration_retracting": _spec("float", "modes", *ACCEL),
+        "machine_max_acceleration_travel": _spec("float", "modes", *ACCEL),
+        "machine_max_jerk_x": _spec("float", "modes", 0, 1000),
+        "machine_max_jerk_y": _spec("float", "modes", 0, 1000),
+        "machine_max_jerk_z": _spec("float", "modes", 0, 1000),
+        "machine_max_jerk_e": _spec("float", "modes", 0, 1000),
+        "use_relative_e_distances": _spec("bool"),
+        "use_firmware_retraction": _spec("bool"),
+        "single_extruder_multi_material": _spec("bool"),
+    },
+    "process": {
+        "print_settings_id": _spec("str"),
+        "compatible_printers": _spec("str", "list"),
+        "layer_height": _spec("float", "scalar", 0.01, 3),
+        "initial_layer_print_height": _spec("float", "scalar", 0.01, 3),
+        "line_width": _spec("percent", "scalar", 0, 1000),
+        "initial_layer_line_width": _spec("percent", "scalar", 0, 1000),
+        "outer_wall_line_width": _spec("percent", "scalar", 0, 1000),
+        "inner_wall_line_width": _spec("percent", "scalar", 0, 1000),
+        "sparse_infill_line_width": _spec("percent", "scalar", 0, 1000),
+        "wall_loops": _spec("int", "scalar", 0, 1000),
+        "top_shell_layers": _spec("int", "scalar", 0, 1000),
+        "bottom_shell_layers": _spec("int", "scalar", 0, 1000),
+        "sparse_infill_density": _spec("percent", "scalar", 0, 100),
+        "outer_wall_speed": _spec("float", "scalar", *SPEED),
+        "inner_wall_speed": _spec("float", "scalar", *SPEED),
+        "sparse_infill_speed": _spec("float", "scalar", *SPEED),
+        "internal_solid_infill_speed": _spec("float", "scalar", *SPEED),
+        "top_surface_speed": _spec("float", "scalar", *SPEED),
+        "gap_infill_speed": _spec("float", "scalar", *SPEED),
+        "support_speed": _spec("float", "scalar", *SPEED),
+        "bridge_speed": _spec("float", "scalar", *SPEED),
+        "initial_layer_speed": _spec("float", "scalar", *SPEED),
+        "travel_speed": _spec("float", "scalar", *SPEED),
+        "default_acceleration": _spec("float", "scalar", *ACCEL),
+        "outer_wall_acceleration": _spec("float", "scalar", *ACCEL),
+        "inner_wall_acceleration": _spec("float", "scalar", *ACCEL),
+        "travel_acceleration": _spec("float", "scalar", *ACCEL),
+        "initial_layer_acceleration": _spec("float", "scalar", *ACCEL),
+        "enable_support": _spec("bool"),
+        "enable_prime_tower": _spec("bool"),
+        "spiral_mode": _spec("bool"),
+        "wall_generator": _spec("enum:classic|arachne"),
+        "seam_position": _spec("enum:nearest|aligned|back|random"),
+        "print_sequence": _spec("enum:by layer|by object"),
+        "support_type": _spec("enum:normal(auto)|tree(auto)|normal(manual)|tree(manual)"),
+    },
+}
+
+SETTINGS_ID = {"filament": "filament_settings_id", "machine": "printer_settings_id", "process": "print_settings_id"}
+NUMBER = re.compile(r"^-?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$")
+
+def _check_value(spec: Spec, value: str):
+    """Return an error message for one string value, or None."""
+    if spec.kind == "str":
+        return None
+    if spec.kind.startswith("enum:"):
+        allowed = spec.kind[5:].split("|")
+        return None if value in allowed else f"'{value}' is not one of {', '.join(allowed)}"
+    if spec.kind == "bool":
+        return None if value in ("0", "1") else f"'{value}' is not 0 or 1"
+    text = value
+    if spec.kind == "percent" and text.endswith("%"):
+        text = text[:-1]
+    if not NUMBER.match(text.strip()):
+        return f"'{value}' is not a number"
+    number = float(text)
+    if spec.kind == "int" and not number.is_integer():
+        return f"'{value}' is not a whole number"
+    if spec.min is not None and number < spec.min:
+        return f"{value} is below the minimum of {spec.min:g}"
+    if spec.max is not None and number > spec.max:
+        return f"{value} is above the maximum of {spec.max:g}"
+    return None
+
+def _arity(data: dict):
+    """Expected list length for each shape in this profile."""
+    extruders = data.get("nozzle_diameter")
+    filaments = data.get("filament_settings_id") or data.get("filament_type")
+    return {
+        "extruder": len(extruders) if isinstance(extruders, list) and extruders else None,
+        "filament": len(filaments) if isinstance(filaments, list) and filaments else None,
+    }
+
+def validate_profile(profile_type: str, data):
+    """Check a parsed profile; returns a list of Issues."""
+    if not isinstance(data, dict):
+        return [Issue("error", None, "top-level JSON value is not an object")]
+    issues = []
+    if not data.get("name"):
+        issues.append(Issue("error", "name", "Missing 'name' field"))
+    settings_id = SETTINGS_ID.get(profile_type)
+    if settings_id and settings_id not in data and not (data.get("inherits") or "").strip():
+        severity = "error" if profile_type == "filament" else "warning"
+        issues.append(Issue(severity, settings_id, f"Missing '{settings_id}'"))
+    if isinstance(data.get("inherits"), str) and data["inherits"].strip():
+        issues.append(Issue("warning", "inherits", f"Inherits from: {data['inherits']} (not standalone)"))
+
+    schema = SCHEMA.get(profile_type, {})
+    arity = _arity(data)
+    for key, value in data.items():
+        spec = schema.get(key)
+        if spec is None:
+            continue  # not covered by the schema
+        if spec.shape == "scalar":
+            if not isinstance(value, str):
+                issues.append(Issue("error", key, f"Expected a single value, got {type(value).__name__}"))
+                continue
+            values = [value]
+        else:
+            if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                issues.append(Issue("error", key, "Expected a list of strings"))
+                continue
+            values = value
+            expected = arity.get(spec.shape)
+            if spec.shape == "modes" and len(values) not in (1, 2):
+                issues.append(Issue("error", key, f"Expected 1 or 2 values (normal/silent mode), got {len(values)}"))
+            elif expected is not None and len(values) != expected:
+                issues.append(Issue("error", key, f"Expected {expected} value(s), one per {spec.shape}, got {len(values)}"))
+        for v in values:
+            if profile_type == "filament" and v == "nil":
+                continue
+            message = _check_value(spec, v)
+            if message:
+                issues.append(Issue("error", key, message))
+                break
+
+    issues.extend(_check_pairs(data))
+    return issues
+
+def _first_number(data, key):
+    value = data.get(key)
+    if isinstance(value, list):
+        value = value[0] if value else None
+    try:
+        return float(str(value).rstrip("%"))
+    except (TypeError, ValueError):
+        return None
+
+def _check_pairs(data):
+    issues = []
+    for low_key, high_key in (("nozzle_temperature_range_low", "nozzle_temperature_range_high"),
+                              ("min_layer_height", "max_layer_height"),
+                              ("fan_min_speed", "fan_max_speed")):
+        low, high = _first_number(data, low_key), _first_number(data, high_key)
+        if low is not None and high is not None and high > 0 and low > high:
+            issues.append(Issue("warning", low_key, f"{low_key} ({low:g}) is above {high_key} ({high:g})"))
+    return issues
+
+def validate_file(path: str, profile_type: str):
+    """Read, hash and check one file; returns (sha256, [Issue]).  Runs in worker processes."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    try:
+        data = json.loads(raw)
+    except ValueError as e:
+        return digest, [Issue("error", None, f"Invalid JSON: {e}")]
+    return digest, validate_profile(profile_type, data)
@@ -0,0 +1,179 @@
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+from core import archive, copier, scancache, trace
+from core.fsutil import hash_file, is_managed, write_json_atomic
+
+# Backups are kept as a content-addressed object store:
+#   backups/objects/ab/cdef...     one blob per unique file content (sha256)
+#   backups/snapshots/<name>.json  manifest mapping "folder/file" -> blob
+# Compressed single-file archives (see core/archive.py) live next to them.
+# Older backups made as plain folder copies (backups/<name>/default/...) are
+# still listed and restorable.
+OBJECTS_DIR = "objects"
+SNAPSHOTS_DIR = "snapshots"
+TARGETS_DIR = "targets"  # backups of other push targets, one backup folder each (see core/targets.py)
+RESERVED_DIRS = {OBJECTS_DIR, SNAPSHOTS_DIR, TARGETS_DIR, archive.ARCHIVES_DIR, archive.DICTS_DIR}  # mirrored by orca.BACKUP_STORE_DIRS
+SNAPSHOT_VERSION = 1
+TIMESTAMP_FORMAT = "%Y-%m-%d_%H%M%S"
+NAME_SUFFIX = re.compile(r"-\d+$")  # same-second backups get -1, -2, ...
+
+def object_path(backup_root: Path, digest: str):
+    return backup_root / OBJECTS_DIR / digest[:2] / digest[2:]
+
+def snapshot_path(backup_root: Path, name: str):
+    return backup_root / SNAPSHOTS_DIR / f"{name}.json"
+
+def load_snapshot(backup_root: Path, name: str):
+    with snapshot_path(backup_root, name).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+def list_backups(backup_root: Path):
+    """Return (name, kind, path) for every backup, newest first."""
+    backups = []
+    if not backup_root.exists():
+        return backups
+    snapshots_dir = backup_root / SNAPSHOTS_DIR
+    if snapshots_dir.exists():
+        for f in snapshots_dir.glob("*.json"):
+            backups.append((f.stem, "snapshot", f))
+    archives_dir = backup_root / archive.ARCHIVES_DIR
+    if archives_dir.exists():
+        for f in archives_dir.glob(f"*{archive.ARCHIVE_SUFFIX}"):
+            backups.append((f.stem, "archive", f))
+    for d in backup_root.iterdir():
+        if d.is_dir() and d.name not in RESERVED_DIRS:
+            backups.append((d.name, "folder", d / "default"))
+    return sorted(backups, key=_backup_order, reverse=True)
+
+def backup_time(name: str, path: Path):
+    """When a backup was taken, from its name (or its mtime for other names)."""
+    try:
+        return datetime.strptime(NAME_SUFFIX.sub("", name), TIMESTAMP_FORMAT)
+    except ValueError:
+        return datetime.fromtimestamp(path.stat().st_mtime)
+
+def name_suffix(name: str):
+    """The same-second suffix of a backup name as a number (0 without one), so -10 sorts after -9."""
+    suffix = NAME_SUFFIX.search(name)
+    return int(suffix.group()[1:]) if suffix else 0
+
+def _backup_order(backup):
+    name, _, path = backup
+    try:
+        taken = backup_time(name, path)
+    except OSError:
+        taken = datetime.min  # legacy folder without its default/ subfolder
+    return taken, name_suffix(name), name
+
+def read_backup_file(backup_root: Path, name: str, kind: str, path: Path, rel: str):
+    """Content of one "folder/file" profile as stored in a backup (KeyError if absent)."""
+    if kind == "snapshot":
+        entry = load_snapshot(backup_root, name)["files"][rel]
+        return object_path(backup_root, entry["hash"]).read_bytes()
+    if kind == "archive":
+        return archive.read_member(backup_root, path, rel)
+    file = path / rel
+    if not file.is_file():
+        raise KeyError(rel)
+    return file.read_bytes()
+
+def latest_snapshot(backup_root: Path, source: Path):
+    for name, kind, _ in list_backups(backup_root):
+        if kind != "snapshot":
+            continue
+        try:
+            manifest = load_snapshot(backup_root, name)
+        except (OSError, ValueError):
+            continue
+        if manifest.get("source") == str(source):
+            return manifest
+    return None
+
+def new_snapshot_name(backup_root: Path):
+    name = datetime.now().strftime(TIMESTAMP_FORMAT)
+    candidate, n = name, 1
+    while (snapshot_path(backup_root, candidate).exists() or archive.archive_path(backup_root, candidate).exists()
+           or (backup_root / candidate).exists()):
+        candidate = f"{name}-{n}"
+        n += 1
+    return candidate
+
+def scan_source(source: Path, folders, markers):
+    files = {}
+    with trace.span("scan", root=source):
+        for folder in folders:
+            src = source / folder
+            for item in scancache.files(src):
+                if not is_managed(item.name, markers):
+                    continue
+                files[f"{folder}/{item.relative_to(src).as_posix()}"] = item
+    return files
+
+def create_snapshot(backup_root: Path, source: Path, folders, markers, jobs=None):
+    """Snapshot the managed files of source; returns (name, [(rel, status)]).
+
+    Files whose size and mtime match the previous snapshot of the same source
+    reuse its hash without being read, so only changed files are hashed and
+    only new content is copied into the object store.
+    """
+    previous = latest_snapshot(backup_root, source) or {}
+    previous_files = previous.get("files", {})
+    entries = {}
+    statuses = {}
+    to_hash = []
+
+    for rel, path in sorted(scan_source(source, folders, markers).items()):
+        st = path.stat()
+        entries[rel] = {"hash": None, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        prev = previous_files.get(rel)
+        if (prev and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns
+                and object_path(backup_root, prev["hash"]).exists()):
+            entries[rel]["hash"] = prev["hash"]
+            statuses[rel] = "unchanged"
+        else:
+            to_hash.append((rel, path))
+
+    new_objects = {}
+    with trace.span("hash", files=len(to_hash)):
+        digests = copier.parallel_map(lambda e: hash_file(e[1]), to_hash, jobs)
+    for (rel, path), digest in zip(to_hash, digests):
+        entries[rel]["hash"] = digest
+        if object_path(backup_root, digest).exists() or digest in new_objects:
+            statuses[rel] = "deduplicated"
+        else:
+            new_objects[digest] = (rel, path)
+            statuses[rel] = "stored"
+
+    copy_jobs = [(path, object_path(backup_root, digest)) for digest, (_, path) in new_objects.items()]
+    for (rel, _), result in zip(new_objects.values(), copier.copy_files(copy_jobs, jobs)):
+        if not result.ok:
+            raise OSError(f"Failed to store {rel}: {result.error}")
+
+    name = new_snapshot_name(backup_root)
+    write_json_atomic(snapshot_path(backup_root, name), {
+        "version": SNAPSHOT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "source": str(source),
+        "files": entries,
+    })
+    return name, [(rel, statuses[rel]) for rel in sorted(entries)]
+
+def create_archive(backup_root: Path, source: Path, folders, markers, train=False, jobs=None):
+    """Back up the managed files of source as one compressed archive; returns (name, stats)."""
+    name = new_snapshot_name(backup_root)
+    stats = archive.write_archive(backup_root, name, source, scan_source(source, folders, markers), train, jobs)
+    return name, stats
+
+def materialize(backup_root: Path, entries, dst_root: Path, jobs=None):
+    """Write snapshot entries {rel: entry} below dst_root; returns CopyResults.
+
+    Objects are always copied (reflinked where the filesystem can): a link
+    would let edits in place rewrite the stored object under every snapshot.
+    """
+    copy_jobs = [(object_path(backup_root, entry["hash"]), dst_root / rel, entry["mtime_ns"])
+                 for rel, entry in sorted(entries.items())]
+    return copier.copy_files(copy_jobs, jobs)
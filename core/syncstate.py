@@ -0,0 +1,128 @@
+import json
+from pathlib import Path
+
+from core import scancache, trace
+from core.fsutil import hash_file, is_managed, stat_key, write_json_atomic
+
+# The sync manifest remembers, per OrcaSlicer/local folder pair, the content
+# hash and both sides' (size, mtime_ns) at the last fetch or push.  A side
+# whose stat still matches is known to be unchanged without reading it, and
+# comparing each side's hash with the recorded one tells which side changed.
+MANIFEST_VERSION = 1
+
+# Plan states, seen from the OrcaSlicer side ("orca") and the git side ("local")
+SAME = "same"
+ORCA_ONLY = "orca only"
+LOCAL_ONLY = "local only"
+ORCA_CHANGED = "orca changed"
+LOCAL_CHANGED = "local changed"
+CONFLICT = "conflict"
+
+def pair_key(orca_root: Path, local_root: Path):
+    return f"{orca_root}|{local_root}"
+
+def load_manifest(path: Path):
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == MANIFEST_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "pairs": {}}
+
+def save_manifest(path: Path, manifest):
+    write_json_atomic(path, manifest)
+
+def scan_profiles(root: Path, folders, markers, match: str = ""):
+    """Map "folder/relative/path.json" to the file for every managed profile."""
+    files = {}
+    with trace.span("scan", root=root):
+        for folder in folders:
+            folder_path = root / folder
+            for f in scancache.files(folder_path):
+                if not f.name.endswith(".json") or not is_managed(f.name, markers):
+                    continue
+                if match and match.lower() not in f.name.lower():
+                    continue
+                files[f"{folder}/{f.relative_to(folder_path).as_posix()}"] = f
+    return files
+
+def profiles_from_paths(root: Path, rels, folders, markers, match: str = ""):
+    """Like scan_profiles, but only for known candidate paths (e.g. from the watch journal)."""
+    files = {}
+    for rel in rels:
+        folder, _, name = rel.partition("/")
+        path = root / rel
+        if folder not in folders or not rel.endswith(".json") or not is_managed(Path(name).name, markers):
+            continue
+        if match and match.lower() not in Path(name).name.lower():
+            continue
+        if path.is_file():
+            files[rel] = path
+    return files
+
+class SyncPlan:
+    def __init__(self, manifest, orca_root: Path, local_root: Path):
+        self.manifest = manifest
+        self.entries = manifest["pairs"].setdefault(pair_key(orca_root, local_root), {})
+        self.orca_root = orca_root
+        self.local_root = local_root
+        self.items = []
+
+    def _side_hash(self, path: Path, st, entry, side):
+        if entry and entry.get(side) == stat_key(st):
+            return entry["hash"]
+        return hash_file(path)
+
+    def build(self, orca_files, local_files, only_rels=None):
+        rels = set(orca_files) | set(local_files) if only_rels is None else set(only_rels)
+        with trace.span("compare", files=len(rels)):
+            return self._build(orca_files, local_files, rels)
+
+    def _build(self, orca_files, local_files, rels):
+        for rel in sorted(rels):
+            orca_file = orca_files.get(rel)
+            local_file = local_files.get(rel)
+            if not orca_file and not local_file:
+                continue
+            entry = self.entries.get(rel)
+            item = {"rel": rel, "orca": orca_file, "local": local_file, "entry": entry}
+
+            if orca_file and not local_file:
+                item["state"] = ORCA_ONLY
+            elif local_file and not orca_file:
+                item["state"] = LOCAL_ONLY
+            else:
+                orca_st, local_st = orca_file.stat(), local_file.stat()
+                orca_hash = self._side_hash(orca_file, orca_st, entry, "orca")
+                local_hash = self._side_hash(local_file, local_st, entry, "local")
+                item["orca_hash"], item["local_hash"] = orca_hash, local_hash
+                if orca_hash == local_hash:
+                    item["state"] = SAME
+                    self.entries[rel] = {"hash": orca_hash, "orca": stat_key(orca_st), "local": stat_key(local_st)}
+                elif entry:
+                    orca_changed = orca_hash != entry["hash"]
+                    local_changed = local_hash != entry["hash"]
+                    if orca_changed and local_changed:
+                        item["state"] = CONFLICT
+                    else:
+                        item["state"] = ORCA_CHANGED if orca_changed else LOCAL_CHANGED
+                else:
+                    # Never synced: fall back to modification times
+                    item["state"] = ORCA_CHANGED if orca_st.st_mtime > local_st.st_mtime else LOCAL_CHANGED
+            self.items.append(item)
+        return self
+
+    def record(self, rel: str, digest: str = None):
+        """Remember both sides of rel as in sync (after a copy)."""
+        orca_file = self.orca_root / rel
+        local_file = self.local_root / rel
+        self.entries[rel] = {
+            "hash": digest or hash_file(local_file),
+            "orca": stat_key(orca_file.stat()),
+            "local": stat_key(local_file.stat()),
+        }
+
+    def forget(self, rel: str):
+        self.entries.pop(rel, None)
@@ -0,0 +1,74 @@
+import hashlib
+import os
+import re
+from collections import namedtuple
+from pathlib import Path
+
+from core import store
+
+# Push targets: OrcaSlicer user folders besides the configured one, named by
+# user ID (a folder in OrcaSlicer's user directory) or by path (a user
+# folder, an OrcaSlicer config folder or a home directory, e.g. a mounted
+# workstation).  Each target has its own entry in the sync manifest and its
+# own backups below backups/targets/<label>/.
+Target = namedtuple("Target", ["label", "root"])
+
+class TargetError(ValueError):
+    pass
+
+def _user_folder(path: Path, folders):
+    for candidate in (path, path / "user" / "default", path / ".config" / "OrcaSlicer" / "user" / "default"):
+        if any((candidate / folder).is_dir() for folder in folders):
+            return candidate
+    return None
+
+def label_for(root: Path):
+    return re.sub(r"[^\w.-]+", "_", str(root).strip("/\\")) or "root"
+
+def resolve(spec: str, user_root: Path, folders):
+    """Target for a user ID or a folder (TargetError if there is no profile folder there)."""
+    if os.sep not in spec and "/" not in spec and spec not in (".", ".."):
+        root = user_root / spec
+        if not root.is_dir():
+            raise TargetError(f"No OrcaSlicer user folder '{spec}' in {user_root}")
+        return Target(spec, root)
+    path = Path(spec).expanduser().resolve()
+    if not path.is_dir():
+        raise TargetError(f"{spec} is not a folder")
+    root = _user_folder(path, folders)
+    if root is None:
+        raise TargetError(f"{spec} has no OrcaSlicer profile folders ({', '.join(folders)})")
+    if user_root.is_dir() and root.parent == user_root.resolve():
+        return Target(root.name, user_root / root.name)
+    return Target(label_for(path), root)
+
+def all_users(user_root: Path):
+    """Every user folder in OrcaSlicer's user directory."""
+    if not user_root.is_dir():
+        return []
+    return [Target(d.name, d) for d in sorted(user_root.iterdir()) if d.is_dir() and not d.name.startswith(".")]
+
+def unique(found):
+    """Drop targets that point at the same folder, keeping the first.
+
+    Different folders can end up with the same label ("a b" and "a_b"); as
+    the label names the target's backup folder, a later one gets the hash of
+    its path appended.
+    """
+    seen, labels, result = set(), set(), []
+    for target in found:
+        key = os.path.realpath(target.root)
+        if key in seen:
+            continue
+        seen.add(key)
+        if target.label in labels:
+            target = target._replace(label=f"{target.label}-{hashlib.sha1(key.encode()).hexdigest()[:8]}")
+        labels.add(target.label)
+        result.append(target)
+    return result
+
+def backup_root(backup_path: Path, target: Target, default_root: Path):
+    """Where a target's backups go: the usual backups folder for the configured user folder."""
+    if os.path.realpath(target.root) == os.path.realpath(default_root):
+        return backup_path
+    return backup_path / store.TARGETS_DIR / target.label
@@ -0,0 +1,163 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+# Opt-in phase tracing (`orca-manager --trace`).  Code marks its phases with
+#
+#   with trace.span("copy", files=len(entries)):
+#       ...
+#
+# which is a shared no-op unless tracing was enabled.  While enabled, every
+# span records its duration plus what happened inside it: files opened for
+# reading and writing and subprocesses started (from a Python audit hook),
+# and bytes read and written by the process (/proc/self/io, Linux only).
+# The spans are written as a Chrome trace (chrome://tracing, Perfetto) and
+# summed per phase name into a table.
+MAX_EVENTS = 200000  # beyond this only the per-phase summary is kept
+IO_FIELDS = {"rchar": "bytes_read", "wchar": "bytes_written"}
+COLUMNS = ("files_read", "files_written", "bytes_read", "bytes_written", "subprocesses")
+
+_NULL = nullcontext()
+_lock = threading.Lock()
+_enabled = False
+_hooked = False
+_io_fd = None
+_origin = 0
+_events = []
+_counters = Counter()
+_summary = defaultdict(Counter)
+
+def _audit(event, args):
+    if not _enabled:
+        return
+    if event == "open":
+        mode, flags = args[1], args[2] or 0
+        if isinstance(mode, str):
+            writing = any(c in mode for c in "wax+")
+        else:
+            writing = bool(flags & (os.O_WRONLY | os.O_RDWR))
+        _counters["files_written" if writing else "files_read"] += 1
+    elif event == "subprocess.Popen":
+        _counters["subprocesses"] += 1
+
+def _io():
+    if _io_fd is None:
+        return {}
+    try:
+        raw = os.pread(_io_fd, 4096, 0).decode("ascii")
+    except OSError:
+        return {}
+    values = {}
+    for line in raw.splitlines():
+        key, _, value = line.partition(":")
+        if key in IO_FIELDS:
+            values[IO_FIELDS[key]] = int(value)
+    return values
+
+def _snapshot():
+    values = dict(_counters)
+    values.update(_io())
+    return values
+
+def enabled():
+    return _enabled
+
+def enable():
+    """Start a new trace (clears the previous one)."""
+    global _enabled, _hooked, _io_fd, _origin
+    if not _hooked:
+        sys.addaudithook(_audit)  # audit hooks cannot be removed; _enabled gates it
+        _hooked = True
+    if _io_fd is None:
+        try:
+            _io_fd = os.open("/proc/self/io", os.O_RDONLY)
+        except OSError:
+            pass
+    _events.clear()
+    _counters.clear()
+    _summary.clear()
+    _origin = time.perf_counter_ns()
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def count(name: str, n: int = 1):
+    """Add to a custom counter (e.g. bytes copied by copy_file_range, which /proc/self/io misses)."""
+    if _enabled:
+        with _lock:
+            _counters[name] += n
+
+def span(name: str, **args):
+    """Context manager timing one phase; args are stored with the span in the trace."""
+    if not _enabled:
+        return _NULL
+    return _span(name, args)
+
+@contextmanager
+def _span(name, args):
+    before = _snapshot()
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end = time.perf_counter_ns()
+        after = _snapshot()
+        delta = {k: v - before.get(k, 0) for k, v in after.items() if v != before.get(k, 0)}
+        with _lock:
+            summary = _summary[name]
+            summary["calls"] += 1
+            summary["ns"] += end - start
+            summary.update(delta)
+            if len(_events) < MAX_EVENTS:
+                _events.append({
+                    "name": name, "cat": name.split(":", 1)[0], "ph": "X",
+                    "ts": (start - _origin) / 1000, "dur": (end - start) / 1000,
+                    "pid": os.getpid(), "tid": threading.get_ident(),
+                    "args": {**{k: str(v) if isinstance(v, Path) else v for k, v in args.items()}, **delta},
+                })
+
+def summary():
+    """Per-phase totals, slowest first: dicts with name, calls, ms and the COLUMNS counters."""
+    rows = [{"name": name, "calls": s["calls"], "ms": s["ns"] / 1e6, **{c: s.get(c, 0) for c in COLUMNS}}
+            for name, s in _summary.items()]
+    return sorted(rows, key=lambda r: r["ms"], reverse=True)
+
+def write(path: Path, metadata=None):
+    """Write the Chrome trace JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        data = {
+            "traceEvents": list(_events),
+            "displayTimeUnit": "ms",
+            "otherData": {**(metadata or {}), "counters": dict(_counters), "dropped_events": max(0, sum(
+                s["calls"] for s in _summary.values()) - len(_events))},
+        }
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+def format_bytes(n: int):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+def print_summary(file=None):
+    file = file or sys.stderr
+    print("\n{:<28} {:>7} {:>10} {:>8} {:>8} {:>10} {:>10} {:>6}".format(
+        "Phase", "Calls", "Total ms", "Read", "Written", "Bytes in", "Bytes out", "Procs"), file=file)
+    print("-" * 94, file=file)
+    for row in summary():
+        print("{:<28} {:>7} {:>10.1f} {:>8} {:>8} {:>10} {:>10} {:>6}".format(
+            row["name"][:28], row["calls"], row["ms"], row["files_read"], row["files_written"],
+            format_bytes(row["bytes_read"]), format_bytes(row["bytes_written"]), row["subprocesses"]), file=file)
+    extra = {k: v for k, v in _counters.items() if k not in COLUMNS}
+    if extra:
+        print("Counters: " + ", ".join(f"{k}={v}" for k, v in sorted(extra.items())), file=file)
@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from core import copier
+
+# Transactional writes into an OrcaSlicer profile folder.
+#
+# Every changed file is first copied into <target>/.orca-manager/staging/<id>
+# (same filesystem as the target) and a write-ahead journal listing all
+# operations is saved.  Committing then only renames: the current file is
+# moved aside into the transaction's undo folder and the staged file is
+# renamed into place.  Each step is idempotent and its progress can be read
+# back from the filesystem (a staged file that is gone has been committed),
+# so an interrupted commit can always be resumed or rolled back.
+#
+# Staged files and their directories are fsynced before the journal is
+# written, and the renamed directories before it is removed: after a crash
+# the journal never refers to data that did not reach the disk.
+TXN_DIR = ".orca-manager"
+JOURNAL_NAME = "push-journal.json"
+
+PREPARED = "prepared"
+COMMITTING = "committing"
+
+class TransactionError(Exception):
+    pass
+
+def _fsync(path: Path):
+    """fsync a file or directory (directories make renames and new entries durable)."""
+    fd = os.open(path, os.O_RDONLY | (os.O_DIRECTORY if path.is_dir() else 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _write_journal(path: Path, journal):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(journal, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync(path.parent)
+
+class PushTransaction:
+    def __init__(self, target: Path):
+        self.target = Path(target)
+        self.txn_root = self.target / TXN_DIR
+        self.journal_path = self.txn_root / JOURNAL_NAME
+        self.journal = None
+
+    # -- state ---------------------------------------------------------------
+
+    def pending(self):
+        """Return the journal of an unfinished transaction, if any."""
+        if not self.journal_path.exists():
+            return None
+        with self.journal_path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _paths(self, op):
+        staging = self.txn_root / "staging" / self.journal["id"]
+        return self.target / op["rel"], staging / "files" / op["rel"], staging / "undo" / op["rel"]
+
+    def _finish(self):
+        shutil.rmtree(self.txn_root / "staging" / self.journal["id"], ignore_errors=True)
+        self.journal_path.unlink(missing_ok=True)
+        try:
+            (self.txn_root / "staging").rmdir()
+            self.txn_root.rmdir()
+        except OSError:
+            pass
+
+    # -- phases --------------------------------------------------------------
+
+    def stage(self, writes, deletes, jobs=None):
+        """Copy (src, rel) writes into staging and record the journal.
+
+        Returns the CopyResults of staging; failed files are left out of the
+        transaction.  Nothing in the target folder is touched yet.
+        """
+        if self.pending():
+            raise TransactionError(f"an unfinished push exists in {self.txn_root}")
+        self.journal = {"id": uuid.uuid4().hex[:12], "target": str(self.target), "state": PREPARED, "ops": []}
+        staging = self.txn_root / "staging" / self.journal["id"]
+        results = copier.copy_files([(src, staging / "files" / rel) for src, rel in writes], jobs)
+
+        ops = [{"rel": rel, "action": "write"} for (_, rel), result in zip(writes, results) if result.ok]
+        ops += [{"rel": rel, "action": "delete"} for rel in deletes]
+        self.journal["ops"] = ops
+        (staging / "undo").mkdir(parents=True, exist_ok=True)
+        staged = [staging / "files" / op["rel"] for op in ops if op["action"] == "write"]
+        directories = {path.parent for path in staged} | {staging / "files", staging, staging.parent, self.txn_root}
+        try:
+            copier.parallel_map(_fsync, staged + [d for d in directories if d.is_dir()], jobs)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        _write_journal(self.journal_path, self.journal)
+        return results
+
+    def commit(self):
+        """Apply all staged operations by rename; returns the committed ops."""
+        self.journal = self.journal or self.pending()
+        if not self.journal:
+            raise TransactionError("no push to commit")
+        self.journal["state"] = COMMITTING
+        _write_journal(self.journal_path, self.journal)
+
+        for op in self.journal["ops"]:
+            target, staged, undo = self._paths(op)
+            if op["action"] == "write" and not staged.exists():
+                continue  # already committed
+            if target.exists() and not undo.exists():
+                undo.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(target, undo)
+            if op["action"] == "write":
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(staged, target)
+
+        ops = self.journal["ops"]
+        copier.parallel_map(_fsync, {(self.target / op["rel"]).parent for op in ops
+                                     if (self.target / op["rel"]).parent.is_dir()})
+        self._finish()
+        return ops
+
+    def rollback(self):
+        """Undo a partially committed transaction and discard staging."""
+        self.journal = self.journal or self.pending()
+        if not self.journal:
+            raise TransactionError("no push to roll back")
+
+        restored = []
+        if self.journal["state"] == COMMITTING:
+            for op in reversed(self.journal["ops"]):
+                target, staged, undo = self._paths(op)
+                if undo.exists():
+                    os.replace(undo, target)
+                    restored.append(op["rel"])
+                elif op["action"] == "write" and not staged.exists() and target.exists():
+                    target.unlink()  # file did not exist before the push
+                    restored.append(op["rel"])
+        self._finish()
+        return restored
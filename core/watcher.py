@@ -0,0 +1,124 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+# Minimal inotify binding (Linux) with a stat-polling fallback.  Both
+# watchers report paths relative to their root via read(timeout), which
+# returns a list of (relative path, deleted) tuples; a None entry means
+# events were lost and callers must assume everything may have changed.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct("iIII")
+
+class InotifyWatcher:
+    def __init__(self, root: Path, folders):
+        libc_name = ctypes.util.find_library("c")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = Path(root)
+        self.watches = {}
+        for folder in folders:
+            (self.root / folder).mkdir(parents=True, exist_ok=True)
+            self._add_tree(self.root / folder)
+
+    def _add_tree(self, directory: Path):
+        for current, dirs, _ in os.walk(directory):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(current), WATCH_MASK)
+            if wd >= 0:
+                self.watches[wd] = Path(current)
+
+    def read(self, timeout: float):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changes, offset = [], 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                changes.append(None)
+                continue
+            directory = self.watches.get(wd)
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            if directory is None or not name or name.startswith("."):
+                continue
+            path = directory / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(path)
+                    changes.extend((p.relative_to(self.root).as_posix(), False) for p in path.rglob("*") if p.is_file())
+                continue
+            deleted = bool(mask & (IN_DELETE | IN_MOVED_FROM))
+            changes.append((path.relative_to(self.root).as_posix(), deleted))
+        return changes
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback for systems without inotify: compares stat data every interval."""
+
+    def __init__(self, root: Path, folders, interval: float = 1.0):
+        self.root = Path(root)
+        self.folders = folders
+        self.interval = interval
+        self.state = self._scan()
+
+    def _scan(self):
+        state = {}
+        for folder in self.folders:
+            for path in (self.root / folder).rglob("*"):
+                if path.is_file() and not path.name.startswith("."):
+                    st = path.stat()
+                    state[path.relative_to(self.root).as_posix()] = (st.st_size, st.st_mtime_ns)
+        return state
+
+    def read(self, timeout: float):
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        changes = [(rel, False) for rel, key in current.items() if self.state.get(rel) != key]
+        changes += [(rel, True) for rel in self.state if rel not in current]
+        self.state = current
+        return changes
+
+    def close(self):
+        pass
+
+def open_watcher(root: Path, folders, poll=False):
+    if not poll:
+        try:
+            return InotifyWatcher(root, folders)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, folders)
@@ -2,8 +2,10 @@
 
 import argparse
 import importlib.util
+import json
 import os
 import sys
+from datetime import datetime
 from pathlib import Path
 
 # Constants
@@ -14,6 +16,7 @@ LOCAL_ROOT = Path(__file__).parent
 LOCAL_PROFILE_PATH = LOCAL_ROOT / "orca_profiles" / "default"
 GIT_ROOT_PATH = LOCAL_PROFILE_PATH
 BACKUP_PATH = LOCAL_ROOT / "backups"
+CACHE_PATH = LOCAL_ROOT / ".cache"
 PROFILE_FOLDERS = ["filament", "machine", "process"]
 MANAGED_PROFILE_MARKERS = ["ODG_", "(ON)"]
 #MANAGED_PROFILE_MARKERS = [""]
@@ -21,79 +24,312 @@ MANAGED_PROFILE_MARKERS = ["ODG_", "(ON)"]
 COMMANDS_DIR = LOCAL_ROOT / "commands"
 
 BACKUP_WARNING_LIMIT = 25
+# Applied after every backup and by `prune` (see core/retention.py); 0/None disables a rule
+BACKUP_RETENTION = {
+    "keep_last": 10,
+    "hourly": 24,
+    "daily": 14,
+    "weekly": 8,
+    "max_total_mb": 500,
+}
+# Folders of the backup store that are not backups themselves (store.RESERVED_DIRS)
+BACKUP_STORE_DIRS = {"objects", "snapshots", "targets", "archives", "dicts"}
 RED = "\033[91m"
 RESET = "\033[0m"
 
+# Command modules are only imported when they run.  Their names, help texts
+# and arguments are recorded once into COMMAND_MANIFEST (refreshed whenever a
+# command file changes) so the CLI parser can be built without executing them.
+COMMAND_MANIFEST = CACHE_PATH / "commands.json"
+MANIFEST_VERSION = 1
+ARGUMENT_TYPES = {"int": int, "float": float, "str": str}
+
+_loaded_modules = {}  # module name -> (file fingerprint, module)
+
+# Opt-in resident daemon (see commands/daemon.py).  Long-running or
+# process-managing commands always run in the calling process.
+DAEMON_ENV = "ORCA_MANAGER_DAEMON"
+LOCAL_ONLY_COMMANDS = {"daemon", "watch"}
+
+# --trace output (see core/trace.py)
+TRACE_PATH = CACHE_PATH / "traces"
+GLOBAL_OPTIONS_WITH_VALUE = {"--trace-out"}
+
+class _Unrecordable(Exception):
+    pass
+
+class _ArgumentRecorder:
+    def __init__(self):
+        self.arguments = []
+
+    def add_argument(self, *flags, **kwargs):
+        if "type" in kwargs:
+            type_name = getattr(kwargs["type"], "__name__", None)
+            if type_name not in ARGUMENT_TYPES:
+                raise _Unrecordable(f"argument type {kwargs['type']!r}")
+            kwargs["type"] = type_name
+        try:
+            json.dumps(kwargs)
+        except TypeError as e:
+            raise _Unrecordable(str(e))
+        self.arguments.append({"flags": list(flags), "kwargs": kwargs})
+
+    def __getattr__(self, name):
+        raise _Unrecordable(f"parser.{name}()")
+
+class _SubparserRecorder:
+    def __init__(self):
+        self.commands = []
+
+    def add_parser(self, name, **kwargs):
+        recorder = _ArgumentRecorder()
+        self.commands.append({"name": name, "kwargs": kwargs, "recorder": recorder})
+        return recorder
+
+    def __getattr__(self, name):
+        raise _Unrecordable(f"subparsers.{name}()")
+
+def _inject_globals(mod):
+    mod.ORCA_USER_ROOT = ORCA_USER_ROOT
+    mod.ORCA_USER_PATH = ORCA_USER_PATH
+    mod.LOCAL_ROOT = LOCAL_ROOT
+    mod.LOCAL_PROFILE_PATH = LOCAL_PROFILE_PATH
+    mod.GIT_ROOT_PATH = GIT_ROOT_PATH
+    mod.BACKUP_PATH = BACKUP_PATH
+    mod.BACKUP_RETENTION = BACKUP_RETENTION
+    mod.CACHE_PATH = CACHE_PATH
+    mod.PROFILE_FOLDERS = PROFILE_FOLDERS
+    mod.MANAGED_PROFILE_MARKERS = MANAGED_PROFILE_MARKERS
+
+def load_command_module(module_name: str):
+    """Import commands/<module_name>.py once per process and return it.
+
+    The module is imported again if the file changed, so a long-running
+    daemon picks up edited commands.
+    """
+    file = COMMANDS_DIR / f"{module_name}.py"
+    st = file.stat()
+    fingerprint = (st.st_size, st.st_mtime_ns)
+    cached = _loaded_modules.get(module_name)
+    if cached and cached[0] == fingerprint:
+        return cached[1]
+    spec = importlib.util.spec_from_file_location(module_name, file)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    _inject_globals(mod)
+    _loaded_modules[module_name] = (fingerprint, mod)
+    return mod
+
+def _describe_command(file: Path):
+    mod = load_command_module(file.stem)
+    if not (hasattr(mod, "register") and hasattr(mod, "run")):
+        return {"module": file.stem, "commands": []}
+    recorder = _SubparserRecorder()
+    try:
+        mod.register(recorder)
+    except _Unrecordable:
+        # Parser features we cannot replay: always register this one eagerly
+        return {"module": file.stem, "eager": True, "commands": []}
+    return {"module": file.stem, "commands": [
+        {"name": c["name"], "kwargs": c["kwargs"], "arguments": c["recorder"].arguments}
+        for c in recorder.commands
+    ]}
+
+def load_command_manifest():
+    try:
+        with COMMAND_MANIFEST.open("r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("version") != MANIFEST_VERSION:
+            cached = {}
+    except (OSError, ValueError):
+        cached = {}
+    cached_files = cached.get("files", {})
+
+    files = {}
+    changed = False
+    for file in sorted(COMMANDS_DIR.glob("*.py")):
+        st = file.stat()
+        fingerprint = [st.st_size, st.st_mtime_ns]
+        entry = cached_files.get(file.name)
+        if not entry or entry.get("fingerprint") != fingerprint:
+            entry = _describe_command(file)
+            entry["fingerprint"] = fingerprint
+            changed = True
+        files[file.name] = entry
+
+    if changed or len(files) != len(cached_files):
+        try:
+            COMMAND_MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+            tmp = COMMAND_MANIFEST.with_name(f".{COMMAND_MANIFEST.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"version": MANIFEST_VERSION, "files": files}, indent=2))
+            os.replace(tmp, COMMAND_MANIFEST)
+        except OSError:
+            pass  # read-only checkout: just rebuild next time
+    return files
+
+def _make_runner(module_name):
+    return lambda args: load_command_module(module_name).run(args)
+
 def load_commands(parser):
     subparsers = parser.add_subparsers(dest="command")
 
     command_funcs = {}
 
-    for file in sorted(COMMANDS_DIR.glob("*.py")):
-        module_name = file.stem
-        spec = importlib.util.spec_from_file_location(module_name, file)
-        mod = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(mod)
-        mod.ORCA_USER_ROOT = ORCA_USER_ROOT
-        mod.ORCA_USER_PATH = ORCA_USER_PATH
-        mod.LOCAL_ROOT = LOCAL_ROOT
-        mod.LOCAL_PROFILE_PATH = LOCAL_PROFILE_PATH
-        mod.GIT_ROOT_PATH = GIT_ROOT_PATH
-        mod.BACKUP_PATH = BACKUP_PATH
-        mod.PROFILE_FOLDERS = PROFILE_FOLDERS
-        mod.MANAGED_PROFILE_MARKERS = MANAGED_PROFILE_MARKERS
-
-        if hasattr(mod, "register") and hasattr(mod, "run"):
+    for entry in load_command_manifest().values():
+        module_name = entry["module"]
+        if entry.get("eager"):
+            mod = load_command_module(module_name)
+            before = set(subparsers.choices)
             mod.register(subparsers)
-            command_funcs[module_name] = mod.run
+            for name in set(subparsers.choices) - before:
+                command_funcs[name] = mod.run
+            continue
+        for command in entry["commands"]:
+            sub = subparsers.add_parser(command["name"], **command["kwargs"])
+            for argument in command["arguments"]:
+                kwargs = dict(argument["kwargs"])
+                if "type" in kwargs:
+                    kwargs["type"] = ARGUMENT_TYPES[kwargs["type"]]
+                sub.add_argument(*argument["flags"], **kwargs)
+            command_funcs[command["name"]] = _make_runner(module_name)
 
     return command_funcs
 
+def count_backups(backup_root: Path):
+    """Snapshots, archives and legacy folder copies in backup_root.
+
+    Runs on every start, so it only lists directories instead of importing
+    core.store (see store.list_backups for the layout).
+    """
+    count = 0
+    try:
+        with os.scandir(backup_root) as entries:
+            for entry in entries:
+                if entry.is_dir() and entry.name not in BACKUP_STORE_DIRS:
+                    count += 1  # folder copy from before snapshots existed
+    except OSError:
+        return 0
+    for folder, suffix in (("snapshots", ".json"), ("archives", ".orcz")):
+        try:
+            with os.scandir(backup_root / folder) as entries:
+                count += sum(1 for entry in entries if entry.name.endswith(suffix))
+        except OSError:
+            pass
+    return count
+
 def check_backup_count():
-    if BACKUP_PATH.exists():
-        backup_folders = [d for d in BACKUP_PATH.iterdir() if d.is_dir()]
-        if len(backup_folders) > BACKUP_WARNING_LIMIT:
-            print(f"{RED}⚠️  Warning: You have {len(backup_folders)} backups stored.")
-            print("   Consider cleaning up old backups to save disk space.", RESET)
+    backup_count = count_backups(BACKUP_PATH)
+    if backup_count > BACKUP_WARNING_LIMIT:
+        print(f"{RED}⚠️  Warning: You have {backup_count} backups stored.")
+        print("   Consider pruning old backups ('orca-manager prune') or tightening BACKUP_RETENTION.", RESET)
 
 def run_command(command_name: str, args_dict: dict = {}):
     """Run another command from within a command script."""
-    parser = argparse.ArgumentParser()
-    command_funcs = load_commands(parser)
-
-    if command_name not in command_funcs:
+    if not (COMMANDS_DIR / f"{command_name}.py").exists():
         print(f"❌ Command '{command_name}' not found.")
         return
+    mod = load_command_module(command_name)
 
     class Args:
         def __init__(self, **entries):
             self.__dict__.update(entries)
 
     args = Args(**args_dict)
-    command_funcs[command_name](args)
+    mod.run(args)
 
-def main():
+def cli(argv=None):
+    """Parse argv and run the selected command (also used by the daemon)."""
     parser = argparse.ArgumentParser(
         description="🐳 Orca Manager CLI",
-        usage="orca-manager <command>"
+        usage="orca-manager [--daemon] [--trace] [--profile] <command>"
     )
+    parser.add_argument("--daemon", action="store_true",
+                        help=f"Run the command in the resident daemon if one is running (or set {DAEMON_ENV}=1)")
+    parser.add_argument("--trace", action="store_true",
+                        help="Time the command's phases, print a summary and write a Chrome trace to .cache/traces/")
+    parser.add_argument("--trace-out", help="Write the Chrome trace to this file (implies --trace)")
+    parser.add_argument("--profile", action="store_true", help="Also dump cProfile statistics next to the trace")
 
     command_funcs = load_commands(parser)
 
     check_backup_count()
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if not args.command:
         parser.print_help()
         sys.exit(1)
 
     if args.command in command_funcs:
-        command_funcs[args.command](args)
+        if args.trace or args.trace_out or args.profile:
+            run_traced(args, command_funcs[args.command], sys.argv[1:] if argv is None else argv)
+        else:
+            command_funcs[args.command](args)
     else:
         print(f"Unknown command: {args.command}")
         parser.print_help()
 
+def run_traced(args, func, argv):
+    """Run a command with phase tracing (and cProfile with --profile), then report."""
+    from core import trace
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    out = Path(args.trace_out) if args.trace_out else TRACE_PATH / f"{args.command}-{stamp}.json"
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+
+    trace.enable()
+    try:
+        with trace.span(f"command:{args.command}"):
+            if profiler:
+                profiler.runcall(func, args)
+            else:
+                func(args)
+    finally:
+        trace.disable()
+        trace.print_summary()
+        trace.write(out, {"command": args.command, "argv": list(argv)})
+        print(f"🧭 Trace written to {out} (open it in chrome://tracing or ui.perfetto.dev)", file=sys.stderr)
+        if profiler:
+            stats = out.with_suffix(".prof")
+            profiler.dump_stats(str(stats))
+            print(f"📈 cProfile statistics written to {stats} (python -m pstats {stats})", file=sys.stderr)
+
+def command_name(argv):
+    """The command word in argv, skipping global options and their values."""
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg in GLOBAL_OPTIONS_WITH_VALUE:
+            skip = True
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+def forward_to_daemon(argv):
+    """Run argv in the resident daemon; returns the exit code or None if it is not running."""
+    from core import daemon
+    return daemon.run_remote(CACHE_PATH, argv)
+
+def main():
+    # Commands do `import orca`; share this module instead of loading it twice
+    sys.modules.setdefault("orca", sys.modules[__name__])
+
+    argv = sys.argv[1:]
+    use_daemon = os.environ.get(DAEMON_ENV) == "1"
+    if argv[:1] == ["--daemon"]:
+        argv, use_daemon = argv[1:], True
+    command = command_name(argv)
+    if use_daemon and command not in LOCAL_ONLY_COMMANDS:
+        code = forward_to_daemon(argv)
+        if code is not None:
+            sys.exit(code)
+        print("ℹ️  No orca-manager daemon running, running locally.", file=sys.stderr)
+
+    cli(argv)
+
 
 if __name__ == "__main__":
     main()
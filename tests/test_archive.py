@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from core import archive, store
+
+FOLDERS = ["filament", "process"]
+
+def make_source(root, count=6, variant=""):
+    for i in range(count):
+        folder = root / FOLDERS[i % 2]
+        folder.mkdir(parents=True, exist_ok=True)
+        profile = {"name": f"(ON) Profile {i}{variant}", "type": FOLDERS[i % 2], "from": "User",
+                   "nozzle_temperature": ["215", "215"], "layer_height": f"0.{i + 1}"}
+        (folder / f"(ON) Profile {i}.json").write_text(json.dumps(profile, indent=4), encoding="utf-8")
+    return root
+
+@pytest.fixture
+def source(tmp_path):
+    return make_source(tmp_path / "orca")
+
+def test_round_trip_with_trained_dictionary(tmp_path, source):
+    backups = tmp_path / "backups"
+    name, stats = store.create_archive(backups, source, FOLDERS, ["(ON)"], train=True, jobs=1)
+    assert stats["trained"] and stats["files"] == 6
+    assert archive.dict_path(backups, stats["dict"]).exists()
+
+    path = archive.archive_path(backups, name)
+    index = archive.read_index(path)
+    assert index["dict"] == stats["dict"]
+    for rel in index["files"]:
+        assert archive.read_member(backups, path, rel) == (source / rel).read_bytes()
+    with pytest.raises(KeyError):
+        archive.read_member(backups, path, "filament/missing.json")
+
+    out = tmp_path / "restored"
+    results = archive.extract(backups, path, index["files"], out)
+    assert all(r.ok for r in results)
+    for rel, entry in index["files"].items():
+        assert (out / rel).read_bytes() == (source / rel).read_bytes()
+        assert (out / rel).stat().st_mtime_ns == entry["mtime_ns"]
+
+def test_next_archive_reuses_latest_dictionary(tmp_path, source):
+    backups = tmp_path / "backups"
+    _, first = store.create_archive(backups, source, FOLDERS, ["(ON)"], jobs=1)
+    assert first["trained"]  # nothing to reuse yet
+    assert archive.latest_dictionary(backups) == first["dict"]
+
+    make_source(source, variant=" v2")
+    name, second = store.create_archive(backups, source, FOLDERS, ["(ON)"], jobs=1)
+    assert not second["trained"] and second["dict"] == first["dict"]
+    path = archive.archive_path(backups, name)
+    assert archive.read_member(backups, path, "filament/(ON) Profile 0.json") == \
+        (source / "filament/(ON) Profile 0.json").read_bytes()
+
+    _, third = store.create_archive(backups, source, FOLDERS, ["(ON)"], train=True, jobs=1)
+    assert third["trained"]
+
+def damage(path, entry):
+    data = bytearray(path.read_bytes())
+    data[entry["offset"] + entry["length"] // 2] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+def test_damaged_member_is_reported(tmp_path, source):
+    backups = tmp_path / "backups"
+    name, _ = store.create_archive(backups, source, FOLDERS, ["(ON)"], jobs=1)
+    path = archive.archive_path(backups, name)
+    index = archive.read_index(path)
+    damaged = "process/(ON) Profile 1.json"
+    damage(path, index["files"][damaged])
+
+    with pytest.raises(ValueError):
+        archive.read_member(backups, path, damaged)
+    results = archive.extract(backups, path, index["files"], tmp_path / "restored")
+    failed = [r for r in results if not r.ok]
+    assert [r.dst.relative_to(tmp_path / "restored").as_posix() for r in failed] == [damaged]
+    assert not (tmp_path / "restored" / damaged).exists()
+    assert archive.read_member(backups, path, "filament/(ON) Profile 0.json")
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / "x.orcz"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        archive.read_index(path)
@@ -0,0 +1,14 @@
+import pytest
+
+from core import blame
+
+def no_git(*args, **kwargs):
+    raise FileNotFoundError(2, "No such file or directory", "git")
+
+def test_missing_git_is_reported(tmp_path, monkeypatch):
+    monkeypatch.setattr(blame.subprocess, "run", no_git)
+    monkeypatch.setattr(blame.subprocess, "Popen", no_git)
+    with pytest.raises(blame.BlameError, match="git not available"):
+        blame.profile_blame(tmp_path, tmp_path / "profile.json", tmp_path / "cache")
+    with pytest.raises(blame.BlameError, match="git not available"):
+        list(blame.stream_blobs(tmp_path, ["HEAD:profile.json"]))
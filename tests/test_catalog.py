@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pytest
+
+from core import store
+from core.catalog import BackupCatalog
+
+REL = "filament/(ON) PLA.json"
+
+def snapshot(root, name, files):
+    """A snapshot manifest holding {rel: content hash}."""
+    store.write_json_atomic(store.snapshot_path(root, name), {
+        "version": store.SNAPSHOT_VERSION, "source": "orca",
+        "files": {rel: {"hash": digest, "size": 1, "mtime_ns": 0} for rel, digest in files.items()},
+    })
+
+@pytest.fixture
+def catalog(tmp_path):
+    root = tmp_path / "backups"
+    snapshot(root, "2026-10-01_120000", {REL: "v1"})
+    snapshot(root, "2026-10-02_120000", {REL: "v1", "process/(ON) 0.2.json": "p1"})
+    snapshot(root, "2026-10-03_120000", {REL: "v2"})
+    snapshot(root, "2026-10-03_120000-1", {REL: "v3"})
+    snapshot(root, "2026-10-04_120000", {"process/(ON) 0.2.json": "p1"})
+    with BackupCatalog(tmp_path / "catalog.sqlite", root) as catalog:
+        assert catalog.refresh() == (5, 0)
+        yield catalog
+
+def names(versions):
+    return [v["name"] for v in versions]
+
+def test_versions_and_changes(catalog):
+    versions = catalog.versions(REL)
+    assert names(versions) == ["2026-10-01_120000", "2026-10-02_120000", "2026-10-03_120000", "2026-10-03_120000-1"]
+    assert [v["hash"] for v in versions] == ["v1", "v1", "v2", "v3"]
+    assert names(catalog.changes(REL)) == ["2026-10-01_120000", "2026-10-03_120000", "2026-10-03_120000-1"]
+    assert catalog.versions("filament/unknown.json") == []
+
+@pytest.mark.parametrize("when, rel, expected", [
+    (datetime(2026, 10, 2, 12, 0, 0), None, "2026-10-02_120000"),  # taken exactly then
+    (datetime(2026, 10, 2, 11, 59, 59), None, "2026-10-01_120000"),
+    (datetime(2026, 10, 1, 11, 59, 59), None, None),  # nothing before
+    (datetime(2026, 10, 3, 12, 0, 0), None, "2026-10-03_120000-1"),  # newest of the same second
+    (datetime(2026, 10, 5), None, "2026-10-04_120000"),
+    (datetime(2026, 10, 5), REL, "2026-10-03_120000-1"),  # newest that holds the profile
+    (datetime(2026, 10, 1, 12, 0, 0), REL, "2026-10-01_120000"),
+    (datetime(2026, 10, 1, 12, 0, 0), "process/(ON) 0.2.json", None),
+])
+def test_as_of(catalog, when, rel, expected):
+    assert catalog.as_of(when, rel) == expected
+
+def test_refresh_forgets_deleted_and_reads_changed_backups(catalog):
+    store.snapshot_path(catalog.backup_root, "2026-10-04_120000").unlink()
+    snapshot(catalog.backup_root, "2026-10-01_120000", {REL: "v0", "extra.json": "x"})
+    assert catalog.refresh() == (1, 1)
+    assert catalog.versions(REL)[0]["hash"] == "v0"
+    assert catalog.as_of(datetime(2026, 10, 5)) == "2026-10-03_120000-1"
@@ -0,0 +1,39 @@
+import errno
+import os
+
+import pytest
+
+from core import copier
+
+def no_reflink(*args):
+    raise OSError(errno.EOPNOTSUPP, "no reflink")
+
+@pytest.fixture(autouse=True)
+def fresh_fallbacks(monkeypatch):
+    monkeypatch.setattr(copier, "_no_reflink", set())
+    monkeypatch.setattr(copier, "_no_copy_range", set())
+    monkeypatch.setattr(copier.fcntl, "ioctl", no_reflink)
+
+@pytest.mark.skipif(not hasattr(os, "copy_file_range"), reason="needs os.copy_file_range")
+@pytest.mark.parametrize("failure", ["short copy", "unsupported after partial copy"])
+def test_copy_file_range_fallback_starts_over(tmp_path, monkeypatch, failure):
+    src, dst = tmp_path / "src.json", tmp_path / "dst.json"
+    content = bytes(range(256)) * 64
+    src.write_bytes(content)
+    real_copy_file_range = os.copy_file_range
+    calls = []
+
+    def partial_copy_file_range(src_fd, dst_fd, count):
+        calls.append(count)
+        if len(calls) == 1:
+            return real_copy_file_range(src_fd, dst_fd, 1000)
+        if failure == "short copy":
+            return 0
+        # Bytes written before the error are not reflected in the source offset
+        os.write(dst_fd, b"partial")
+        raise OSError(errno.EXDEV, "cross-device")
+    monkeypatch.setattr(copier.os, "copy_file_range", partial_copy_file_range)
+
+    result = copier.copy_file(src, dst)
+    assert result.ok and result.method == "copy"
+    assert dst.read_bytes() == content
@@ -0,0 +1,71 @@
+import argparse
+import json
+
+import pytest
+
+import orca
+
+@pytest.fixture
+def generate(tmp_path, monkeypatch):
+    mod = orca.load_command_module("generate")
+    monkeypatch.setattr(orca, "ORCA_PATH", tmp_path / "orca")
+    monkeypatch.setattr(mod, "ORCA_USER_PATH", tmp_path / "orca" / "user" / "default")
+    monkeypatch.setattr(mod, "LOCAL_PROFILE_PATH", tmp_path / "local")
+    monkeypatch.setattr(mod, "CACHE_PATH", tmp_path / "cache")
+    return mod
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+def read(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+def run(generate, spec_path, spec):
+    write(spec_path, spec)
+    generate.run(argparse.Namespace(spec=str(spec_path), orca=False, dry_run=False, all=False, force=False, yes=True))
+
+def spec(name, nozzles):
+    return {"type": "machine", "base": "(ON) M", "name": name, "extend_compatible": True,
+            "matrix": {"nozzle": nozzles,
+                       "mode": [{"value": "normal", "mode_label": ""}, {"value": "copy", "mode_label": " COPY"}]},
+            "set": {"nozzle_diameter": ["{nozzle}"]}}
+
+def test_matrix_is_generated_and_references_follow(generate, tmp_path):
+    local = tmp_path / "local"
+    write(local / "machine" / "(ON) M.json", {"name": "(ON) M", "printer_settings_id": "(ON) M", "nozzle_diameter": ["0.4"]})
+    write(local / "process" / "(ON) P.json", {"name": "(ON) P", "print_settings_id": "(ON) P", "compatible_printers": ["(ON) M"]})
+    spec_path = tmp_path / "spec.json"
+
+    run(generate, spec_path, spec("(ON) M {nozzle}{mode_label}", ["0.4", "0.6"]))
+    generated = ["(ON) M 0.4", "(ON) M 0.4 COPY", "(ON) M 0.6", "(ON) M 0.6 COPY"]
+    assert sorted(p.stem for p in (local / "machine").glob("*.json")) == sorted(["(ON) M"] + generated)
+    for name in generated:
+        data = read(local / "machine" / f"{name}.json")
+        assert data["name"] == data["printer_settings_id"] == name
+        assert data["nozzle_diameter"] == [name.split()[2]]
+    assert read(local / "process" / "(ON) P.json")["compatible_printers"] == ["(ON) M"] + generated
+
+    # A profile of the user's own that inherits a generated one
+    write(local / "machine" / "(ON) Child.json", {"name": "(ON) Child", "inherits": "(ON) M 0.6 COPY"})
+
+    # Renamed variants are renamed on disk, dropped ones removed, and references follow
+    run(generate, spec_path, spec("(ON) M {nozzle}mm{mode_label}", ["0.6"]))
+    assert sorted(p.stem for p in (local / "machine").glob("*.json")) == \
+        ["(ON) Child", "(ON) M", "(ON) M 0.6mm", "(ON) M 0.6mm COPY"]
+    assert read(local / "machine" / "(ON) Child.json")["inherits"] == "(ON) M 0.6mm COPY"
+    assert read(local / "process" / "(ON) P.json")["compatible_printers"] == \
+        ["(ON) M", "(ON) M 0.6mm", "(ON) M 0.6mm COPY"]
+
+def test_stale_profile_edited_by_hand_is_kept(generate, tmp_path):
+    local = tmp_path / "local"
+    write(local / "machine" / "(ON) M.json", {"name": "(ON) M", "printer_settings_id": "(ON) M"})
+    spec_path = tmp_path / "spec.json"
+    run(generate, spec_path, spec("(ON) M {nozzle}{mode_label}", ["0.4", "0.6"]))
+
+    edited = local / "machine" / "(ON) M 0.4.json"
+    write(edited, dict(read(edited), retract_length=["2"]))
+    run(generate, spec_path, spec("(ON) M {nozzle}{mode_label}", ["0.6"]))
+    assert edited.exists()
+    assert not (local / "machine" / "(ON) M 0.4 COPY.json").exists()
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from core import refgraph
+from core.inherit import InheritanceError, InheritanceResolver
+from core.profile_index import ProfileIndex
+
+def write_profile(root, rel, **data):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+@pytest.fixture
+def orca(tmp_path):
+    """Two vendors that both define fdm_filament_common, plus a user profile."""
+    root = tmp_path / "OrcaSlicer"
+    write_profile(root, "system/Alpha/filament/fdm_filament_common.json",
+                  name="fdm_filament_common", vendor="alpha", alpha_only="1")
+    write_profile(root, "system/Alpha/filament/Alpha PLA.json", name="Alpha PLA", inherits="fdm_filament_common")
+    write_profile(root, "system/Beta/filament/fdm_filament_common.json",
+                  name="fdm_filament_common", vendor="beta", inherits="fdm_beta_base")
+    write_profile(root, "system/Beta/filament/fdm_beta_base.json", name="fdm_beta_base", beta_base="1")
+    write_profile(root, "system/Beta/filament/Beta PLA.json", name="Beta PLA", inherits="fdm_filament_common")
+    write_profile(root, "user/default/filament/(ON) My PLA.json", name="(ON) My PLA", inherits="Beta PLA")
+    index = ProfileIndex(tmp_path / "index.sqlite", root)
+    index.refresh()
+    yield root, index
+    index.close()
+
+def test_parent_is_looked_up_in_the_same_vendor_first(orca):
+    root, index = orca
+    names = index.name_index()
+    resolver = InheritanceResolver(names.get)
+
+    alpha, chain = resolver.resolve("Alpha PLA", near=root / "system/Alpha/filament/Alpha PLA.json")
+    assert alpha["vendor"] == "alpha" and "beta_base" not in alpha
+    assert chain == ["Alpha PLA", "fdm_filament_common"]
+
+    beta, chain = resolver.resolve("Beta PLA", near=root / "system/Beta/filament/Beta PLA.json")
+    assert beta["vendor"] == "beta" and "alpha_only" not in beta
+    assert chain == ["Beta PLA", "fdm_filament_common", "fdm_beta_base"]
+
+def test_user_profile_falls_back_to_the_global_index(orca):
+    root, index = orca
+    resolver = InheritanceResolver(index.name_index().get)
+    user = root / "user/default/filament/(ON) My PLA.json"
+
+    merged, chain = resolver.merge(json.loads(user.read_text()), near=user)
+    assert chain == ["Beta PLA", "fdm_filament_common", "fdm_beta_base"]
+    assert merged["vendor"] == "beta" and "inherits" not in merged
+
+def test_missing_parent_and_cycle(tmp_path):
+    root = tmp_path / "OrcaSlicer"
+    write_profile(root, "system/V/process/a.json", name="a", inherits="b")
+    write_profile(root, "system/V/process/b.json", name="b", inherits="a")
+    write_profile(root, "system/V/process/c.json", name="c", inherits="nowhere")
+    with ProfileIndex(tmp_path / "index.sqlite", root) as index:
+        index.refresh()
+        resolver = InheritanceResolver(index.name_index().get)
+        with pytest.raises(InheritanceError, match="cycle"):
+            resolver.resolve("a", near=root / "system/V/process/a.json")
+        with pytest.raises(InheritanceError, match="missing ancestor 'nowhere'"):
+            resolver.resolve("c", near=root / "system/V/process/c.json")
+
+def test_reference_graph_uses_the_same_vendor_parent(orca, tmp_path):
+    root, index = orca
+    # Alpha's common profile now inherits a name only Beta defines; Beta's chain stays intact
+    write_profile(root, "system/Alpha/filament/fdm_filament_common.json",
+                  name="fdm_filament_common", inherits="fdm_alpha_base")
+    index.refresh()
+    graph = refgraph.build(index)
+    chains = graph.chains()
+
+    alpha = str(root / "system/Alpha/filament/Alpha PLA.json")
+    assert chains[alpha][0] == "missing" and chains[alpha][2] == "fdm_alpha_base"
+    assert chains[str(root / "system/Beta/filament/Beta PLA.json")] is None
+    assert graph.parent_of(alpha) == str(root / "system/Alpha/filament/fdm_filament_common.json")
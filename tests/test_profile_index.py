@@ -0,0 +1,36 @@
+import json
+import os
+import time
+
+from core.profile_index import ProfileIndex
+
+def add_profile(folder, name, mtime_ns):
+    """Write a profile, then put the folder's mtime back as if it landed in the same tick."""
+    (folder / f"{name}.json").write_text(json.dumps({"name": name}), encoding="utf-8")
+    os.utime(folder, ns=(mtime_ns, mtime_ns))
+
+def test_recently_modified_directory_is_listed_again(tmp_path):
+    folder = tmp_path / "orca" / "user" / "default" / "filament"
+    folder.mkdir(parents=True)
+    (folder / "a.json").write_text(json.dumps({"name": "a"}), encoding="utf-8")
+    listed_at = folder.stat().st_mtime_ns
+    with ProfileIndex(tmp_path / "index.sqlite", tmp_path / "orca") as index:
+        index.refresh()
+        add_profile(folder, "b", listed_at)
+
+        index.refresh()
+        assert index.lookup("b") == folder / "b.json"
+
+def test_settled_directory_listing_is_reused(tmp_path):
+    folder = tmp_path / "orca" / "user" / "default" / "filament"
+    folder.mkdir(parents=True)
+    old = time.time_ns() - 3600 * 10**9
+    add_profile(folder, "a", old)
+    with ProfileIndex(tmp_path / "index.sqlite", tmp_path / "orca") as index:
+        index.refresh()
+        add_profile(folder, "b", old)
+
+        # The unchanged mtime is trusted: the folder is not listed again
+        index.refresh()
+        assert index.lookup("a") == folder / "a.json"
+        assert index.lookup("b") is None
@@ -0,0 +1,63 @@
+from core.refgraph import ReferenceGraph
+
+def graph_of(*profiles):
+    """profiles: (path, name, type, inherits)."""
+    graph = ReferenceGraph()
+    for path, name, profile_type, inherits in profiles:
+        graph.add(path, name, profile_type, inherits)
+    return graph
+
+def messages(issues):
+    return [(i.severity, i.key, i.message) for i in issues]
+
+GRAPH = [
+    ("m/base.json", "base printer", "machine", None),
+    ("m/printer.json", "printer", "machine", "base printer"),
+    ("p/orphan.json", "orphan", "process", "gone"),
+    ("p/child.json", "child", "process", "orphan"),
+    ("p/a.json", "a", "process", "b"),
+    ("p/b.json", "b", "process", "a"),
+    ("p/c.json", "c", "process", "a"),
+    ("f/pla.json", "pla", "filament", "printer"),
+]
+
+def test_resolving_chain_has_no_findings():
+    graph = graph_of(*GRAPH)
+    refs = [("inherits", "base printer")]
+    assert graph.check("m/printer.json", refs) == []
+    assert graph.chains()["m/printer.json"] is None
+
+def test_missing_parent_and_broken_ancestor():
+    graph = graph_of(*GRAPH)
+    assert messages(graph.check("p/orphan.json", [("inherits", "gone")])) == [
+        ("error", "inherits", "'gone' does not match any existing profile"),
+    ]
+    assert messages(graph.check("p/child.json", [("inherits", "orphan")])) == [
+        ("error", "inherits", "Cannot be loaded: ancestor 'orphan' inherits missing 'gone'"),
+    ]
+
+def test_cycle_members_and_descendants():
+    graph = graph_of(*GRAPH)
+    [cycle] = graph.check("p/a.json", [("inherits", "b")])
+    assert cycle.message.startswith("Inheritance cycle: ") and "a" in cycle.message and "b" in cycle.message
+    [below] = graph.check("p/c.json", [("inherits", "a")])
+    assert below.message.startswith("Cannot be loaded: ancestors form a cycle")
+
+def test_compatible_references_are_typed():
+    graph = graph_of(*GRAPH)
+    # "b" exists, but is a process, not a printer
+    issues = graph.check("f/pla.json", [("compatible_printers", "printer"), ("compatible_printers", "b")])
+    assert messages(issues) == [("error", "compatible_printers", "'b' does not match any machine profile")]
+
+def test_unreachable_when_no_compatible_profile_exists():
+    graph = graph_of(*GRAPH)
+    issues = graph.check("f/pla.json", [("compatible_printers", "x"), ("compatible_printers", "y"),
+                                        ("compatible_prints", "child")])
+    assert ("warning", "compatible_printers", "Unreachable: none of its 2 compatible printer(s) exist") in messages(issues)
+    assert not any(i.key == "compatible_prints" for i in issues)
+
+def test_preferred_profile_shadows_same_name():
+    graph = graph_of(*GRAPH)
+    # A local copy of "orphan" that no longer inherits the missing parent
+    graph.add("/repo/p/orphan.json", "orphan", "process", None, preferred=True)
+    assert graph.check("p/child.json", [("inherits", "orphan")]) == []
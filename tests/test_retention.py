@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from core import retention, store
+
+NOW = datetime(2026, 10, 16, 12, 0, 0)  # a Friday
+
+def backup(hours_ago, kind="snapshot", objects=None, own_size=0):
+    taken = NOW - timedelta(hours=hours_ago)
+    name = taken.strftime(store.TIMESTAMP_FORMAT)
+    return {"name": name, "kind": kind, "path": Path(name), "time": taken,
+            "objects": objects or {}, "own_size": own_size, "dict": None, "readable": True}
+
+def names(entries):
+    return [b["name"] for b in entries]
+
+def kept_names(kept):
+    return [b["name"] for b, _ in kept]
+
+# One backup every 6 hours for three weeks, newest first
+HISTORY = [backup(6 * i) for i in range(7 * 4 * 3)]
+
+@pytest.mark.parametrize("policy, expected", [
+    ({"keep_last": 3}, HISTORY[:3]),
+    ({"hourly": 2}, HISTORY[:2]),
+    # newest backup of each of the 3 most recent days: 12:00 today, 18:00 the two days before
+    ({"daily": 3}, [HISTORY[0], HISTORY[3], HISTORY[7]]),
+    # newest of each ISO week: this Friday 12:00, the Sundays 18:00 before
+    ({"weekly": 3}, [HISTORY[0], HISTORY[19], HISTORY[47]]),
+    ({"keep_last": 1, "daily": 2}, [HISTORY[0], HISTORY[3]]),
+])
+def test_bucket_selection(policy, expected):
+    kept, deleted = retention.plan(HISTORY, policy)
+    assert kept_names(kept) == names(expected)
+    assert sorted(names(deleted)) == sorted(set(names(HISTORY)) - set(names(expected)))
+
+def test_reasons_name_every_rule_that_keeps_a_backup():
+    kept, _ = retention.plan(HISTORY, {"keep_last": 1, "daily": 2, "weekly": 1})
+    assert kept[0][1] == ["last", "daily", "weekly"]
+    assert kept[1][1] == ["daily"]
+
+def test_no_rule_keeps_everything():
+    kept, deleted = retention.plan(HISTORY[:5], {"keep_last": 0, "daily": None})
+    assert len(kept) == 5 and deleted == []
+
+def test_size_budget_drops_oldest_and_counts_shared_objects_once():
+    mb = 1024 * 1024
+    backups = [backup(0, objects={"a": mb, "c": mb}), backup(1, objects={"a": mb, "b": mb}), backup(2, objects={"d": 2 * mb})]
+    kept, deleted = retention.plan(backups, {"keep_last": 3, "max_total_mb": 3})
+    assert kept_names(kept) == names(backups[:2])
+    assert names(deleted) == names(backups[2:])
+
+def test_size_budget_never_drops_the_newest_backup():
+    kept, _ = retention.plan([backup(0, own_size=10 * 1024 * 1024)], {"keep_last": 1, "max_total_mb": 1})
+    assert len(kept) == 1
+
+def test_legacy_folder_backups_are_kept_unless_included():
+    legacy = backup(1000, kind="folder")
+    backups = HISTORY[:3] + [legacy]
+    kept, deleted = retention.plan(backups, {"keep_last": 1})
+    assert (legacy, ["legacy folder"]) in kept
+    assert names(deleted) == names(HISTORY[1:3])
+
+    kept, deleted = retention.plan(backups, {"keep_last": 1}, include_legacy=True)
+    assert kept_names(kept) == names(HISTORY[:1])
+    assert legacy["name"] in names(deleted)
+
+def test_legacy_folder_backups_do_not_count_against_keep_last():
+    legacy = backup(0.5, kind="folder")
+    kept, _ = retention.plan([HISTORY[0], legacy] + HISTORY[1:3], {"keep_last": 2})
+    assert set(kept_names(kept)) == {HISTORY[0]["name"], HISTORY[1]["name"], legacy["name"]}
+
+@pytest.fixture
+def backups(tmp_path):
+    """Three snapshots: "shared" is in all of them, "old" only in the first."""
+    source, root = tmp_path / "orca", tmp_path / "backups"
+    profiles = source / "filament"
+    profiles.mkdir(parents=True)
+    (profiles / "ODG_shared.json").write_text("shared")
+    (profiles / "ODG_old.json").write_text("old")
+    first, _ = store.create_snapshot(root, source, ["filament"], ["ODG_"], jobs=1)
+    (profiles / "ODG_old.json").unlink()
+    store.create_snapshot(root, source, ["filament"], ["ODG_"], jobs=1)
+    (profiles / "ODG_new.json").write_text("new")
+    store.create_snapshot(root, source, ["filament"], ["ODG_"], jobs=1)
+    return root, first
+
+def stored(root):
+    return {p.parent.name + p.name for p in (root / store.OBJECTS_DIR).glob("*/*")}
+
+def digests(root, name):
+    return {e["hash"] for e in store.load_snapshot(root, name)["files"].values()}
+
+def prune_oldest(root, first):
+    described = retention.describe_backups(root)
+    kept = [(b, ["test"]) for b in described if b["name"] != first]
+    deleted = [b for b in described if b["name"] == first]
+    return retention.apply(root, kept, deleted, jobs=1), kept
+
+def test_gc_keeps_objects_of_kept_snapshots(backups, monkeypatch):
+    root, first = backups
+    monkeypatch.setattr(retention, "GC_GRACE_SECONDS", -60)  # every object is old enough
+    only_first = digests(root, first) - set().union(*(digests(root, n) for n, _, _ in store.list_backups(root) if n != first))
+    assert len(only_first) == 1
+
+    (removed, freed), kept = prune_oldest(root, first)
+    assert removed == [first]
+    assert freed > 0
+    assert stored(root) == set().union(*(b["objects"].keys() for b, _ in kept))
+    assert not stored(root) & only_first
+
+def test_gc_keeps_objects_newer_than_grace_period(backups):
+    root, first = backups
+    before = stored(root)
+
+    (removed, _), _ = prune_oldest(root, first)
+    assert removed == [first]
+    assert stored(root) == before  # the orphaned object was written moments ago
+
+def test_gc_collects_nothing_while_a_kept_snapshot_is_unreadable(backups, monkeypatch):
+    root, first = backups
+    monkeypatch.setattr(retention, "GC_GRACE_SECONDS", -60)
+    newest = store.list_backups(root)[0][0]
+    store.snapshot_path(root, newest).write_text("{not json")
+    before = stored(root)
+
+    prune_oldest(root, first)
+    assert stored(root) == before
@@ -0,0 +1,47 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Runs `orca-manager run` on a copy of the code tree against an empty
+# OrcaSlicer home, so the checkout's caches and backups are not touched.
+SOURCE = Path(__file__).resolve().parent.parent
+IGNORED = shutil.ignore_patterns(".git", ".cache", "backups", "orca_repositories", "__pycache__", "bench", "tests", "*.pyc")
+
+@pytest.fixture
+def run_job(tmp_path):
+    code = tmp_path / "code"
+    shutil.copytree(SOURCE, code, ignore=IGNORED)
+    home = tmp_path / "home"
+    for folder in ("filament", "machine", "process"):
+        (home / ".config" / "OrcaSlicer" / "user" / "default" / folder).mkdir(parents=True)
+
+    def run(*steps, options=()):
+        job = tmp_path / "job.json"
+        job.write_text(json.dumps({"steps": list(steps)}), encoding="utf-8")
+        env = {k: v for k, v in os.environ.items() if k != "ORCA_MANAGER_DAEMON"}
+        env["HOME"] = str(home)
+        return subprocess.run([sys.executable, str(code / "orca.py"), "run", str(job), *options],
+                              cwd=code, env=env, input="", text=True, capture_output=True)
+    return run
+
+def test_failing_step_fails_the_job(run_job):
+    proc = run_job("restore --backup nonexistent", "list")
+    assert proc.returncode == 1, proc.stdout
+    assert "Step 1 failed: exit code 1" in proc.stdout
+    assert re.search(r"list\s+not run", proc.stdout)
+
+def test_keep_going_reports_every_failed_step(run_job):
+    proc = run_job("restore --backup nonexistent", "push --target doesnotexist", options=["--keep-going"])
+    assert proc.returncode == 1, proc.stdout
+    assert "2 of 2 step(s) failed" in proc.stdout
+
+def test_successful_job(run_job):
+    proc = run_job("list")
+    assert proc.returncode == 0, proc.stdout
+    assert "All 1 step(s) completed" in proc.stdout
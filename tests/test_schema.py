@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from core import schema
+
+def keys(issues, severity="error"):
+    return [i.key for i in issues if i.severity == severity]
+
+BASE = {
+    "filament": {"name": "(ON) PLA", "filament_settings_id": ["(ON) PLA"]},
+    "machine": {"name": "(ON) Printer", "printer_settings_id": "(ON) Printer", "nozzle_diameter": ["0.4", "0.4"]},
+    "process": {"name": "(ON) 0.2mm", "print_settings_id": "(ON) 0.2mm"},
+}
+
+@pytest.mark.parametrize("profile_type, settings, error_keys", [
+    # valid values of every kind
+    ("filament", {"nozzle_temperature": ["215"], "filament_shrink": ["98%"], "enable_pressure_advance": ["1"]}, []),
+    ("filament", {"nozzle_temperature": ["nil"]}, []),  # filament override: use the printer's value
+    ("machine", {"gcode_flavor": "klipper", "retraction_length": ["0.8", "1"], "machine_max_speed_x": ["500", "200"]}, []),
+    ("process", {"layer_height": "0.2", "sparse_infill_density": "15%", "seam_position": "aligned"}, []),
+    # type, range and enum errors
+    ("filament", {"nozzle_temperature": ["hot"]}, ["nozzle_temperature"]),
+    ("filament", {"nozzle_temperature": ["600"]}, ["nozzle_temperature"]),
+    ("filament", {"fan_min_speed": ["12.5"]}, ["fan_min_speed"]),
+    ("filament", {"enable_pressure_advance": ["yes"]}, ["enable_pressure_advance"]),
+    ("machine", {"gcode_flavor": "cura"}, ["gcode_flavor"]),
+    ("process", {"layer_height": "0"}, ["layer_height"]),
+    ("process", {"wall_loops": "nil"}, ["wall_loops"]),  # "nil" is only for filament overrides
+    # shape errors: scalar vs list, one value per extruder/filament/mode
+    ("process", {"layer_height": ["0.2"]}, ["layer_height"]),
+    ("filament", {"nozzle_temperature": "215"}, ["nozzle_temperature"]),
+    ("machine", {"retraction_length": ["0.8"]}, ["retraction_length"]),
+    ("filament", {"nozzle_temperature": ["215", "220"]}, ["nozzle_temperature"]),
+    ("machine", {"machine_max_speed_x": ["500", "200", "100"]}, ["machine_max_speed_x"]),
+    # settings the schema does not cover are not checked
+    ("process", {"some_future_setting": ["anything", 3]}, []),
+])
+def test_values(profile_type, settings, error_keys):
+    profile = dict(BASE[profile_type], **settings)
+    assert keys(schema.validate_profile(profile_type, profile)) == error_keys
+
+def test_required_fields():
+    assert keys(schema.validate_profile("filament", {})) == ["name", "filament_settings_id"]
+    # A missing settings id is only a warning for machines and processes
+    assert keys(schema.validate_profile("machine", {"name": "m"}), "warning") == ["printer_settings_id"]
+    # ... and fine when it is inherited
+    issues = schema.validate_profile("process", {"name": "p", "inherits": "base"})
+    assert keys(issues) == [] and keys(issues, "warning") == ["inherits"]
+    assert keys(schema.validate_profile("machine", ["not", "an", "object"])) == [None]
+
+def test_inverted_pairs_are_warnings():
+    profile = dict(BASE["filament"], nozzle_temperature_range_low=["260"], nozzle_temperature_range_high=["190"])
+    issues = schema.validate_profile("filament", profile)
+    assert keys(issues) == [] and keys(issues, "warning") == ["nozzle_temperature_range_low"]
+
+def test_validate_file(tmp_path):
+    good, bad = tmp_path / "good.json", tmp_path / "bad.json"
+    good.write_text(json.dumps(BASE["process"]), encoding="utf-8")
+    bad.write_text("{", encoding="utf-8")
+    digest, issues = schema.validate_file(str(good), "process")
+    assert len(digest) == 64 and issues == []
+    _, issues = schema.validate_file(str(bad), "process")
+    assert issues[0].severity == "error" and issues[0].message.startswith("Invalid JSON")
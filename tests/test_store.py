@@ -0,0 +1,32 @@
+from core import store
+
+def test_list_backups_orders_same_second_suffixes_numerically(tmp_path):
+    names = ["2026-10-16_120000"] + [f"2026-10-16_120000-{n}" for n in range(1, 12)] + ["2026-10-16_115959-3"]
+    for name in names:
+        store.write_json_atomic(store.snapshot_path(tmp_path, name), {"files": {}})
+
+    listed = [name for name, _, _ in store.list_backups(tmp_path)]
+    assert listed[0] == "2026-10-16_120000-11"
+    assert listed[:3] == ["2026-10-16_120000-11", "2026-10-16_120000-10", "2026-10-16_120000-9"]
+    assert listed[-2:] == ["2026-10-16_120000", "2026-10-16_115959-3"]
+
+def test_list_backups_places_undated_folder_copies_by_mtime(tmp_path):
+    store.write_json_atomic(store.snapshot_path(tmp_path, "2000-01-01_000000"), {"files": {}})
+    (tmp_path / "before-upgrade" / "default").mkdir(parents=True)
+    (tmp_path / "broken").mkdir()  # no default/ subfolder to take a time from
+
+    assert [name for name, _, _ in store.list_backups(tmp_path)] == ["before-upgrade", "2000-01-01_000000", "broken"]
+
+def test_stray_temp_files_are_not_profiles(tmp_path):
+    from core import syncstate
+    source = tmp_path / "orca"
+    (source / "filament").mkdir(parents=True)
+    (source / "filament" / "(ON) PLA.json").write_text("{}")
+    # What an interrupted copier.copy_file leaves behind
+    (source / "filament" / ".(ON) PLA.json.4242.tmp").write_text("{")
+    (source / "filament" / ".(ON) PLA.info.4242.tmp").write_text("")
+
+    assert list(store.scan_source(source, ["filament"], ["(ON)"])) == ["filament/(ON) PLA.json"]
+    assert list(syncstate.scan_profiles(source, ["filament"], ["(ON)"])) == ["filament/(ON) PLA.json"]
+    name, statuses = store.create_snapshot(tmp_path / "backups", source, ["filament"], ["(ON)"], jobs=1)
+    assert statuses == [("filament/(ON) PLA.json", "stored")]
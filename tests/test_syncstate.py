@@ -0,0 +1,88 @@
+import hashlib
+import os
+
+import pytest
+
+from core import syncstate
+from core.fsutil import stat_key
+
+REL = "filament/ODG_test.json"
+
+def digest(content):
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def make_plan(tmp_path, synced, orca, local, newer=None):
+    """Plan one profile: synced is the content recorded in the manifest (None: never synced),
+    orca/local the content on each side (None: missing), newer the side with the later mtime."""
+    orca_root, local_root = tmp_path / "orca", tmp_path / "local"
+    files = {}
+    for side, root, content in (("orca", orca_root, orca), ("local", local_root, local)):
+        files[side] = {}
+        if content is not None:
+            path = root / REL
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding="utf-8")
+            mtime = 2_000_000_000_000_000_000 if side == newer else 1_000_000_000_000_000_000
+            os.utime(path, ns=(mtime, mtime))
+            files[side][REL] = path
+    manifest = {"version": syncstate.MANIFEST_VERSION, "pairs": {}}
+    plan = syncstate.SyncPlan(manifest, orca_root, local_root)
+    if synced is not None:
+        # Stat keys that match neither side, so both sides are hashed
+        plan.entries[REL] = {"hash": digest(synced), "orca": [0, 0], "local": [0, 0]}
+    return plan.build(files["orca"], files["local"])
+
+@pytest.mark.parametrize("synced, orca, local, newer, state", [
+    # in sync, with or without a manifest entry
+    ("a", "a", "a", None, syncstate.SAME),
+    (None, "a", "a", "orca", syncstate.SAME),
+    # one side only
+    (None, "a", None, None, syncstate.ORCA_ONLY),
+    (None, None, "a", None, syncstate.LOCAL_ONLY),
+    ("a", None, "a", None, syncstate.LOCAL_ONLY),
+    # the manifest tells which side changed, whatever the mtimes say
+    ("a", "b", "a", "local", syncstate.ORCA_CHANGED),
+    ("a", "a", "b", "orca", syncstate.LOCAL_CHANGED),
+    ("a", "b", "c", None, syncstate.CONFLICT),
+    ("x", "b", "c", "orca", syncstate.CONFLICT),
+    # never synced: the newer file wins
+    (None, "b", "a", "orca", syncstate.ORCA_CHANGED),
+    (None, "b", "a", "local", syncstate.LOCAL_CHANGED),
+    (None, "b", "a", None, syncstate.LOCAL_CHANGED),
+])
+def test_classify(tmp_path, synced, orca, local, newer, state):
+    plan = make_plan(tmp_path, synced, orca, local, newer)
+    assert [item["state"] for item in plan.items] == [state]
+
+def test_orca_only_keeps_manifest_entry_for_removed_locally(tmp_path):
+    # push reports an orca-only profile that was synced before as "removed locally"
+    plan = make_plan(tmp_path, "a", "a", None)
+    item, = plan.items
+    assert item["state"] == syncstate.ORCA_ONLY
+    assert item["entry"]["hash"] == digest("a")
+
+    plan = make_plan(tmp_path / "new", None, "a", None)
+    assert plan.items[0]["entry"] is None
+
+def test_same_refreshes_manifest_entry(tmp_path):
+    plan = make_plan(tmp_path, None, "a", "a")
+    entry = plan.entries[REL]
+    assert entry["hash"] == digest("a")
+    assert entry["orca"] == stat_key((tmp_path / "orca" / REL).stat())
+    assert entry["local"] == stat_key((tmp_path / "local" / REL).stat())
+
+def test_matching_stat_trusts_recorded_hash(tmp_path):
+    plan = make_plan(tmp_path, "a", "a", "b")
+    orca_file = tmp_path / "orca" / REL
+    # Same size and mtime as recorded: the file is not read again
+    plan.entries[REL] = {"hash": digest("b"), "orca": stat_key(orca_file.stat()), "local": [0, 0]}
+    plan.items = []
+    plan.build({REL: orca_file}, {REL: tmp_path / "local" / REL})
+    assert plan.items[0]["state"] == syncstate.SAME
+
+def test_record_and_forget(tmp_path):
+    plan = make_plan(tmp_path, None, "a", "b", newer="local")
+    plan.record(REL)
+    assert plan.entries[REL]["hash"] == digest("b")
+    plan.forget(REL)
+    assert REL not in plan.entries
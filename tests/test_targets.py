@@ -0,0 +1,59 @@
+import pytest
+
+from core import targets
+
+FOLDERS = ["filament", "machine", "process"]
+
+@pytest.fixture
+def user_root(tmp_path):
+    root = tmp_path / "home" / ".config" / "OrcaSlicer" / "user"
+    for user in ("default", "12345"):
+        (root / user / "filament").mkdir(parents=True)
+    return root
+
+def test_resolve_user_id_and_paths(user_root, tmp_path):
+    assert targets.resolve("12345", user_root, FOLDERS) == targets.Target("12345", user_root / "12345")
+    with pytest.raises(targets.TargetError, match="No OrcaSlicer user folder"):
+        targets.resolve("999", user_root, FOLDERS)
+
+    # A path inside OrcaSlicer's user directory is named by its user ID
+    assert targets.resolve(str(user_root / "default"), user_root, FOLDERS) == \
+        targets.Target("default", user_root / "default")
+
+    # A home directory or OrcaSlicer folder elsewhere resolves to its default user folder
+    other = tmp_path / "mnt" / "workstation"
+    (other / ".config" / "OrcaSlicer" / "user" / "default" / "machine").mkdir(parents=True)
+    target = targets.resolve(str(other), user_root, FOLDERS)
+    assert target.root == other / ".config" / "OrcaSlicer" / "user" / "default"
+    assert target.label == targets.label_for(other)
+
+    with pytest.raises(targets.TargetError, match="has no OrcaSlicer profile folders"):
+        targets.resolve(str(tmp_path), user_root, FOLDERS)
+    with pytest.raises(targets.TargetError, match="is not a folder"):
+        targets.resolve(str(tmp_path / "missing"), user_root, FOLDERS)
+
+def test_unique_drops_the_same_folder(user_root):
+    link = user_root.parent / "alias"
+    link.symlink_to(user_root / "default")
+    found = [targets.Target("default", user_root / "default"), targets.Target("alias", link),
+             targets.Target("12345", user_root / "12345")]
+    assert targets.unique(found) == [found[0], found[2]]
+
+def test_unique_renames_duplicate_labels(tmp_path):
+    a, b = tmp_path / "a b", tmp_path / "a_b"
+    a.mkdir()
+    b.mkdir()
+    assert targets.label_for(a) == targets.label_for(b)
+    first, second = targets.unique([targets.Target(targets.label_for(a), a), targets.Target(targets.label_for(b), b)])
+    assert first.label == targets.label_for(a)
+    assert second.label.startswith(targets.label_for(b) + "-") and second.label != first.label
+    # Stable between runs, so the target keeps its backup folder
+    again = targets.unique([targets.Target(targets.label_for(a), a), targets.Target(targets.label_for(b), b)])
+    assert again[1] == second
+
+def test_backup_root(tmp_path, user_root):
+    backups = tmp_path / "backups"
+    default = targets.Target("default", user_root / "default")
+    other = targets.Target("12345", user_root / "12345")
+    assert targets.backup_root(backups, default, user_root / "default") == backups
+    assert targets.backup_root(backups, other, user_root / "default") == backups / "targets" / "12345"
@@ -0,0 +1,180 @@
+import os
+
+import pytest
+
+from core import txn
+from core.txn import PushTransaction, TransactionError
+
+# The target folder after a push must always match either the state before
+# the push or the state after it, whatever step the push stopped at.
+BEFORE = {
+    "filament/keep.json": "keep",
+    "filament/old.json": "old v1",
+    "process/gone.json": "gone",
+    "process/gone.info": "gone info",
+}
+AFTER = {
+    "filament/keep.json": "keep",
+    "filament/old.json": "old v2",
+    "filament/new.json": "new",
+}
+
+def tree(root):
+    """Relative path -> content of every file under root, skipping the transaction folder."""
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != txn.TXN_DIR]
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            files[os.path.relpath(path, root).replace(os.sep, "/")] = open(path, encoding="utf-8").read()
+    return files
+
+def write_tree(root, files):
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+@pytest.fixture
+def push(tmp_path):
+    """A target holding BEFORE and a local folder holding the new versions."""
+    target, local = tmp_path / "orca", tmp_path / "local"
+    write_tree(target, BEFORE)
+    write_tree(local, {"filament/old.json": "old v2", "filament/new.json": "new"})
+    writes = [(local / rel, rel) for rel in ("filament/old.json", "filament/new.json")]
+    deletes = ["process/gone.json", "process/gone.info"]
+    return target, writes, deletes
+
+def test_commit_applies_writes_and_deletes(push):
+    target, writes, deletes = push
+    transaction = PushTransaction(target)
+    results = transaction.stage(writes, deletes, jobs=1)
+    assert all(result.ok for result in results)
+    assert tree(target) == BEFORE  # staging does not touch the target
+
+    ops = transaction.commit()
+    assert {(op["rel"], op["action"]) for op in ops} == {
+        ("filament/old.json", "write"), ("filament/new.json", "write"),
+        ("process/gone.json", "delete"), ("process/gone.info", "delete"),
+    }
+    assert tree(target) == AFTER
+    assert PushTransaction(target).pending() is None
+    assert not (target / txn.TXN_DIR).exists()
+
+def test_failed_fsync_while_staging_leaves_target_untouched(push, monkeypatch):
+    target, writes, deletes = push
+    calls = []
+
+    def failing_fsync(path):
+        calls.append(path)
+        if len(calls) > 1:
+            raise OSError(5, "Input/output error")
+    monkeypatch.setattr(txn, "_fsync", failing_fsync)
+
+    with pytest.raises(OSError):
+        PushTransaction(target).stage(writes, deletes, jobs=1)
+    assert tree(target) == BEFORE
+    assert PushTransaction(target).pending() is None
+    assert not list((target / txn.TXN_DIR / "staging").iterdir())
+
+def test_files_that_fail_to_stage_are_left_out(push):
+    target, writes, deletes = push
+    missing = (writes[0][0].parent / "missing.json", "filament/missing.json")
+    transaction = PushTransaction(target)
+    results = transaction.stage(writes + [missing], deletes, jobs=1)
+    assert [result.ok for result in results] == [True, True, False]
+    assert "filament/missing.json" not in {op["rel"] for op in transaction.journal["ops"]}
+
+    transaction.commit()
+    assert tree(target) == AFTER
+
+def test_stage_refuses_while_a_push_is_pending(push):
+    target, writes, deletes = push
+    PushTransaction(target).stage(writes, deletes, jobs=1)
+    with pytest.raises(TransactionError):
+        PushTransaction(target).stage(writes, deletes, jobs=1)
+
+def test_rollback_of_prepared_push_discards_staging(push):
+    target, writes, deletes = push
+    PushTransaction(target).stage(writes, deletes, jobs=1)
+
+    assert PushTransaction(target).rollback() == []
+    assert tree(target) == BEFORE
+    assert PushTransaction(target).pending() is None
+
+def crash_during_commit(target, writes, deletes, monkeypatch, renames):
+    """Stage a push and stop its commit after `renames` renames, as a crash would."""
+    PushTransaction(target).stage(writes, deletes, jobs=1)
+    real_replace = os.replace
+    done = []
+
+    def replace(src, dst):
+        if len(done) == renames:
+            raise KeyboardInterrupt("crash")
+        done.append(src)
+        real_replace(src, dst)
+    monkeypatch.setattr(txn.os, "replace", replace)
+    with pytest.raises(KeyboardInterrupt):
+        PushTransaction(target).commit()
+    monkeypatch.setattr(txn.os, "replace", real_replace)
+
+    # The first rename writes the "committing" journal; a crash before it leaves "prepared"
+    journal = PushTransaction(target).pending()
+    assert journal["state"] == (txn.COMMITTING if renames else txn.PREPARED)
+
+# journal: 1 rename, old.json: 2 (aside + into place), new.json: 1, gone.json/.info: 1 each
+CRASH_POINTS = range(6)
+
+@pytest.mark.parametrize("renames", CRASH_POINTS)
+def test_resume_after_crash_reaches_post_push_state(push, monkeypatch, renames):
+    target, writes, deletes = push
+    crash_during_commit(target, writes, deletes, monkeypatch, renames)
+
+    PushTransaction(target).commit()
+    assert tree(target) == AFTER
+    assert PushTransaction(target).pending() is None
+
+@pytest.mark.parametrize("renames", CRASH_POINTS)
+def test_rollback_after_crash_restores_pre_push_state(push, monkeypatch, renames):
+    target, writes, deletes = push
+    crash_during_commit(target, writes, deletes, monkeypatch, renames)
+
+    PushTransaction(target).rollback()
+    assert tree(target) == BEFORE
+    assert PushTransaction(target).pending() is None
+
+def test_resume_after_journal_reached_committing_without_renames(push):
+    target, writes, deletes = push
+    transaction = PushTransaction(target)
+    transaction.stage(writes, deletes, jobs=1)
+    transaction.journal["state"] = txn.COMMITTING
+    txn._write_journal(transaction.journal_path, transaction.journal)
+
+    ops = PushTransaction(target).commit()
+    assert len(ops) == 4
+    assert tree(target) == AFTER
+
+def test_push_deletes_profiles_removed_locally(tmp_path):
+    import argparse
+    import orca
+    from core import syncstate, targets
+    push = orca.load_command_module("push")
+
+    target, local = tmp_path / "orca", tmp_path / "local"
+    write_tree(target, BEFORE)
+    write_tree(local, {"filament/keep.json": "keep", "filament/old.json": "old v2", "filament/new.json": "new"})
+    manifest = {"version": syncstate.MANIFEST_VERSION, "pairs": {}}
+    plan = syncstate.SyncPlan(manifest, target, local)
+    plan.entries["process/gone.json"] = {"hash": "synced before", "orca": [0, 0], "local": [0, 0]}
+    orca_files = {rel: target / rel for rel in BEFORE if rel.endswith(".json")}
+    local_files = {rel: local / rel for rel in ("filament/keep.json", "filament/old.json", "filament/new.json")}
+    plan.build(orca_files, local_files)
+    push_summary = [item for item in plan.items if item["state"] in push.PUSH_STATUS]
+    assert push.push_status(next(i for i in push_summary if i["rel"] == "process/gone.json")) == "removed locally"
+
+    args = argparse.Namespace(skip_newer=False, jobs=1)
+    outcome = push.write_target(targets.Target("orca", target), plan, push_summary, args, backup=False)
+    assert outcome["error"] is None
+    assert ("process/gone.json", "deleted") in outcome["pushed"]
+    assert tree(target) == AFTER
+    assert "process/gone.json" not in plan.entries
@@ -0,0 +1,77 @@
+import argparse
+import json
+
+import pytest
+
+import orca
+
+@pytest.fixture
+def validate(tmp_path, monkeypatch):
+    mod = orca.load_command_module("validate")
+    monkeypatch.setattr(mod, "CACHE_PATH", tmp_path / "cache")
+    return mod
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+def args(*paths, **options):
+    return argparse.Namespace(paths=[str(p) for p in paths], local=False, format="text",
+                              strict=options.get("strict", False), jobs=1, no_cache=False, no_refs=True)
+
+def test_results_are_cached_by_content(validate, tmp_path):
+    good = write(tmp_path / "process" / "good.json", {"name": "p", "print_settings_id": "p", "layer_height": "0.2"})
+    bad = write(tmp_path / "process" / "bad.json", {"name": "q", "print_settings_id": "q", "layer_height": "9"})
+    files = [(good, "process"), (bad, "process")]
+    cache = validate.empty_cache()
+
+    results, checked = validate.validate(files, cache, jobs=1)
+    assert checked == 2
+    assert results[good] == [] and [i.key for i in results[bad]] == ["layer_height"]
+
+    results, checked = validate.validate(files, cache, jobs=1)
+    assert checked == 0
+    assert [i.key for i in results[bad]] == ["layer_height"]
+
+    write(bad, {"name": "q", "print_settings_id": "q", "layer_height": "0.3"})
+    results, checked = validate.validate(files, cache, jobs=1)
+    assert checked == 1 and results[bad] == []
+
+    # The cache survives a save/load round trip; the result for bad's old content is dropped
+    assert len(cache["results"]) == 3
+    validate.save_cache(tmp_path / "cache.json", cache)
+    loaded = validate.load_cache(tmp_path / "cache.json")
+    assert len(loaded["results"]) == 2
+    assert validate.validate(files, loaded, jobs=1)[1] == 0
+
+def test_exit_code(validate, tmp_path, capsys):
+    good = write(tmp_path / "process" / "good.json", {"name": "p", "print_settings_id": "p"})
+    warned = write(tmp_path / "machine" / "warned.json", {"name": "m"})
+    bad = write(tmp_path / "filament" / "bad.json", {"name": "f", "filament_settings_id": ["f"],
+                                                     "nozzle_temperature": ["900"]})
+
+    validate.run(args(good, warned))
+    assert "1 warning(s)" in capsys.readouterr().out
+
+    with pytest.raises(SystemExit) as exit:
+        validate.run(args(good, warned, strict=True))
+    assert exit.value.code == 1
+
+    with pytest.raises(SystemExit) as exit:
+        validate.run(args(good, bad))
+    assert exit.value.code == 1
+    assert "nozzle_temperature" in capsys.readouterr().out
+
+def test_paths_that_are_not_profiles(validate, tmp_path, capsys):
+    info = tmp_path / "process" / "good.info"
+    info.parent.mkdir(parents=True)
+    info.write_text("sync_info =")
+    with pytest.raises(SystemExit):
+        validate.run(args(info))
+    assert "Not a profile (.json) file" in capsys.readouterr().out
+
+    outside = write(tmp_path / "elsewhere" / "p.json", {"name": "p"})
+    validate.run(args(outside))
+    with pytest.raises(SystemExit):
+        validate.run(args(outside, strict=True))